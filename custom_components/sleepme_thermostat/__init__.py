@@ -2,17 +2,34 @@
 
 from __future__ import annotations
 
-import json
+import time
 from datetime import timedelta
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any
 
 from homeassistant.const import CONF_API_KEY, Platform
+from homeassistant.core import callback
+from homeassistant.helpers import device_registry as dr
+from homeassistant.helpers import entity_registry as er
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers.dispatcher import async_dispatcher_send
+from homeassistant.helpers.storage import Store
 from homeassistant.loader import async_get_loaded_integration
 
-from .api import SleepmeApiClient
-from .const import CONF_UPDATE_INTERVAL, DOMAIN, LOGGER, STARTUP_MESSAGE
-from .coordinator import SleepmeDataUpdateCoordinator
+from .const import (
+    CONF_DISABLED_DEVICES,
+    CONF_DISABLED_SENSORS,
+    CONF_HEDGE_REQUESTS,
+    CONF_UPDATE_INTERVAL,
+    CONF_WATER_TEMPERATURE_C,
+    DATA_STORAGE_KEY,
+    DATA_STORAGE_VERSION,
+    DOMAIN,
+    LOGGER,
+    SCHEDULE_STORAGE_KEY,
+    SCHEDULE_STORAGE_VERSION,
+    SIGNAL_OPTIONS_UPDATED,
+    STARTUP_MESSAGE,
+)
 from .data import SleepmeData
 
 if TYPE_CHECKING:
@@ -38,36 +55,59 @@ async def async_setup_entry(
     entry: SleepmeConfigEntry,
 ) -> bool:
     """Set up this integration using UI."""
+    # Imported here so loading the integration, e.g. for its config flow,
+    # does not load the client and coordinator
+    from .api import SleepmeApiClient  # noqa: PLC0415
+    from .coordinator import SleepmeDataUpdateCoordinator  # noqa: PLC0415
+    from .validation_cache import async_get_validation_cache  # noqa: PLC0415
+
     if hass.data.get(DOMAIN) is None:
         hass.data.setdefault(DOMAIN, {})
         LOGGER.info(STARTUP_MESSAGE)
 
     LOGGER.info(f"Setup entry for {entry.entry_id}")
+    started = time.monotonic()
 
     coordinator = SleepmeDataUpdateCoordinator(
         hass=hass,
         logger=LOGGER,
         name=DOMAIN,
-        update_interval=timedelta(minutes=entry.data.get(CONF_UPDATE_INTERVAL, 10)),
+        update_interval=_update_interval(entry),
     )
 
     entry.runtime_data = SleepmeData(
         client=SleepmeApiClient(
             api_key=entry.data[CONF_API_KEY],
             session=async_get_clientsession(hass),
+            hedge_requests=entry.options.get(CONF_HEDGE_REQUESTS, False),
+            validation_cache=async_get_validation_cache(hass),
         ),
         integration=async_get_loaded_integration(hass, entry.domain),
         coordinator=coordinator,
+        # Platforms switched off in the options are not even loaded
+        platforms=_enabled_platforms(entry),
     )
-
-    # debug coordinator data
-    LOGGER.info(f"Coordinator data: {json.dumps(coordinator.data, indent=2)}")
-
-    # https://developers.home-assistant.io/docs/integration_fetching_data#coordinated-single-api-poll-for-data-for-all-entities
-    await coordinator.async_config_entry_first_refresh()
-
-    await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
-    entry.async_on_unload(entry.add_update_listener(async_reload_entry))
+    platforms = entry.runtime_data.platforms
+    _async_remove_disabled_entities(hass, entry)
+
+    if from_cache := await coordinator.async_load_cached_data():
+        # Set up the entities from the last run's data, and refresh it
+        # without holding up Home Assistant's startup
+        await hass.config_entries.async_forward_entry_setups(entry, platforms)
+        entry.async_create_background_task(
+            hass, coordinator.async_refresh_cached(), f"{DOMAIN} first refresh"
+        )
+    else:
+        # https://developers.home-assistant.io/docs/integration_fetching_data#coordinated-single-api-poll-for-data-for-all-entities
+        await coordinator.async_config_entry_first_refresh()
+        await hass.config_entries.async_forward_entry_setups(entry, platforms)
+    entry.async_on_unload(entry.add_update_listener(async_update_options))
+
+    coordinator.startup = {
+        "duration": round(time.monotonic() - started, 3),
+        "from_cache": from_cache,
+    }
+    LOGGER.debug(f"Setup of {entry.entry_id} took {coordinator.startup['duration']}s")
 
     return True
 
@@ -77,12 +117,139 @@ async def async_unload_entry(
     entry: SleepmeConfigEntry,
 ) -> bool:
     """Handle removal of an entry."""
-    return await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
+    _async_stop_trackers(entry, entry.runtime_data.platforms)
+    return await hass.config_entries.async_unload_platforms(
+        entry, entry.runtime_data.platforms
+    )
+
+
+@callback
+def _async_stop_trackers(entry: SleepmeConfigEntry, platforms: list[Platform]) -> None:
+    """Stop the entity tracking of platforms about to be unloaded."""
+    for platform in platforms:
+        if (stop := entry.runtime_data.trackers.pop(platform, None)) is not None:
+            stop()
+
+
+async def async_remove_entry(
+    hass: HomeAssistant,
+    entry: SleepmeConfigEntry,
+) -> None:
+    """Remove the device data and polling schedule stored for an entry."""
+    for version, key in (
+        (DATA_STORAGE_VERSION, DATA_STORAGE_KEY),
+        (SCHEDULE_STORAGE_VERSION, SCHEDULE_STORAGE_KEY),
+    ):
+        await Store(hass, version, key.format(entry.entry_id)).async_remove()
 
 
-async def async_reload_entry(
+@callback
+def _async_remove_disabled_entities(
     hass: HomeAssistant,
     entry: SleepmeConfigEntry,
 ) -> None:
-    """Reload config entry."""
-    await hass.config_entries.async_reload(entry.entry_id)
+    """
+    Remove the entities and devices disabled in the options from the registries.
+
+    Otherwise Home Assistant would keep showing them as unavailable.
+    """
+    platforms = entry.runtime_data.platforms
+    disabled_devices = set(entry.options.get(CONF_DISABLED_DEVICES, []))
+    disabled_sensors = set(entry.options.get(CONF_DISABLED_SENSORS, []))
+    if not entry.options.get(CONF_WATER_TEMPERATURE_C):
+        # The Celsius sensor is opt-in, also when left over from version 1
+        disabled_sensors.add(CONF_WATER_TEMPERATURE_C)
+
+    entity_registry = er.async_get(hass)
+    for entity_entry in er.async_entries_for_config_entry(
+        entity_registry, entry.entry_id
+    ):
+        # Climate entities prefix their unique ID with the domain
+        unique_id = entity_entry.unique_id.removeprefix(f"{DOMAIN}_")
+        if (
+            entity_entry.domain not in platforms
+            or any(unique_id.startswith(f"{x}_") for x in disabled_devices)
+            or any(unique_id.endswith(f"_{x}") for x in disabled_sensors)
+        ):
+            LOGGER.debug(f"Removing disabled entity {entity_entry.entity_id}")
+            entity_registry.async_remove(entity_entry.entity_id)
+
+    device_registry = dr.async_get(hass)
+    for device in dr.async_entries_for_config_entry(device_registry, entry.entry_id):
+        if any(
+            domain == DOMAIN and device_id in disabled_devices
+            for domain, device_id in device.identifiers
+        ):
+            device_registry.async_update_device(
+                device.id, remove_config_entry_id=entry.entry_id
+            )
+
+
+async def async_update_options(
+    hass: HomeAssistant,
+    entry: SleepmeConfigEntry,
+) -> None:
+    """
+    Apply changed options to the running entry, without reloading it.
+
+    The coordinator keeps its data and schedule, and only the platforms and
+    entities that were switched on or off are set up or removed. The others
+    apply the changed options in place.
+    """
+    runtime_data = entry.runtime_data
+    runtime_data.client.hedge_requests = entry.options.get(CONF_HEDGE_REQUESTS, False)
+
+    platforms = _enabled_platforms(entry)
+    removed = [x for x in runtime_data.platforms if x not in platforms]
+    added = [x for x in platforms if x not in runtime_data.platforms]
+    if removed:
+        _async_stop_trackers(entry, removed)
+        await hass.config_entries.async_unload_platforms(entry, removed)
+    runtime_data.platforms = platforms
+    _async_remove_disabled_entities(hass, entry)
+
+    runtime_data.coordinator.async_update_options(_update_interval(entry))
+    async_dispatcher_send(hass, SIGNAL_OPTIONS_UPDATED.format(entry.entry_id))
+    if added:
+        await hass.config_entries.async_forward_entry_setups(entry, added)
+
+
+def _update_interval(entry: SleepmeConfigEntry) -> timedelta:
+    """Return the polling interval of an entry, as changed in the options."""
+    minutes = entry.options.get(
+        CONF_UPDATE_INTERVAL, entry.data.get(CONF_UPDATE_INTERVAL, 10)
+    )
+    return timedelta(minutes=minutes)
+
+
+def _enabled_platforms(entry: SleepmeConfigEntry) -> list[Platform]:
+    """Return the platforms not switched off in the options."""
+    return [platform for platform in PLATFORMS if entry.options.get(platform, True)]
+
+
+async def async_migrate_entry(
+    hass: HomeAssistant,
+    entry: SleepmeConfigEntry,
+) -> bool:
+    """Migrate an old config entry."""
+    LOGGER.debug(f"Migrating config entry from version {entry.version}")
+
+    if entry.version == 1:
+        # The separate Fahrenheit sensor became the single water temperature
+        # sensor; keep its entity ID, history and stored display unit.
+        @callback
+        def _migrate_unique_id(
+            entity_entry: er.RegistryEntry,
+        ) -> dict[str, Any] | None:
+            if (
+                entity_entry.domain == Platform.SENSOR
+                and entity_entry.unique_id.endswith("_water_temperature_f")
+            ):
+                return {"new_unique_id": entity_entry.unique_id.removesuffix("_f")}
+            return None
+
+        await er.async_migrate_entries(hass, entry.entry_id, _migrate_unique_id)
+        hass.config_entries.async_update_entry(entry, version=2)
+
+    LOGGER.debug(f"Migration to version {entry.version} successful")
+    return True
@@ -2,47 +2,62 @@
 
 from __future__ import annotations
 
+import asyncio
 import logging
-import socket
-from dataclasses import dataclass
-from typing import cast
+import statistics
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from http import HTTPStatus
+from json import JSONDecodeError
+from typing import TYPE_CHECKING, Any, cast
 
 import aiohttp
-import async_timeout
+import orjson
 
+from .clock import SYSTEM_CLOCK
 from .const import LOGGER
+from .deadline import Deadline
+from .exceptions import (
+    SleepmeApiClientAuthenticationError,
+    SleepmeApiClientCommunicationError,
+    SleepmeApiClientError,
+    SleepmeApiClientRateLimitError,
+)
 from .rate_limiter import RateLimiter
+from .retry import DEFAULT_RETRY_POLICIES, ErrorClass
+
+if TYPE_CHECKING:
+    from collections.abc import Mapping
+
+    from .clock import Clock
+    from .retry import RetryPolicy
+    from .validation_cache import SleepmeValidationCache
 
 TIMEOUT = 10
+# Seconds of the deadline a retry must have left after its backoff
+RETRY_MIN_TIMEOUT = 1
+
+# Recent GET latencies kept to decide when to hedge, and the number needed
+LATENCY_SAMPLES = 50
+HEDGE_MIN_SAMPLES = 10
+# Requests per minute a hedge must leave for commands
+HEDGE_RESERVE = 2
 
 # Constants
 RATE_LIMIT_STATUS_CODE = 429
 
 _LOGGER: logging.Logger = logging.getLogger(__package__)
 
+# Sent with request bodies only, GETs have none
 HEADERS = {"Content-type": "application/json; charset=UTF-8"}
 
-
-class SleepmeApiClientError(Exception):
-    """Exception to indicate a general API error."""
-
-
-class SleepmeApiClientCommunicationError(
-    SleepmeApiClientError,
-):
-    """Exception to indicate a communication error."""
-
-
-class SleepmeApiClientAuthenticationError(
-    SleepmeApiClientError,
-):
-    """Exception to indicate an authentication error."""
-
-
-class SleepmeApiClientRateLimitError(
-    SleepmeApiClientError,
-):
-    """Exception to indicate a rate limit error."""
+# Quota headers of the common conventions, the first one present is used
+LIMIT_HEADERS = ("X-RateLimit-Limit", "RateLimit-Limit")
+REMAINING_HEADERS = ("X-RateLimit-Remaining", "RateLimit-Remaining")
+RESET_HEADERS = ("X-RateLimit-Reset", "RateLimit-Reset")
+# Reset values above this are epoch timestamps instead of seconds
+RESET_EPOCH_THRESHOLD = 1_000_000_000
 
 
 def _verify_response_or_raise(response: aiohttp.ClientResponse) -> None:
@@ -60,6 +75,101 @@ def _verify_response_or_raise(response: aiohttp.ClientResponse) -> None:
     response.raise_for_status()
 
 
+def _header_value(
+    headers: Mapping[str, str], names: tuple[str, ...]
+) -> tuple[float, str] | None:
+    """Return the number and parameters of the first header present."""
+    for name in names:
+        if (value := headers.get(name)) is None:
+            continue
+        # Values may carry parameters, like the window in "10;w=60"
+        number, _, parameters = value.partition(";")
+        try:
+            return float(number.split(",")[0]), parameters
+        except ValueError:
+            continue
+    return None
+
+
+def _parse_quota(headers: Mapping[str, str]) -> dict[str, Any]:
+    """Return the quota the server reported in a response's headers."""
+    quota: dict[str, Any] = {}
+    if (limit := _header_value(headers, LIMIT_HEADERS)) is not None:
+        quota["limit"] = int(limit[0])
+        for parameter in limit[1].split(";"):
+            key, _, window = parameter.strip().partition("=")
+            if key == "w" and window.isdigit():
+                quota["period"] = float(window)
+    if (remaining := _header_value(headers, REMAINING_HEADERS)) is not None:
+        quota["remaining"] = int(remaining[0])
+    if (reset := _header_value(headers, RESET_HEADERS)) is not None:
+        seconds = reset[0]
+        if seconds > RESET_EPOCH_THRESHOLD:
+            seconds -= time.time()
+        quota["reset"] = max(seconds, 0.0)
+    return quota
+
+
+# Checked in order, the first matching type decides the class. DNS failures
+# (socket.gaierror) and connection resets are OSErrors.
+_ERROR_CLASSES = (
+    (SleepmeApiClientAuthenticationError, ErrorClass.AUTH),
+    (SleepmeApiClientRateLimitError, ErrorClass.RATE_LIMIT),
+    (TimeoutError, ErrorClass.TIMEOUT),
+    ((aiohttp.ContentTypeError, JSONDecodeError), ErrorClass.SCHEMA),
+    (aiohttp.ClientResponseError, ErrorClass.CLIENT),
+    ((aiohttp.ClientError, OSError), ErrorClass.CONNECTION),
+)
+
+
+def _classify_error(exception: Exception) -> ErrorClass:
+    """Return the class of a failed request's error."""
+    error_class = next(
+        (
+            error_class
+            for types, error_class in _ERROR_CLASSES
+            if isinstance(exception, types)
+        ),
+        ErrorClass.UNKNOWN,
+    )
+    if (
+        isinstance(exception, aiohttp.ClientResponseError)
+        and error_class is ErrorClass.CLIENT
+        and exception.status >= HTTPStatus.INTERNAL_SERVER_ERROR
+    ):
+        return ErrorClass.SERVER
+    return error_class
+
+
+def _as_client_error(
+    exception: Exception, error_class: ErrorClass
+) -> SleepmeApiClientError:
+    """Return the client error to raise for a failed request."""
+    if error_class is ErrorClass.TIMEOUT:
+        msg = f"Timeout error fetching information - {exception}"
+        return SleepmeApiClientCommunicationError(msg)
+    if error_class is ErrorClass.SCHEMA:
+        msg = f"Unexpected response - {exception}"
+        return SleepmeApiClientError(msg)
+    if error_class is not ErrorClass.UNKNOWN:
+        msg = f"Error fetching information - {exception}"
+        return SleepmeApiClientCommunicationError(msg)
+    msg = f"Something really wrong happened! - {exception}"
+    return SleepmeApiClientError(msg)
+
+
+@dataclass
+class SleepmeRequestStatistics:
+    """Counters of the requests sent by the API client."""
+
+    requests: int = 0
+    timeouts: int = 0
+    cancelled: int = 0
+    hedged: int = 0
+    retries: int = 0
+    errors: dict[str, int] = field(default_factory=dict)
+
+
 @dataclass
 class SleepmeDevice:
     """Data for a Sleep.me device."""
@@ -80,25 +190,55 @@ class SleepmeDeviceState:
 class SleepmeApiClient:
     """Sleep.me API client for interacting with the Sleep.me service."""
 
-    def __init__(
+    def __init__(  # noqa: PLR0913
         self,
         api_key: str,
         session: aiohttp.ClientSession,
         rate_limiter: RateLimiter | None = None,
+        *,
+        hedge_requests: bool = False,
+        retry_policies: Mapping[ErrorClass, RetryPolicy] | None = None,
+        clock: Clock | None = None,
+        validation_cache: SleepmeValidationCache | None = None,
     ) -> None:
         """Sleep.me API Client."""
         self._api_key = api_key
+        # Built once, every request of the client sends the same headers
+        self._get_headers = {"Authorization": f"Bearer {api_key}"}
+        self._body_headers = {**HEADERS, **self._get_headers}
         self._session = session
-        self._rate_limiter = rate_limiter or RateLimiter()
+        self._clock = clock or SYSTEM_CLOCK
+        self._rate_limiter = rate_limiter or RateLimiter(clock=self._clock)
+        # Can be switched while the client is in use
+        self.hedge_requests = hedge_requests
+        self._retry_policies = (
+            DEFAULT_RETRY_POLICIES if retry_policies is None else retry_policies
+        )
+        self._latencies: deque[float] = deque(maxlen=LATENCY_SAMPLES)
+        self._validation_cache = validation_cache
+        self.statistics = SleepmeRequestStatistics()
+
+    @property
+    def rate_limiter(self) -> RateLimiter:
+        """Return the rate limiter of the client's requests."""
+        return self._rate_limiter
 
     async def async_get_data(self) -> list[dict]:
         """Get data from the API."""
         return await self.async_get_devices()
 
-    async def async_get_devices(self) -> list[dict]:
-        """Get devices from the API."""
+    async def async_get_devices(self, deadline: Deadline | None = None) -> list[dict]:
+        """Get devices from the API, or as just fetched by the config flow."""
+        if self._validation_cache is not None and (
+            (devices := self._validation_cache.pop(self._api_key)) is not None
+        ):
+            LOGGER.debug("Using the device list fetched by the config flow")
+            return devices
+
         url = "https://api.developer.sleep.me/v1/devices"
-        devices = cast("list[dict]", await self.api_wrapper("get", url))
+        devices = cast(
+            "list[dict]", await self.api_wrapper("get", url, deadline=deadline)
+        )
 
         return [
             device
@@ -106,10 +246,12 @@ class SleepmeApiClient:
             if "CHILIPAD_PRO" in device.get("attachments", [])
         ]
 
-    async def async_get_device_state(self, device_id: str) -> dict:
+    async def async_get_device_state(
+        self, device_id: str, deadline: Deadline | None = None
+    ) -> dict:
         """Get device state from the API."""
         url = f"https://api.developer.sleep.me/v1/devices/{device_id}"
-        return await self.api_wrapper("get", url)
+        return await self.api_wrapper("get", url, deadline=deadline)
 
     async def async_set_device_temperature(
         self, device_id: str, temperature: float
@@ -128,40 +270,185 @@ class SleepmeApiClient:
         )
 
     async def api_wrapper(
-        self, method: str, url: str, data: dict | None = None
+        self,
+        method: str,
+        url: str,
+        data: dict | None = None,
+        deadline: Deadline | None = None,
     ) -> dict:
-        """Get information from the API."""
+        """
+        Get information from the API.
+
+        Failed attempts are retried as the policy of their error class
+        allows, as long as the deadline and the rate limit leave room. Each
+        attempt may take at most the time left of the deadline, and nothing
+        is sent once the deadline has passed.
+        """
+        headers, body = self._request_args(data)
+        if deadline is None:
+            deadline = Deadline(TIMEOUT, self._clock)
+
+        attempt = 0
+        while True:
+            attempt += 1
+            timeout = min(TIMEOUT, deadline.remaining())
+            if timeout <= 0:
+                self.statistics.timeouts += 1
+                msg = f"Deadline of {deadline.timeout}s exceeded before {method} {url}"
+                raise SleepmeApiClientCommunicationError(msg)
+
+            try:
+                async with asyncio.timeout(timeout):
+                    if method == "get" and self.hedge_requests:
+                        return await self._async_hedged_get(url, headers, deadline)
+                    return await self._async_send(method, url, headers, body)
+            except Exception as exception:  # pylint: disable=broad-except
+                error_class = _classify_error(exception)
+                self.statistics.errors[error_class] = (
+                    self.statistics.errors.get(error_class, 0) + 1
+                )
+                if error_class is ErrorClass.TIMEOUT:
+                    self.statistics.timeouts += 1
+                    LOGGER.warning(
+                        f"Cancelled {method} {url} after its {timeout:.2f}s slice"
+                    )
+
+                delay = self._retry_delay(error_class, attempt, deadline)
+                if delay is None:
+                    if isinstance(exception, SleepmeApiClientError):
+                        raise
+                    raise _as_client_error(exception, error_class) from exception
+
+            self.statistics.retries += 1
+            LOGGER.debug(
+                f"Retrying {method} {url} in {delay:.1f}s after {error_class} error"
+            )
+            await self._clock.sleep(delay)
+
+    def _request_args(self, data: dict | None) -> tuple[dict[str, str], bytes | None]:
+        """
+        Return the headers and serialized body of a request.
+
+        Requests without data, like the GETs of every poll, send no body and
+        share the client's headers; nothing is built for them. Bodies are
+        serialized once, however often the request is retried.
+        """
         if data is None:
-            data = {}
-        headers = HEADERS.copy()
-        headers["Authorization"] = f"Bearer {self._api_key}"
+            return self._get_headers, None
+        return self._body_headers, orjson.dumps(data)
+
+    def _retry_delay(
+        self, error_class: ErrorClass, attempt: int, deadline: Deadline
+    ) -> float | None:
+        """Return the seconds to wait before retrying, None to give up."""
+        if (policy := self._retry_policies.get(error_class)) is None:
+            return None
+        if (delay := policy.delay(attempt)) is None:
+            return None
+        if error_class is ErrorClass.RATE_LIMIT:
+            # The limiter holds requests back until the server's Retry-After,
+            # or the end of the window without one; the retry waits for it
+            delay = max(delay, self._rate_limiter.seconds_until_available())
+        elif not self._rate_limiter.can_send_request():
+            return None
+        # The retry must get a useful slice of the deadline after the backoff
+        if not deadline.allows(delay + RETRY_MIN_TIMEOUT):
+            return None
+        return delay
+
+    async def _async_send(
+        self, method: str, url: str, headers: dict[str, str], body: bytes | None
+    ) -> dict:
+        """
+        Send a single request and return its JSON response.
 
+        Over the rate limit, the request waits in line for the next minute
+        for at most the time of its attempt.
+        """
         if not self._rate_limiter.can_send_request():
-            LOGGER.info("Rate limit exceeded")
+            LOGGER.info("Rate limit exceeded, waiting for the next minute")
+        await self._rate_limiter.acquire()
 
+        self.statistics.requests += 1
+        started = self._clock.monotonic()
         try:
-            async with async_timeout.timeout(10):
-                response = await self._session.request(
-                    method=method,
-                    url=url,
-                    headers=headers,
-                    json=data,
-                )
+            async with self._session.request(
+                method=method,
+                url=url,
+                headers=headers,
+                data=body,
+            ) as response:
+                self._sync_quota(response)
                 _verify_response_or_raise(response)
-                return await response.json()
-
-        except TimeoutError as exception:
-            msg = f"Timeout error fetching information - {exception}"
-            raise SleepmeApiClientCommunicationError(
-                msg,
-            ) from exception
-        except (aiohttp.ClientError, socket.gaierror) as exception:
-            msg = f"Error fetching information - {exception}"
-            raise SleepmeApiClientCommunicationError(
-                msg,
-            ) from exception
-        except Exception as exception:  # pylint: disable=broad-except
-            msg = f"Something really wrong happened! - {exception}"
-            raise SleepmeApiClientError(
-                msg,
-            ) from exception
+                result = await response.json()
+        except asyncio.CancelledError:
+            # Timed out, lost a hedge or unloaded; the connection is released
+            self.statistics.cancelled += 1
+            elapsed = self._clock.monotonic() - started
+            LOGGER.debug(f"Cancelled {method} {url} after {elapsed:.2f}s")
+            raise
+
+        if method == "get":
+            self._latencies.append(self._clock.monotonic() - started)
+        return result
+
+    def _sync_quota(self, response: aiohttp.ClientResponse) -> None:
+        """Keep the rate limiter in sync with the quota the server reports."""
+        quota = _parse_quota(response.headers)
+        if response.status == RATE_LIMIT_STATUS_CODE:
+            retry_after = response.headers.get("Retry-After", "")
+            if retry_after.isdigit():
+                # Requests may be sent again once the server said so
+                self._rate_limiter.block(float(retry_after))
+            else:
+                quota["remaining"] = 0
+        if quota:
+            LOGGER.debug(f"Rate limit quota reported by the server: {quota}")
+            self._rate_limiter.sync_quota(**quota)
+
+    async def _async_hedged_get(
+        self, url: str, headers: dict[str, str], deadline: Deadline | None
+    ) -> dict:
+        """
+        Send a GET, and a second one if the first is slower than usual.
+
+        The second request is only sent when the first takes longer than the
+        p90 latency of recent GETs, the rate limit leaves room for it and
+        the deadline leaves time for it. The first answer wins and the other
+        request is cancelled.
+        """
+        attempts = [asyncio.create_task(self._async_send("get", url, headers, None))]
+        try:
+            delay = self.hedge_delay()
+            if delay is not None:
+                done, _ = await asyncio.wait(attempts, timeout=delay)
+                if not done and self._can_hedge(delay, deadline):
+                    LOGGER.debug(f"Hedging GET {url} after {delay:.2f}s")
+                    self.statistics.hedged += 1
+                    attempts.append(
+                        asyncio.create_task(self._async_send("get", url, headers, None))
+                    )
+
+            errors: list[Exception] = []
+            for attempt in asyncio.as_completed(attempts):
+                try:
+                    return await attempt
+                except Exception as exception:  # noqa: BLE001
+                    errors.append(exception)
+            raise errors[-1]
+        finally:
+            for attempt in attempts:
+                attempt.cancel()
+            await asyncio.gather(*attempts, return_exceptions=True)
+
+    def hedge_delay(self) -> float | None:
+        """Return the p90 latency of recent GETs, if there are enough."""
+        if len(self._latencies) < HEDGE_MIN_SAMPLES:
+            return None
+        return statistics.quantiles(self._latencies, n=10)[-1]
+
+    def _can_hedge(self, delay: float, deadline: Deadline | None) -> bool:
+        """Return True if a second request fits the rate limit and deadline."""
+        if self._rate_limiter.remaining_requests() <= HEDGE_RESERVE:
+            return False
+        return deadline is None or deadline.allows(delay)
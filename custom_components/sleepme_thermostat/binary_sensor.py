@@ -1,76 +1,105 @@
 """Sleep.me Binary Sensor integration for Home Assistant."""
 
-from homeassistant.components.binary_sensor import BinarySensorEntity
-from homeassistant.core import HomeAssistant
-from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
+from __future__ import annotations
 
-from .const import BINARY_SENSOR_TYPES, LOGGER
-from .coordinator import SleepmeDataUpdateCoordinator
-from .data import SleepmeConfigEntry
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.components.binary_sensor import (
+    BinarySensorDeviceClass,
+    BinarySensorEntity,
+    BinarySensorEntityDescription,
+)
+from homeassistant.const import Platform
+
+from .const import BINARY_SENSOR_TYPES, CONF_DISABLED_SENSORS, LOGGER
+from .entity import SleepmeEntity, async_track_entities
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from homeassistant.core import HomeAssistant
+    from homeassistant.helpers.entity_platform import AddEntitiesCallback
+
+    from .coordinator import SleepmeDataUpdateCoordinator
+    from .data import SleepmeConfigEntry
+
+
+@dataclass(frozen=True, kw_only=True)
+class SleepmeBinarySensorEntityDescription(BinarySensorEntityDescription):
+    """Describes a Sleep.me binary sensor entity."""
+
+    value_fn: Callable[[dict[str, Any]], bool | None]
+
+
+BINARY_SENSOR_DESCRIPTIONS: tuple[SleepmeBinarySensorEntityDescription, ...] = (
+    SleepmeBinarySensorEntityDescription(
+        key="is_water_low",
+        name=BINARY_SENSOR_TYPES["is_water_low"],
+        device_class=BinarySensorDeviceClass.PROBLEM,
+        value_fn=lambda data: data.get("status", {}).get("is_water_low"),
+    ),
+    SleepmeBinarySensorEntityDescription(
+        key="is_connected",
+        name=BINARY_SENSOR_TYPES["is_connected"],
+        device_class=BinarySensorDeviceClass.CONNECTIVITY,
+        value_fn=lambda data: data.get("status", {}).get("is_connected", False),
+    ),
+)
 
 
 async def async_setup_entry(
-    hass: HomeAssistant,  # noqa: ARG001
+    hass: HomeAssistant,
     config_entry: SleepmeConfigEntry,
     async_add_entities: AddEntitiesCallback,
 ) -> None:
     """Set up Sleep.me binary sensors from a config entry."""
+    config_entry.runtime_data.trackers[Platform.BINARY_SENSOR] = async_track_entities(
+        hass, config_entry, async_add_entities, lambda: _build_entities(config_entry)
+    )
+
+
+def _build_entities(config_entry: SleepmeConfigEntry) -> list[SleepmeEntity]:
+    """Build the binary sensors enabled in the options."""
     coordinator = config_entry.runtime_data.coordinator
+    disabled = set(config_entry.options.get(CONF_DISABLED_SENSORS, []))
 
     entities = []
-    for sensor_type in BINARY_SENSOR_TYPES:
+    for description in BINARY_SENSOR_DESCRIPTIONS:
+        if description.key in disabled:
+            continue
         for idx in coordinator.data:
-            entities.append(SleepmeBinarySensor(coordinator, idx, sensor_type))
-            LOGGER.debug(f"Adding binary sensor {sensor_type} for device {idx}")
+            entities.append(SleepmeBinarySensor(coordinator, idx, description))
+            LOGGER.debug(f"Adding binary sensor {description.key} for device {idx}")
+    return entities
 
-    async_add_entities(entities)
 
-
-class SleepmeBinarySensor(CoordinatorEntity, BinarySensorEntity):
+class SleepmeBinarySensor(SleepmeEntity, BinarySensorEntity):
     """Sleep.me Binary Sensor Entity."""
 
+    entity_description: SleepmeBinarySensorEntityDescription
+
     def __init__(
         self,
         coordinator: SleepmeDataUpdateCoordinator,
         idx: str,
-        sensor_type: str,
+        description: SleepmeBinarySensorEntityDescription,
     ) -> None:
         """Initialize the binary sensor."""
-        super().__init__(coordinator)
-        self.idx = idx
-        self._sensor_type = sensor_type
+        super().__init__(coordinator, idx)
+        self.entity_description = description
 
         data = coordinator.data[idx]
 
-        self._name = f"{data['name']} {BINARY_SENSOR_TYPES[sensor_type]}"
-        self._unique_id = f"{idx}_{sensor_type}"
+        self._attr_name = f"{data['name']} {description.name}"
+        self._attr_unique_id = f"{idx}_{description.key}"
 
         LOGGER.debug(
-            f"Initializing SleepmeBinarySensor with device info: "
-            f"{coordinator.data[idx]}, and sensor type: {sensor_type}"
+            f"Initializing SleepmeBinarySensor for device {idx}, "
+            f"and sensor type: {description.key}"
         )
 
-    @property
-    def name(self) -> str:
-        """Return the name of the binary sensor."""
-        return self._name
-
-    @property
-    def unique_id(self) -> str:
-        """Return the unique ID of the binary sensor."""
-        return self._unique_id
-
     @property
     def is_on(self) -> bool | None:
         """Return the state of the binary sensor."""
-        try:
-            status = self.coordinator.data[self.idx].get("status", {})
-            LOGGER.debug(f"Status for device {self.idx}: {status}")
-            return status.get("is_connected", False)
-        except KeyError:
-            LOGGER.error(
-                f"Error fetching state for binary sensor {self._unique_id}: "
-                f"{self.coordinator.data[self.idx]}"
-            )
-            return None
+        return self.entity_description.value_fn(self.coordinator.data[self.idx])
@@ -1,105 +1,189 @@
 """Sleep.me Climate integration for Home Assistant."""
 
-from typing import Any
+from __future__ import annotations
 
-from homeassistant.components.climate import ClimateEntity
+from typing import TYPE_CHECKING, Any, NoReturn
+
+from homeassistant.components.climate import ClimateEntity, ClimateEntityDescription
 from homeassistant.components.climate.const import (
     PRESET_NONE,
     ClimateEntityFeature,
     HVACMode,
 )
-from homeassistant.const import UnitOfTemperature
-from homeassistant.core import HomeAssistant
-from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
+from homeassistant.const import Platform, UnitOfTemperature
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers.event import async_track_time_interval
+
+from .const import (
+    CONF_INTERPOLATE_TEMPERATURE,
+    CONF_TEMPERATURE_DEADBAND,
+    DOMAIN,
+    INTERPOLATION_INTERVAL,
+    LOGGER,
+    MAX_TEMPERATURE_F,
+    MIN_TEMPERATURE_F,
+    PRESET_MAX_COOL,
+    PRESET_MAX_HEAT,
+    PRESET_TEMPERATURES,
+    RAMP_RATE_WINDOW,
+)
+from .entity import SleepmeEntity, async_track_entities
+from .exceptions import SleepmeApiClientError
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+    from datetime import datetime
+
+    from homeassistant.helpers.entity_platform import AddEntitiesCallback
+
+    from .coordinator import SleepmeDataUpdateCoordinator
+    from .data import SleepmeConfigEntry
 
-from .const import DOMAIN, LOGGER, PRESET_MAX_COOL, PRESET_MAX_HEAT, PRESET_TEMPERATURES
-from .coordinator import SleepmeDataUpdateCoordinator
-from .data import SleepmeConfigEntry
+CLIMATE_DESCRIPTION = ClimateEntityDescription(key="thermostat")
 
 
 async def async_setup_entry(
-    hass: HomeAssistant,  # noqa: ARG001
+    hass: HomeAssistant,
     config_entry: SleepmeConfigEntry,
     async_add_entities: AddEntitiesCallback,
 ) -> None:
     """Set up Sleep.me climate devices from a config entry."""
     coordinator = config_entry.runtime_data.coordinator
 
-    async_add_entities([SleepmeClimate(coordinator, idx) for idx in coordinator.data])
+    config_entry.runtime_data.trackers[Platform.CLIMATE] = async_track_entities(
+        hass,
+        config_entry,
+        async_add_entities,
+        lambda: [SleepmeClimate(coordinator, idx) for idx in coordinator.data],
+    )
 
 
-class SleepmeClimate(CoordinatorEntity, ClimateEntity):
+class SleepmeClimate(SleepmeEntity, ClimateEntity):
     """Sleep.me Climate Entity."""
 
+    entity_description = CLIMATE_DESCRIPTION
+
+    # Already recorded by the binary sensors of the device
+    _unrecorded_attributes = frozenset({"is_water_low", "is_connected"})
+
+    _attr_supported_features = (
+        ClimateEntityFeature.TARGET_TEMPERATURE
+        | ClimateEntityFeature.TURN_ON
+        | ClimateEntityFeature.TURN_OFF
+        | ClimateEntityFeature.PRESET_MODE
+    )
+    _attr_hvac_modes = [HVACMode.OFF, HVACMode.HEAT_COOL]  # noqa: RUF012
+    _attr_preset_modes = [PRESET_NONE, PRESET_MAX_HEAT, PRESET_MAX_COOL]  # noqa: RUF012
+    _attr_min_temp = MIN_TEMPERATURE_F
+    _attr_max_temp = MAX_TEMPERATURE_F
+    _attr_temperature_unit = UnitOfTemperature.FAHRENHEIT
+
     def __init__(self, coordinator: SleepmeDataUpdateCoordinator, idx: str) -> None:
         """Initialize the climate entity."""
-        super().__init__(coordinator)
-        self.idx = idx
+        super().__init__(coordinator, idx)
         data = coordinator.data[idx]
 
         LOGGER.debug(f"Initializing SleepmeClimate with device info: {data}")
 
-        self._name = data["name"]
-        self._unique_id = f"{idx}_climate"
-        self._attr_unique_id = f"{DOMAIN}_{idx}_thermostat"
+        self._attr_name = data["name"]
+        self._attr_unique_id = f"{DOMAIN}_{idx}_{self.entity_description.key}"
 
         self._state = data.get("control", {}).get("thermal_control_status") == "active"
         self._target_temperature = data.get("control", {}).get("set_temperature_f")
         self._current_temperature = data.get("status", {}).get("water_temperature_f")
+        self._interpolated_temperature: float | None = None
+        self._unsub_interpolate: Callable[[], None] | None = None
+        self._temperature_throttle = self._state_throttle(
+            CONF_TEMPERATURE_DEADBAND, self._current_temperature
+        )
 
-        self._attr_device_info = {
-            "identifiers": {(DOMAIN, idx)},
-            "name": self._name,
-            "manufacturer": "SleepMe",
-            "model": data.get("about", {}).get("model"),
-            "sw_version": data.get("about", {}).get("firmware_version"),
-            "connections": {("mac", data.get("about", {}).get("mac_address"))},
-            "serial_number": data.get("about", {}).get("serial_number"),
-        }
-
-        LOGGER.debug(
-            f"Initializing SleepmeClimate with device info: {coordinator.data[idx]}"
+    async def async_added_to_hass(self) -> None:
+        """Start interpolating the water temperature if enabled."""
+        await super().async_added_to_hass()
+        self.async_on_remove(self._async_stop_interpolation)
+        self._async_track_interpolation()
+
+    @callback
+    def async_options_updated(self) -> None:
+        """Apply a changed deadband or interpolation option."""
+        status = self.coordinator.data[self.idx].get("status", {})
+        self._temperature_throttle = self._state_throttle(
+            CONF_TEMPERATURE_DEADBAND, status.get("water_temperature_f")
         )
+        self._async_track_interpolation()
+        self.async_write_ha_state()
+
+    @callback
+    def _async_track_interpolation(self) -> None:
+        """Interpolate the water temperature while enabled in the options."""
+        self._async_stop_interpolation()
+        if self.coordinator.config_entry.options.get(CONF_INTERPOLATE_TEMPERATURE):
+            self._unsub_interpolate = async_track_time_interval(
+                self.hass, self._async_interpolate, INTERPOLATION_INTERVAL
+            )
 
-    @property
-    def supported_features(self) -> ClimateEntityFeature:
-        """Return the list of supported features."""
+    @callback
+    def _async_stop_interpolation(self) -> None:
+        """Stop interpolating, and go back to the reported temperature."""
+        if self._unsub_interpolate is not None:
+            self._unsub_interpolate()
+            self._unsub_interpolate = None
+        self._interpolated_temperature = None
+
+    @callback
+    def _async_interpolate(self, now: datetime) -> None:
+        """Publish the estimated water temperature between polls."""
+        if not self.available:
+            return
+        estimate = self.coordinator.get_history(self.idx).extrapolate_water_temperature(
+            now.timestamp(), RAMP_RATE_WINDOW
+        )
+        if estimate is None:
+            return
+        estimate = round(estimate, 1)
+        if estimate != self._interpolated_temperature:
+            self._interpolated_temperature = estimate
+            self.async_write_ha_state()
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Snap back to the reported temperatures on every poll."""
+        self._interpolated_temperature = None
+        # Gone once the device left the account, the entity is unavailable
+        if (data := self.coordinator.data.get(self.idx)) is not None:
+            control = data.get("control", {})
+            self._target_temperature = control.get(
+                "set_temperature_f", self._target_temperature
+            )
+            if self._temperature_throttle is not None:
+                self._temperature_throttle.update(
+                    data.get("status", {}).get("water_temperature_f"),
+                    self.coordinator.clock.monotonic(),
+                )
+        super()._handle_coordinator_update()
+
+    def _state_snapshot(self) -> tuple[Any, ...] | None:
+        """Return what the state is built from, while the temperature is throttled."""
+        if self._temperature_throttle is None:
+            return None
+        if not self.available:
+            return (False,)
         return (
-            ClimateEntityFeature.TARGET_TEMPERATURE
-            | ClimateEntityFeature.TURN_ON
-            | ClimateEntityFeature.TURN_OFF
-            | ClimateEntityFeature.PRESET_MODE
+            self.current_temperature,
+            self.target_temperature,
+            self.hvac_mode,
+            self.preset_mode,
+            *self.extra_state_attributes.values(),
         )
 
-    @property
-    def hvac_modes(self) -> list[HVACMode]:
-        """Return the list of available HVAC modes."""
-        return [HVACMode.OFF, HVACMode.HEAT_COOL]
-
-    @property
-    def min_temp(self) -> int:
-        """Return the minimum temperature."""
-        return 55
-
-    @property
-    def max_temp(self) -> int:
-        """Return the maximum temperature."""
-        return 115
-
-    @property
-    def name(self) -> str:
-        """Return the name of the climate entity."""
-        return self._name
-
-    @property
-    def temperature_unit(self) -> UnitOfTemperature:
-        """Return the unit of measurement."""
-        return UnitOfTemperature.FAHRENHEIT
-
     @property
     def current_temperature(self) -> float | None:
-        """Return the current temperature."""
+        """Return the current, or interpolated, temperature."""
+        if self._interpolated_temperature is not None:
+            return self._interpolated_temperature
+        if self._temperature_throttle is not None:
+            return self._temperature_throttle.value
         try:
             status = self.coordinator.data[self.idx].get("status", {})
             LOGGER.debug(f"Status for device {self.idx}: {status}")
@@ -132,16 +216,32 @@ class SleepmeClimate(CoordinatorEntity, ClimateEntity):
     @property
     def available(self) -> bool:
         """Return True if the device is connected, False otherwise."""
-        return (
+        return super().available and (
             self.coordinator.data[self.idx].get("status", {}).get("is_connected", False)
         )
 
+    def _raise_service_error(
+        self, translation_key: str, exception: SleepmeApiClientError
+    ) -> NoReturn:
+        """Raise the error shown for a failed request of a service call."""
+        raise HomeAssistantError(
+            translation_domain=DOMAIN,
+            translation_key=translation_key,
+            translation_placeholders={"name": str(self.name), "error": str(exception)},
+        ) from exception
+
     async def async_set_temperature(self, **kwargs: Any) -> None:
         """Set the target temperature."""
         temperature = kwargs.get("temperature")
         if temperature is not None:
             temperature = int(temperature)
             LOGGER.debug(f"Setting target temperature to {temperature}F")
+            try:
+                await self.coordinator.async_set_device_temperature(
+                    self.idx, temperature
+                )
+            except SleepmeApiClientError as exception:
+                self._raise_service_error("set_temperature_failed", exception)
             self._target_temperature = temperature
             self.async_write_ha_state()  # Update the state immediately
 
@@ -163,11 +263,6 @@ class SleepmeClimate(CoordinatorEntity, ClimateEntity):
             )
             return HVACMode.OFF
 
-    @property
-    def preset_modes(self) -> list[str]:
-        """Return the list of available preset modes."""
-        return [PRESET_NONE, PRESET_MAX_HEAT, PRESET_MAX_COOL]
-
     @property
     def preset_mode(self) -> str | None:
         """Return the current preset mode."""
@@ -182,16 +277,25 @@ class SleepmeClimate(CoordinatorEntity, ClimateEntity):
         mode = "active" if hvac_mode == HVACMode.HEAT_COOL else "standby"
         LOGGER.debug(f"Setting HVAC mode to {mode}")
 
+        try:
+            await self.coordinator.async_set_device_mode(self.idx, mode)
+        except SleepmeApiClientError as exception:
+            self._raise_service_error("set_hvac_mode_failed", exception)
+
         if mode == "active":
             self._state = HVACMode.HEAT_COOL
         else:
             self._state = HVACMode.OFF
-
         self.async_write_ha_state()  # Update the state immediately
 
     async def async_update(self) -> None:
         """Update the climate entity."""
-        await self.coordinator.async_request_refresh()
+        try:
+            await self.coordinator.async_refresh_device(self.idx)
+        except SleepmeApiClientError as exception:
+            self._raise_service_error("refresh_failed", exception)
+        if self.idx not in self.coordinator.data:
+            return
         device_state = self.coordinator.data[self.idx]
         self._state = (
             device_state.get("control", {}).get("thermal_control_status") == "active"
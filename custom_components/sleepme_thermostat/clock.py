@@ -0,0 +1,36 @@
+"""Sleep.me clock module."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+
+class Clock:
+    """
+    Time source of the integration's rate limiting, retries and scheduling.
+
+    These only measure durations, so they use monotonic time, which clock
+    corrections of the host cannot step. Tests replace it with a fake clock.
+    """
+
+    def monotonic(self) -> float:
+        """Return the current monotonic time in seconds."""
+        return time.monotonic()
+
+    async def sleep(self, delay: float) -> None:
+        """Sleep for a number of seconds."""
+        await asyncio.sleep(delay)
+
+    def call_later(
+        self, delay: float, callback: Callable[[], None]
+    ) -> asyncio.TimerHandle:
+        """Call a function in the event loop after a number of seconds."""
+        return asyncio.get_running_loop().call_later(delay, callback)
+
+
+SYSTEM_CLOCK = Clock()
@@ -1,32 +1,75 @@
 """Adds config flow for Sleep.me."""
 
-from typing import Any
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
 
 import voluptuous as vol
 from homeassistant import config_entries
 from homeassistant.core import HomeAssistant, callback
-from homeassistant.helpers.aiohttp_client import async_create_clientsession
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers.selector import TimeSelector
 
-from .api import SleepmeApiClient, SleepmeApiClientError
 from .const import (
+    BINARY_SENSOR_TYPES,
     CONF_API_KEY,
-    CONF_DEVICES,
+    CONF_BEDTIME,
+    CONF_DISABLED_DEVICES,
+    CONF_DISABLED_SENSORS,
+    CONF_HEDGE_REQUESTS,
+    CONF_INTERPOLATE_TEMPERATURE,
+    CONF_PUBLISH_INTERVAL,
+    CONF_TEMPERATURE_DEADBAND,
     CONF_UPDATE_INTERVAL,
+    CONF_WAKE_TIME,
+    CONF_WATER_LEVEL_DEADBAND,
+    CONF_WATER_TEMPERATURE_C,
+    DEFAULT_PUBLISH_INTERVAL,
     DEFAULT_SCAN_INTERVAL,
     DOMAIN,
     PLATFORMS,
+    SENSOR_TYPES,
+)
+from .exceptions import (
+    SleepmeApiClientAuthenticationError,
+    SleepmeApiClientCommunicationError,
+    SleepmeApiClientError,
+    SleepmeApiClientRateLimitError,
 )
-from .data import SleepmeConfigEntry
+
+if TYPE_CHECKING:
+    from .data import SleepmeConfigEntry
 
 
 async def validate_api_key(hass: HomeAssistant, api_key: str) -> list[dict[str, Any]]:
-    """Validate the API key."""
-    try:
-        session = async_create_clientsession(hass)
-        client = SleepmeApiClient(api_key, session)
-        return await client.async_get_devices()
-    except Exception:  # noqa: BLE001
-        return []
+    """
+    Validate the API key, and return the devices of its account.
+
+    Failures raise the client's errors, without retrying, so the form can
+    tell them apart. The key is always checked against the API, and a
+    non-empty device list is cached for the setup of the entry.
+    """
+    # The client is only needed once the user submits the form
+    from .api import SleepmeApiClient  # noqa: PLC0415
+    from .validation_cache import async_get_validation_cache  # noqa: PLC0415
+
+    client = SleepmeApiClient(api_key, async_get_clientsession(hass), retry_policies={})
+    devices = await client.async_get_devices()
+    if devices:
+        async_get_validation_cache(hass).put(api_key, devices)
+    return devices
+
+
+def _validation_error(exception: SleepmeApiClientError) -> str:
+    """Return the form error of a failed validation."""
+    if isinstance(exception, SleepmeApiClientAuthenticationError):
+        return "auth"
+    if isinstance(exception, SleepmeApiClientRateLimitError):
+        return "rate_limited"
+    if isinstance(exception, SleepmeApiClientCommunicationError):
+        return "cannot_connect"
+    return "unknown"
 
 
 AUTH_SCHEMA = vol.Schema(
@@ -43,7 +86,7 @@ AUTH_SCHEMA = vol.Schema(
 class SleepmeFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
     """Config flow for Sleep.me."""
 
-    VERSION = 1
+    VERSION = 2
     CONNECTION_CLASS = config_entries.CONN_CLASS_CLOUD_POLL
 
     data: dict[str, Any] | None = None
@@ -61,24 +104,16 @@ class SleepmeFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
         if user_input is not None:
             try:
                 devices = await validate_api_key(self.hass, user_input[CONF_API_KEY])
+            except SleepmeApiClientError as exception:
+                errors["base"] = _validation_error(exception)
+            else:
                 if len(devices) > 0:
                     await self.async_set_unique_id(user_input[CONF_API_KEY])
                     return self.async_create_entry(title="Sleep.me", data=user_input)
-
                 errors["base"] = "no_devices"
-            except SleepmeApiClientError:
-                errors["base"] = "auth"
-            except Exception:  # noqa: BLE001
-                errors["base"] = "unknown"
-
-            if not errors:
-                self.data = user_input
-                self.data[CONF_DEVICES] = []
-
-            return await self.async_step_devices(user_input)
 
         return await self._show_config_form(
-            None,
+            user_input,
             errors=errors,
         )
 
@@ -100,6 +135,9 @@ class SleepmeFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
         if user_input:
             try:
                 devices = await validate_api_key(self.hass, user_input[CONF_API_KEY])
+            except SleepmeApiClientError as exception:
+                errors["base"] = _validation_error(exception)
+            else:
                 if len(devices) > 0:
                     await self.async_set_unique_id(user_input[CONF_API_KEY])
                     self._abort_if_unique_id_mismatch(reason="wrong_account")
@@ -108,8 +146,6 @@ class SleepmeFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
                         data_updates={**user_input, "devices": devices},
                     )
                 errors["base"] = "no_devices"
-            except SleepmeApiClientError:
-                errors["base"] = "cannot_connect"
 
         return self.async_show_form(
             step_id="reconfigure",
@@ -174,6 +210,9 @@ class SleepmeOptionsFlowHandler(config_entries.OptionsFlow):
     ) -> config_entries.ConfigFlowResult:
         """Handle a flow initialized by the user."""
         if user_input is not None:
+            # A cleared time is left out of the input, the schedule is learned
+            for x in (CONF_BEDTIME, CONF_WAKE_TIME):
+                self.options.pop(x, None)
             self.options.update(user_input)
             return await self._update_options()
 
@@ -181,12 +220,75 @@ class SleepmeOptionsFlowHandler(config_entries.OptionsFlow):
             step_id="user",
             data_schema=vol.Schema(
                 {
-                    vol.Required(x, default=self.options.get(x, True)): bool
-                    for x in sorted(PLATFORMS)
+                    vol.Required(
+                        CONF_UPDATE_INTERVAL,
+                        default=self.options.get(
+                            CONF_UPDATE_INTERVAL,
+                            self._config_entry.data.get(CONF_UPDATE_INTERVAL, 10),
+                        ),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=1)),
+                    **{
+                        vol.Required(x, default=self.options.get(x, True)): bool
+                        for x in sorted(PLATFORMS)
+                    },
+                    vol.Required(
+                        CONF_DISABLED_DEVICES,
+                        default=self.options.get(CONF_DISABLED_DEVICES, []),
+                    ): cv.multi_select(self._device_choices()),
+                    vol.Required(
+                        CONF_DISABLED_SENSORS,
+                        default=self.options.get(CONF_DISABLED_SENSORS, []),
+                    ): cv.multi_select(
+                        {
+                            key: name
+                            for key, name in (
+                                SENSOR_TYPES | BINARY_SENSOR_TYPES
+                            ).items()
+                            # Has an option of its own
+                            if key != CONF_WATER_TEMPERATURE_C
+                        }
+                    ),
+                    vol.Required(
+                        CONF_WATER_TEMPERATURE_C,
+                        default=self.options.get(CONF_WATER_TEMPERATURE_C, False),
+                    ): bool,
+                    vol.Required(
+                        CONF_INTERPOLATE_TEMPERATURE,
+                        default=self.options.get(CONF_INTERPOLATE_TEMPERATURE, False),
+                    ): bool,
+                    vol.Required(
+                        CONF_HEDGE_REQUESTS,
+                        default=self.options.get(CONF_HEDGE_REQUESTS, False),
+                    ): bool,
+                    **{
+                        vol.Required(x, default=self.options.get(x, 0)): vol.All(
+                            vol.Coerce(float), vol.Range(min=0)
+                        )
+                        for x in (CONF_TEMPERATURE_DEADBAND, CONF_WATER_LEVEL_DEADBAND)
+                    },
+                    vol.Required(
+                        CONF_PUBLISH_INTERVAL,
+                        default=self.options.get(
+                            CONF_PUBLISH_INTERVAL, DEFAULT_PUBLISH_INTERVAL
+                        ),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=1)),
+                    **{
+                        vol.Optional(
+                            x, description={"suggested_value": self.options.get(x)}
+                        ): TimeSelector()
+                        for x in (CONF_BEDTIME, CONF_WAKE_TIME)
+                    },
                 }
             ),
         )
 
+    def _device_choices(self) -> dict[str, str]:
+        """Return the names of the devices that can be disabled, by ID."""
+        choices = {x: x for x in self.options.get(CONF_DISABLED_DEVICES, [])}
+        if self._config_entry.state is config_entries.ConfigEntryState.LOADED:
+            choices.update(self._config_entry.runtime_data.coordinator.discovered)
+        return choices
+
     async def _update_options(self) -> config_entries.ConfigFlowResult:
         """Update config entry options."""
         return self.async_create_entry(title="Sleep.me", data=self.options)
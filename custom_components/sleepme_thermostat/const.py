@@ -1,11 +1,13 @@
 """Constants for Sleep.me."""
 
+from datetime import timedelta
 from logging import Logger, getLogger
 
 LOGGER: Logger = getLogger(__package__)
 
 # Base component constants
 NAME = "Sleep.me"
+MANUFACTURER = "SleepMe"
 VERSION = "0.0.1"
 DOMAIN = "sleepme_thermostat"
 
@@ -32,15 +34,83 @@ CONF_ENABLED = "enabled"
 CONF_API_KEY = "api_key"
 CONF_UPDATE_INTERVAL = "update_interval"
 CONF_DEVICES = "devices"
+CONF_WATER_TEMPERATURE_C = "water_temperature_c"
+CONF_INTERPOLATE_TEMPERATURE = "interpolate_temperature"
+CONF_BEDTIME = "bedtime"
+CONF_WAKE_TIME = "wake_time"
+CONF_HEDGE_REQUESTS = "hedge_requests"
+CONF_TEMPERATURE_DEADBAND = "temperature_deadband"
+CONF_WATER_LEVEL_DEADBAND = "water_level_deadband"
+CONF_PUBLISH_INTERVAL = "publish_interval"
+CONF_DISABLED_DEVICES = "disabled_devices"
+CONF_DISABLED_SENSORS = "disabled_sensors"
+
+# Sent with the entry ID once changed options are applied
+SIGNAL_OPTIONS_UPDATED = f"{DOMAIN}_options_updated_{{}}"
 
 # Defaults
 DEFAULT_NAME = DOMAIN
 DEFAULT_SCAN_INTERVAL = 5
+# Readings kept in memory per device, a day at the default scan interval
+HISTORY_SIZE = 288
+# Seconds of history used to estimate the water temperature trend
+RAMP_RATE_WINDOW = 1800
+# Degrees Fahrenheit from the target at which the water counts as arrived
+TARGET_TOLERANCE_F = 1
+# How often an interpolated water temperature is published between polls
+INTERPOLATION_INTERVAL = timedelta(minutes=1)
+
+# Schedule-aware polling
+DENSE_POLL_INTERVAL = timedelta(minutes=2)
+SPARSE_POLL_INTERVAL = timedelta(minutes=30)
+# Polls are dense this close to an expected on/off transition
+TRANSITION_WINDOW = timedelta(minutes=30)
+# Weight kept by earlier observations each time a transition is observed
+SCHEDULE_DECAY = 0.9
+# Weight at which a time slot counts as an expected transition
+SCHEDULE_THRESHOLD = 0.5
+SCHEDULE_STORAGE_VERSION = 1
+SCHEDULE_STORAGE_KEY = f"{DOMAIN}.{{}}.schedule"
+SCHEDULE_SAVE_DELAY = 60
+
+# Last device data, stored so the entities can be set up from it on startup
+DATA_STORAGE_VERSION = 1
+DATA_STORAGE_KEY = f"{DOMAIN}.{{}}.devices"
+DATA_SAVE_DELAY = 60
+
+# Seconds a device list fetched by the config flow is reused by the setup
+VALIDATION_CACHE_TTL = 60
+
+# Seconds a refresh of all devices may take, shared by its requests
+REFRESH_DEADLINE = 20
+
+# Failed refreshes in a row after which the cloud counts as offline
+OFFLINE_AFTER_FAILURES = 3
+# Least interval between refreshes once rate limited, and the longest backoff
+RATE_LIMIT_BACKOFF = timedelta(minutes=5)
+MAX_BACKOFF_INTERVAL = timedelta(minutes=60)
+
+# Disconnected devices are polled at growing intervals until they reconnect
+PROBE_MIN_INTERVAL = timedelta(minutes=5)
+PROBE_MAX_INTERVAL = timedelta(minutes=60)
+
+# Changes within a deadband are published after this many minutes at the latest
+DEFAULT_PUBLISH_INTERVAL = 30
+
+# Seconds after a command at which the device is refreshed until it confirms
+FOLLOW_UP_DELAYS = (5, 20, 60)
+
+MIN_TEMPERATURE_F = 55
+MAX_TEMPERATURE_F = 115
 
 SENSOR_TYPES = {
-    "water_temperature_f": "Water Temperature (F)",
+    "water_temperature": "Water Temperature",
     "water_temperature_c": "Water Temperature (C)",
     "water_level": "Water Level",
+    "ramp_rate": "Water Temperature Ramp Rate",
+    "time_to_target": "Time To Target",
+    "health": "Cloud Health",
+    "rate_limit_headroom": "Rate Limit Headroom",
 }
 
 BINARY_SENSOR_TYPES = {"is_water_low": "Is Water Low", "is_connected": "Connected"}
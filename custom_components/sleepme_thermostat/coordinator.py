@@ -2,17 +2,56 @@
 
 from __future__ import annotations
 
+import asyncio
 import json
 from typing import TYPE_CHECKING, Any
 
-import async_timeout
+from homeassistant.core import callback
 from homeassistant.exceptions import ConfigEntryAuthFailed
+from homeassistant.helpers import device_registry as dr
+from homeassistant.helpers.device_registry import (
+    CONNECTION_NETWORK_MAC,
+    DeviceInfo,
+    format_mac,
+)
+from homeassistant.helpers.storage import Store
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
+from homeassistant.util import dt as dt_util
 
-from .api import SleepmeApiClientAuthenticationError, SleepmeApiClientError
-from .const import LOGGER
+from .api import (
+    SleepmeApiClientAuthenticationError,
+    SleepmeApiClientError,
+    SleepmeApiClientRateLimitError,
+)
+from .clock import SYSTEM_CLOCK
+from .const import (
+    CONF_BEDTIME,
+    CONF_DISABLED_DEVICES,
+    CONF_WAKE_TIME,
+    DATA_SAVE_DELAY,
+    DATA_STORAGE_KEY,
+    DATA_STORAGE_VERSION,
+    DOMAIN,
+    FOLLOW_UP_DELAYS,
+    HISTORY_SIZE,
+    LOGGER,
+    MANUFACTURER,
+    REFRESH_DEADLINE,
+    SCHEDULE_SAVE_DELAY,
+    SCHEDULE_STORAGE_KEY,
+    SCHEDULE_STORAGE_VERSION,
+)
+from .data import SleepmeDeviceDetails
+from .deadline import Deadline
+from .health import SleepmeHealth
+from .history import SleepmeReadingHistory
+from .probe import SleepmeDeviceProbe
+from .schedule import SleepmePollingSchedule
 
 if TYPE_CHECKING:
+    from datetime import timedelta
+
+    from .clock import Clock
     from .data import SleepmeConfigEntry
 
 
@@ -23,12 +62,194 @@ class SleepmeDataUpdateCoordinator(DataUpdateCoordinator):
     config_entry: SleepmeConfigEntry
     _devices: list[dict]
 
+    def __init__(self, *args: Any, clock: Clock | None = None, **kwargs: Any) -> None:
+        """Initialize the coordinator."""
+        super().__init__(*args, **kwargs)
+        self.clock = clock or SYSTEM_CLOCK
+        self._device_details: dict[str, SleepmeDeviceDetails] = {}
+        self._device_info: dict[str, DeviceInfo] = {}
+        self.history: dict[str, SleepmeReadingHistory] = {}
+        # Whether the device list carries the device states; None until the
+        # devices are discovered
+        self._bulk_state: bool | None = None
+        # Device list fetched during setup, reused by the first refresh
+        self._pending_devices: list[dict] | None = None
+        self.schedule = SleepmePollingSchedule()
+        self._schedule_store: Store[dict[str, Any]] | None = None
+        self._base_update_interval = self.update_interval
+        self._follow_ups: dict[str, asyncio.Task] = {}
+        self.health = SleepmeHealth()
+        self._data_store: Store[dict[str, Any]] | None = None
+        # Timing of the config entry setup, for diagnostics
+        self.startup: dict[str, Any] = {}
+        # Disconnected devices that are only polled now and then
+        self.probes: dict[str, SleepmeDeviceProbe] = {}
+        # Devices whose data the last refresh reused without polling them
+        self.unchanged: set[str] = set()
+        # Names of all discovered devices, including the disabled ones
+        self.discovered: dict[str, str] = {}
+        self._discovered_devices: list[dict] = []
+
+    def get_device_info(self, device_id: str) -> DeviceInfo:
+        """
+        Return the shared device info for a device.
+
+        The same object is handed to every entity of the device, and is only
+        rebuilt when the device's identity or firmware details change.
+        """
+        details = SleepmeDeviceDetails.from_device_data(self.data[device_id])
+        if self._device_details.get(device_id) != details:
+            self._device_details[device_id] = details
+            self._device_info[device_id] = _build_device_info(device_id, details)
+        return self._device_info[device_id]
+
     async def async_set_device_mode(self, device_id: str, mode: str) -> None:
         """Set the device mode."""
         control = await self.config_entry.runtime_data.client.async_set_device_mode(
             device_id, mode
         )
         self.data[device_id]["control"] = control
+        self._schedule_follow_up(device_id, {"thermal_control_status": mode})
+
+    async def async_set_device_temperature(
+        self, device_id: str, temperature: float
+    ) -> None:
+        """Set the device target temperature."""
+        client = self.config_entry.runtime_data.client
+        control = await client.async_set_device_temperature(device_id, temperature)
+        self.data[device_id]["control"] = control
+        self._schedule_follow_up(device_id, {"set_temperature_f": temperature})
+
+    async def async_refresh_device(self, device_id: str) -> None:
+        """Fetch the state of a single device and update its entities."""
+        state = await self.config_entry.runtime_data.client.async_get_device_state(
+            device_id
+        )
+        if device_id not in self.data:
+            LOGGER.debug(f"Not updating {device_id}, it left the account")
+            return
+        data = {**self.data[device_id], **state}
+        self.get_history(device_id).append(dt_util.utcnow().timestamp(), data)
+        self.data = {**self.data, device_id: data}
+        self._update_probes({device_id: data})
+        self.unchanged.discard(device_id)
+        self.async_update_listeners()
+
+    def _schedule_follow_up(self, device_id: str, expected: dict[str, Any]) -> None:
+        """Refresh a device after a command until it reports the new control."""
+        if (task := self._follow_ups.pop(device_id, None)) is not None:
+            task.cancel()
+        self._follow_ups[device_id] = self.config_entry.async_create_background_task(
+            self.hass,
+            self._async_follow_up(device_id, expected),
+            f"{DOMAIN} follow-up refresh of {device_id}",
+        )
+
+    async def _async_follow_up(self, device_id: str, expected: dict[str, Any]) -> None:
+        """Refresh a device at increasing delays until the command is confirmed."""
+        elapsed = 0
+        try:
+            for delay in FOLLOW_UP_DELAYS:
+                await self.clock.sleep(delay - elapsed)
+                elapsed = delay
+                try:
+                    await self.async_refresh_device(device_id)
+                except SleepmeApiClientError as exception:
+                    LOGGER.debug(
+                        f"Follow-up refresh of {device_id} failed: {exception}"
+                    )
+                    continue
+
+                if device_id not in self.data:
+                    LOGGER.debug(f"Device {device_id} left the account")
+                    return
+                control = self.data[device_id].get("control") or {}
+                if all(control.get(key) == value for key, value in expected.items()):
+                    LOGGER.debug(f"Device {device_id} confirmed {expected}")
+                    return
+
+            LOGGER.debug(f"Device {device_id} did not confirm {expected}")
+        finally:
+            if self._follow_ups.get(device_id) is asyncio.current_task():
+                del self._follow_ups[device_id]
+
+    async def async_load_cached_data(self) -> bool:
+        """
+        Start from the device data stored by the last run, if any.
+
+        This lets the entities be set up without waiting for the cloud; the
+        data stays marked as stale until the first successful refresh. The
+        readings are not added to the history, their time is not known.
+        """
+        self._data_store = Store(
+            self.hass,
+            DATA_STORAGE_VERSION,
+            DATA_STORAGE_KEY.format(self.config_entry.entry_id),
+        )
+        if not (cached := await self._data_store.async_load()):
+            return False
+
+        # Used until the device list is fetched
+        self._devices = self._enabled_devices(
+            [
+                {"id": device_id, "name": data.get("name", device_id)}
+                for device_id, data in cached.items()
+            ]
+        )
+        cached = {device["id"]: cached[device["id"]] for device in self._devices}
+        self.data = cached
+        LOGGER.debug(f"Starting from cached data of {list(cached)}")
+        return True
+
+    async def async_refresh_cached(self) -> None:
+        """Set up and refresh the coordinator after starting from cached data."""
+        try:
+            await self._async_setup()
+        except SleepmeApiClientAuthenticationError as exception:
+            self.health.record_failure(str(exception), auth_failed=True)
+            self.async_update_listeners()
+            self.config_entry.async_start_reauth(self.hass)
+            return
+        except SleepmeApiClientError as exception:
+            # The first refresh polls the cached devices, the following ones
+            # try discovery again until it works
+            LOGGER.warning(f"Error discovering devices: {exception}")
+            self._pending_devices = self._devices
+        await self.async_refresh()
+
+    @callback
+    def async_update_options(self, update_interval: timedelta) -> None:
+        """
+        Apply changed options to the running coordinator.
+
+        The polling interval and fixed schedule times apply from now on.
+        Disabled devices are dropped from the data, while enabled ones that
+        have no data yet are polled with the next refresh, which is brought
+        forward for them.
+        """
+        self._base_update_interval = update_interval
+        self._set_fixed_times()
+
+        devices = self._enabled_devices(self._discovered_devices)
+        enabled = {device["id"] for device in devices}
+        self._devices = devices
+        if self._pending_devices is not None:
+            self._pending_devices = devices
+        self.data = {
+            device_id: data
+            for device_id, data in self.data.items()
+            if device_id in enabled
+        }
+        if self.health.stale:
+            self._schedule_backoff()
+        else:
+            self._schedule_next_poll(self.data)
+        self._schedule_refresh()
+
+        if enabled - self.data.keys():
+            self.config_entry.async_create_background_task(
+                self.hass, self.async_request_refresh(), f"{DOMAIN} enabled devices"
+            )
 
     async def _async_setup(self) -> None:
         """
@@ -40,30 +261,309 @@ class SleepmeDataUpdateCoordinator(DataUpdateCoordinator):
         This method will be called automatically during
         coordinator.async_config_entry_first_refresh.
         """
-        self._devices = await self.config_entry.runtime_data.client.async_get_devices()
+        # Discovery does not wait for the schedule to load from disk
+        _, self._pending_devices = await asyncio.gather(
+            self._async_load_schedule(),
+            self._async_discover(Deadline(REFRESH_DEADLINE, self.clock)),
+        )
+
+    async def _async_discover(self, deadline: Deadline) -> list[dict]:
+        """Fetch the device list, and whether it carries the device states."""
+        devices = await self.config_entry.runtime_data.client.async_get_devices(
+            deadline
+        )
+        self._bulk_state = any(_has_state(device) for device in devices)
+        self._devices = self._enabled_devices(devices)
 
         LOGGER.debug(f"Devices: {[device['name'] for device in self._devices]}")
+        LOGGER.debug(f"Device list carries device states: {self._bulk_state}")
+        return self._devices
 
     async def _async_update_data(self) -> Any:
         """Update data via library."""
+        self.unchanged = set()
         try:
-            api = self.config_entry.runtime_data.client
-            results = {}
-            # Note: asyncio.TimeoutError and aiohttp.ClientError are already
-            # handled by the data update coordinator.
-            async with async_timeout.timeout(10):
-                for device in self._devices:
-                    device_id = device["id"]
-                    data = await api.async_get_device_state(device_id)
-                    results[device_id] = {**device, **data}
-                    LOGGER.debug(
-                        f"Device {device['name']} state: "
-                        f"{json.dumps(results[device_id], indent=2)}"
-                    )
+            # Every request gets the time left of the refresh's deadline
+            deadline = Deadline(REFRESH_DEADLINE, self.clock)
+            devices = await self._async_get_device_list(deadline)
+            results, unchanged = await self._async_poll_devices(devices, deadline)
+
+            for device in devices:
+                LOGGER.debug(
+                    f"Device {device['name']} state: "
+                    f"{json.dumps(results[device['id']], indent=2)}"
+                )
         except SleepmeApiClientAuthenticationError as exception:
+            self.health.record_failure(str(exception), auth_failed=True)
             raise ConfigEntryAuthFailed(exception) from exception
         except SleepmeApiClientError as exception:
-            LOGGER.error(f"Error fetching data: {exception}")
+            self.health.record_failure(
+                str(exception),
+                rate_limited=isinstance(exception, SleepmeApiClientRateLimitError),
+            )
+            self._schedule_backoff()
+            if self.data is not None and self.health.available:
+                # Keep the entities available on the last known data
+                LOGGER.warning(
+                    f"Error fetching data, keeping the last data "
+                    f"({self.health.state}): {exception}"
+                )
+                return self.data
+            LOGGER.error(f"Error fetching data ({self.health.state}): {exception}")
             raise
         else:
+            if self.health.stale:
+                LOGGER.info("Sleep.me cloud recovered")
+            self.health.record_success(dt_util.utcnow())
+            if self._data_store is not None:
+                self._data_store.async_delay_save(lambda: self.data, DATA_SAVE_DELAY)
+            self.unchanged = unchanged
+            polled = {
+                device_id: data
+                for device_id, data in results.items()
+                if device_id not in unchanged
+            }
+            self._async_update_device_registry(polled)
+            self._record_transitions(polled)
+            self._record_history(polled)
+            self._schedule_next_poll(results)
             return results
+
+    async def _async_poll_devices(
+        self, devices: list[dict], deadline: Deadline
+    ) -> tuple[dict[str, dict], set[str]]:
+        """
+        Return the data of the listed devices, and those that were not polled.
+
+        Devices whose state the list carries need no request of their own,
+        and disconnected devices are only polled once their probe is due.
+        Every state that was not reused updates the probes, whether it came
+        from the list or a request of its own.
+        """
+        results = {}
+        unchanged = set()
+        fetched = []
+        now = self.clock.monotonic()
+        for device in devices:
+            device_id = device["id"]
+            previous = (self.data or {}).get(device_id, {})
+            probe = self.probes.get(device_id)
+            if _has_state(device) and ("about" in device or previous):
+                # The about data rarely changes, keep the last known
+                results[device_id] = {
+                    "about": previous.get("about", {}),
+                    **device,
+                }
+            elif probe is not None and previous and not probe.due(now):
+                # Still disconnected as far as is known
+                results[device_id] = previous
+                unchanged.add(device_id)
+            else:
+                fetched.append(device)
+
+        # The remaining devices are fetched concurrently, and every
+        # request is awaited so none outlives a failed refresh
+        api = self.config_entry.runtime_data.client
+        states = await asyncio.gather(
+            *(api.async_get_device_state(device["id"], deadline) for device in fetched),
+            return_exceptions=True,
+        )
+        for device, state in zip(fetched, states, strict=True):
+            if isinstance(state, BaseException):
+                raise state
+            results[device["id"]] = {**device, **state}
+
+        self._update_probes(
+            {
+                device_id: data
+                for device_id, data in results.items()
+                if device_id not in unchanged
+            }
+        )
+        # Devices that left the list are no longer probed
+        for device_id in self.probes.keys() - results.keys():
+            del self.probes[device_id]
+        return results, unchanged
+
+    async def _async_load_schedule(self) -> None:
+        """Load the learned polling schedule and the user's fixed times."""
+        self._schedule_store = Store(
+            self.hass,
+            SCHEDULE_STORAGE_VERSION,
+            SCHEDULE_STORAGE_KEY.format(self.config_entry.entry_id),
+        )
+        if stored := await self._schedule_store.async_load():
+            self.schedule = SleepmePollingSchedule.from_dict(stored)
+
+        self._set_fixed_times()
+
+    def _set_fixed_times(self) -> None:
+        """Pass the user's fixed on/off times to the schedule."""
+        options = self.config_entry.options
+        self.schedule.set_fixed_times(
+            parsed
+            for key in (CONF_BEDTIME, CONF_WAKE_TIME)
+            if (value := options.get(key))
+            and (parsed := dt_util.parse_time(value)) is not None
+        )
+
+    def _record_transitions(self, results: dict[str, dict]) -> None:
+        """Learn the polling schedule from on/off transitions of the devices."""
+        now = dt_util.now()
+        observed = False
+        for device_id, data in results.items():
+            latest = self.get_history(device_id).latest()
+            active = _is_active(data)
+            if latest is not None and latest.active != active:
+                LOGGER.debug(f"Device {device_id} turned {'on' if active else 'off'}")
+                self.schedule.record_transition(now)
+                observed = True
+
+        if observed and self._schedule_store is not None:
+            self._schedule_store.async_delay_save(
+                self.schedule.as_dict, SCHEDULE_SAVE_DELAY
+            )
+
+    def _schedule_next_poll(self, results: dict[str, dict]) -> None:
+        """Adapt the polling interval to the time of day."""
+        interval = self.schedule.next_interval(
+            dt_util.now(),
+            self._base_update_interval,
+            active=any(_is_active(data) for data in results.values()),
+        )
+        if interval != self.update_interval:
+            LOGGER.debug(f"Next poll in {interval}")
+            self.update_interval = interval
+
+    def _update_probes(self, polled: dict[str, dict]) -> None:
+        """Start, back off or end the probes of polled devices."""
+        now = self.clock.monotonic()
+        for device_id, data in polled.items():
+            connected = (data.get("status") or {}).get("is_connected", True)
+            probe = self.probes.get(device_id)
+            if connected:
+                if self.probes.pop(device_id, None) is not None:
+                    LOGGER.info(f"Device {device_id} reconnected, polling it again")
+            elif probe is None:
+                LOGGER.info(f"Device {device_id} disconnected, probing it now and then")
+                self.probes[device_id] = SleepmeDeviceProbe(now)
+            else:
+                probe.record_disconnected(now)
+                LOGGER.debug(
+                    f"Device {device_id} still disconnected, "
+                    f"next probe in {probe.interval:.0f}s"
+                )
+
+    def _schedule_backoff(self) -> None:
+        """Back off from a failing cloud, as the health state allows."""
+        if self._base_update_interval is None:
+            return
+        interval = self.health.next_interval(self._base_update_interval)
+        if interval != self.update_interval:
+            LOGGER.debug(f"Next poll in {interval} ({self.health.state})")
+            self.update_interval = interval
+
+    async def _async_get_device_list(self, deadline: Deadline) -> list[dict]:
+        """
+        Return the devices to refresh.
+
+        While the device list carries the device states, it is fetched on
+        every refresh so a single request covers all devices. Otherwise the
+        list from setup is used and every device is fetched on its own.
+        After starting from cached data without discovering the devices,
+        discovery is tried again, and the cached devices are polled until
+        it works.
+        """
+        if self._pending_devices is not None:
+            devices, self._pending_devices = self._pending_devices, None
+            return devices
+        if self._bulk_state is None:
+            try:
+                return await self._async_discover(deadline)
+            except SleepmeApiClientAuthenticationError:
+                raise
+            except SleepmeApiClientError as exception:
+                LOGGER.debug(f"Error discovering devices again: {exception}")
+                return self._devices
+        if not self._bulk_state:
+            return self._devices
+
+        devices = await self.config_entry.runtime_data.client.async_get_devices(
+            deadline
+        )
+        if not any(_has_state(device) for device in devices):
+            LOGGER.debug("Device list no longer carries device states")
+            self._bulk_state = False
+        self._devices = self._enabled_devices(devices)
+        return self._devices
+
+    def _enabled_devices(self, devices: list[dict]) -> list[dict]:
+        """Note the discovered devices, and return those not disabled."""
+        self._discovered_devices = devices
+        self.discovered = {device["id"]: device["name"] for device in devices}
+        disabled = self._disabled_devices()
+        return [device for device in devices if device["id"] not in disabled]
+
+    def _disabled_devices(self) -> set[str]:
+        """Return the IDs of the devices disabled in the options."""
+        return set(self.config_entry.options.get(CONF_DISABLED_DEVICES, []))
+
+    def get_history(self, device_id: str) -> SleepmeReadingHistory:
+        """Return the reading history of a device."""
+        if device_id not in self.history:
+            self.history[device_id] = SleepmeReadingHistory(HISTORY_SIZE)
+        return self.history[device_id]
+
+    def _record_history(self, results: dict[str, dict]) -> None:
+        """Append the fetched readings to the per-device history."""
+        timestamp = dt_util.utcnow().timestamp()
+        for device_id, data in results.items():
+            self.get_history(device_id).append(timestamp, data)
+
+    def _async_update_device_registry(self, results: dict[str, dict]) -> None:
+        """Push changed device details of already known devices to the registry."""
+        registry = dr.async_get(self.hass)
+        for device_id, data in results.items():
+            known = self._device_details.get(device_id)
+            details = SleepmeDeviceDetails.from_device_data(data)
+            if known is None or known == details:
+                continue
+
+            self._device_details[device_id] = details
+            self._device_info[device_id] = _build_device_info(device_id, details)
+            device = registry.async_get_device(identifiers={(DOMAIN, device_id)})
+            if device is not None:
+                LOGGER.debug(f"Updating device registry entry for {device_id}")
+                registry.async_update_device(
+                    device.id,
+                    model=details.model,
+                    serial_number=details.serial_number,
+                    sw_version=details.firmware_version,
+                )
+
+
+def _is_active(data: dict) -> bool:
+    """Return True if a device's thermal control is active."""
+    return (data.get("control") or {}).get("thermal_control_status") == "active"
+
+
+def _has_state(device: dict) -> bool:
+    """Return True if a device list entry carries the device state."""
+    return bool(device.get("status")) and bool(device.get("control"))
+
+
+def _build_device_info(device_id: str, details: SleepmeDeviceDetails) -> DeviceInfo:
+    """Build the device registry info for a device."""
+    device_info = DeviceInfo(
+        identifiers={(DOMAIN, device_id)},
+        name=details.name,
+        manufacturer=MANUFACTURER,
+        model=details.model,
+        serial_number=details.serial_number,
+        sw_version=details.firmware_version,
+    )
+    if details.mac_address:
+        device_info["connections"] = {
+            (CONNECTION_NETWORK_MAC, format_mac(details.mac_address))
+        }
+    return device_info
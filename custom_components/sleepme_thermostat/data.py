@@ -2,11 +2,14 @@
 
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import TYPE_CHECKING
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any
 
 if TYPE_CHECKING:
+    from collections.abc import Callable
+
     from homeassistant.config_entries import ConfigEntry
+    from homeassistant.const import Platform
     from homeassistant.loader import Integration
 
     from .api import SleepmeApiClient
@@ -23,3 +26,30 @@ class SleepmeData:
     client: SleepmeApiClient
     coordinator: SleepmeDataUpdateCoordinator
     integration: Integration
+    # Platforms set up for the entry, and to unload
+    platforms: list[Platform]
+    # Stop the entity tracking of a set up platform, see async_track_entities
+    trackers: dict[Platform, Callable[[], None]] = field(default_factory=dict)
+
+
+@dataclass(frozen=True, slots=True)
+class SleepmeDeviceDetails:
+    """Identity and firmware details of a Sleep.me device."""
+
+    name: str | None
+    model: str | None
+    serial_number: str | None
+    mac_address: str | None
+    firmware_version: str | None
+
+    @classmethod
+    def from_device_data(cls, data: dict[str, Any]) -> SleepmeDeviceDetails:
+        """Build the details from a device's coordinator data."""
+        about = data.get("about") or {}
+        return cls(
+            name=data.get("name"),
+            model=about.get("model"),
+            serial_number=about.get("serial_number"),
+            mac_address=about.get("mac_address"),
+            firmware_version=about.get("firmware_version"),
+        )
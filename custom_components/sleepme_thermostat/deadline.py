@@ -0,0 +1,38 @@
+"""Sleep.me request deadline module."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from .clock import SYSTEM_CLOCK
+
+if TYPE_CHECKING:
+    from .clock import Clock
+
+
+class Deadline:
+    """
+    Time budget shared by the requests of a single operation.
+
+    Every request gets the time that is left of the budget, so one slow
+    request cannot push the operation past its deadline.
+    """
+
+    def __init__(self, timeout: float, clock: Clock | None = None) -> None:
+        """Initialize the deadline."""
+        self.timeout = timeout
+        self._clock = clock or SYSTEM_CLOCK
+        self._expires_at = self._clock.monotonic() + timeout
+
+    @property
+    def expired(self) -> bool:
+        """Return True once no time is left."""
+        return self.remaining() <= 0
+
+    def remaining(self) -> float:
+        """Return the seconds left until the deadline."""
+        return max(self._expires_at - self._clock.monotonic(), 0.0)
+
+    def allows(self, duration: float) -> bool:
+        """Return True if an attempt of a duration still fits the budget."""
+        return self.remaining() >= duration
@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+from dataclasses import asdict
 from typing import TYPE_CHECKING, Any
 
 from homeassistant.components.diagnostics import async_redact_data
@@ -22,4 +23,24 @@ async def async_get_config_entry_diagnostics(
         "config_entry": async_redact_data(entry.as_dict(), TO_REDACT),
     }
 
+    if (runtime_data := getattr(entry, "runtime_data", None)) is not None:
+        coordinator = runtime_data.coordinator
+        diagnostic_data["history"] = {
+            device_id: history.as_dict()
+            for device_id, history in coordinator.history.items()
+        }
+        diagnostic_data["polling"] = {
+            "update_interval": str(coordinator.update_interval),
+            "schedule": coordinator.schedule.as_dict(),
+        }
+        diagnostic_data["startup"] = coordinator.startup
+        diagnostic_data["health"] = coordinator.health.as_dict()
+        now = coordinator.clock.monotonic()
+        diagnostic_data["probes"] = {
+            device_id: probe.as_dict(now)
+            for device_id, probe in coordinator.probes.items()
+        }
+        diagnostic_data["requests"] = asdict(runtime_data.client.statistics)
+        diagnostic_data["rate_limit"] = runtime_data.client.rate_limiter.as_dict()
+
     return diagnostic_data
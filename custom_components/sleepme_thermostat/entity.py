@@ -1,74 +1,206 @@
 """Sleep.me Entity class."""
 
-from typing import Any
+from __future__ import annotations
 
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.device_registry import DeviceEntryType, DeviceInfo
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
-from .const import ATTRIBUTION, DOMAIN, NAME
-from .coordinator import SleepmeDataUpdateCoordinator
-from .data import SleepmeConfigEntry
+from .const import (
+    ATTRIBUTION,
+    CONF_PUBLISH_INTERVAL,
+    DEFAULT_PUBLISH_INTERVAL,
+    DOMAIN,
+    MANUFACTURER,
+    NAME,
+    SIGNAL_OPTIONS_UPDATED,
+)
+from .throttle import SleepmeStateThrottle
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from homeassistant.helpers.entity_platform import AddEntitiesCallback
+
+    from .coordinator import SleepmeDataUpdateCoordinator
+    from .data import SleepmeConfigEntry
+
+
+@callback
+def async_track_entities(
+    hass: HomeAssistant,
+    config_entry: SleepmeConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+    build_entities: Callable[[], list[SleepmeEntity | SleepmeAccountEntity]],
+) -> Callable[[], None]:
+    """
+    Add the entities of a platform, and keep them in line with the options.
+
+    Whenever the options or the devices change, the entities are built again
+    from the options: new ones are added, and the kept ones apply the changed
+    options. Entities that are no longer wanted are removed.
+
+    Returns the function that stops the tracking, to be called when the
+    platform is unloaded, which may happen without unloading the entry.
+    """
+    coordinator = config_entry.runtime_data.coordinator
+    entities = {entity.unique_id: entity for entity in build_entities()}
+    async_add_entities(list(entities.values()))
+    devices = set(coordinator.data)
+
+    @callback
+    def _async_sync(*, options_updated: bool) -> None:
+        wanted = {entity.unique_id: entity for entity in build_entities()}
+        for unique_id in entities.keys() - wanted.keys():
+            config_entry.async_create_task(
+                hass, entities.pop(unique_id).async_remove(force_remove=True)
+            )
+        if options_updated:
+            for entity in entities.values():
+                entity.async_options_updated()
+        added = [wanted[x] for x in wanted.keys() - entities.keys()]
+        entities.update((entity.unique_id, entity) for entity in added)
+        async_add_entities(added)
 
+    @callback
+    def _async_options_updated() -> None:
+        nonlocal devices
+        devices = set(coordinator.data)
+        _async_sync(options_updated=True)
 
-class SleepmeEntity(CoordinatorEntity):
-    """Sleep.me Entity base class."""
+    @callback
+    def _async_coordinator_updated() -> None:
+        nonlocal devices
+        if devices != coordinator.data.keys():
+            devices = set(coordinator.data)
+            _async_sync(options_updated=False)
+
+    unsubscribes = [
+        async_dispatcher_connect(
+            hass,
+            SIGNAL_OPTIONS_UPDATED.format(config_entry.entry_id),
+            _async_options_updated,
+        ),
+        coordinator.async_add_listener(_async_coordinator_updated),
+    ]
+
+    @callback
+    def _async_stop() -> None:
+        for unsubscribe in unsubscribes:
+            unsubscribe()
+
+    return _async_stop
+
+
+# The coordinator is only named, so the platforms do not load it and the
+# API client along with them
+class SleepmeEntity(CoordinatorEntity["SleepmeDataUpdateCoordinator"]):
+    """Sleep.me Entity base class for all entities of a single device."""
+
+    # What the last written state was built from, see _state_snapshot
+    _written_snapshot: tuple[Any, ...] | None = None
 
     def __init__(
         self,
         coordinator: SleepmeDataUpdateCoordinator,
-        config_entry: SleepmeConfigEntry,
+        idx: str,
     ) -> None:
         """Initialize the entity."""
         super().__init__(coordinator)
-        self.config_entry = config_entry
+        self.idx = idx
+        self._attr_device_info = coordinator.get_device_info(idx)
 
-    @property
-    def unique_id(self) -> str:
-        """Return a unique ID to use for this entity."""
-        return self.config_entry.entry_id
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """
+        Write the state, unless it would be the same as before.
+
+        That is the case when the device's data was reused unpolled, or
+        when a throttle held back everything the state is built from.
+        """
+        if self.idx in self.coordinator.unchanged:
+            return
+        snapshot = self._state_snapshot()
+        if snapshot is not None and snapshot == self._written_snapshot:
+            return
+        super()._handle_coordinator_update()
+
+    @callback
+    def async_write_ha_state(self) -> None:
+        """Write the state, and note what it was built from."""
+        self._written_snapshot = self._state_snapshot()
+        super().async_write_ha_state()
+
+    def _state_snapshot(self) -> tuple[Any, ...] | None:
+        """Return what the state is built from, None to write it on every update."""
+        return None
+
+    @callback
+    def async_options_updated(self) -> None:
+        """Apply changed options of the config entry."""
+
+    def _state_throttle(
+        self, deadband_option: str, value: float | None, scale: float = 1.0
+    ) -> SleepmeStateThrottle | None:
+        """Return a throttle for a reading, if its deadband option is set."""
+        options = self.coordinator.config_entry.options
+        if not (deadband := options.get(deadband_option)):
+            return None
+        interval = options.get(CONF_PUBLISH_INTERVAL, DEFAULT_PUBLISH_INTERVAL)
+        throttle = SleepmeStateThrottle(deadband * scale, interval * 60)
+        throttle.update(value, self.coordinator.clock.monotonic())
+        return throttle
 
     @property
-    def device_info(self) -> dict[str, Any]:
-        """Return device information."""
-        data = self.coordinator.data[self.config_entry.entry_id]
-        about_data = data.get("about")
-        control_data = data.get("control")
-        return {
-            "identifiers": {(DOMAIN, self.unique_id)},
-            "name": NAME,
-            "model": about_data.get("model"),
-            "manufacturer": NAME,
-            "serial_number": about_data.get("serial_number"),
-            "mac_address": about_data.get("mac_address"),
-            "lan_address": about_data.get("lan_address"),
-            "ip_address": about_data.get("ip_address"),
-            "firmware_version": about_data.get("firmware_version"),
-            "time_zone": control_data.get("time_zone"),
-        }
+    def available(self) -> bool:
+        """Return True while the coordinator has data of the device to show."""
+        # A device that left the account has no data until its entities are
+        # removed
+        return (
+            super().available
+            and self.coordinator.health.available
+            and self.idx in self.coordinator.data
+        )
 
     @property
     def device_state_attributes(self) -> dict[str, Any]:
         """Return the state attributes."""
-        data = self.coordinator.data[self.config_entry.entry_id]
+        data = self.coordinator.data[self.idx]
         status_data = data.get("status")
         return {
             "attribution": ATTRIBUTION,
-            "id": self.config_entry.entry_id,
+            "id": self.idx,
             "integration": DOMAIN,
             "brightness_level": status_data.get("brightness_level"),
         }
 
-    async def async_turn_on(self) -> None:
-        """
-        Turn the device on.
 
-        This method should be implemented by subclasses.
-        """
-        await self.coordinator.async_request_refresh()
+class SleepmeAccountEntity(CoordinatorEntity["SleepmeDataUpdateCoordinator"]):
+    """
+    Sleep.me Entity base class for the entities of the whole account.
 
-    async def async_turn_off(self) -> None:
-        """
-        Turn the device off.
+    There is one of each per config entry, on a service device of its own,
+    however many devices the account has.
+    """
 
-        This method should be implemented by subclasses.
-        """
-        await self.coordinator.async_request_refresh()
+    def __init__(self, coordinator: SleepmeDataUpdateCoordinator) -> None:
+        """Initialize the entity."""
+        super().__init__(coordinator)
+        self._attr_device_info = DeviceInfo(
+            identifiers={(DOMAIN, coordinator.config_entry.entry_id)},
+            name=NAME,
+            manufacturer=MANUFACTURER,
+            entry_type=DeviceEntryType.SERVICE,
+        )
+
+    @callback
+    def async_options_updated(self) -> None:
+        """Apply changed options of the config entry."""
+
+    @property
+    def available(self) -> bool:
+        """Return True, the account's state is known even while the cloud is not."""
+        return True
@@ -0,0 +1,23 @@
+"""Sleep.me API exceptions module."""
+
+
+class SleepmeApiClientError(Exception):
+    """Exception to indicate a general API error."""
+
+
+class SleepmeApiClientCommunicationError(
+    SleepmeApiClientError,
+):
+    """Exception to indicate a communication error."""
+
+
+class SleepmeApiClientAuthenticationError(
+    SleepmeApiClientError,
+):
+    """Exception to indicate an authentication error."""
+
+
+class SleepmeApiClientRateLimitError(
+    SleepmeApiClientError,
+):
+    """Exception to indicate a rate limit error."""
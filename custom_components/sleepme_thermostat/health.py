@@ -0,0 +1,98 @@
+"""Sleep.me connection health module."""
+
+from __future__ import annotations
+
+from enum import StrEnum
+from typing import TYPE_CHECKING, Any
+
+from .const import MAX_BACKOFF_INTERVAL, OFFLINE_AFTER_FAILURES, RATE_LIMIT_BACKOFF
+
+if TYPE_CHECKING:
+    from datetime import datetime, timedelta
+
+
+class HealthState(StrEnum):
+    """Health of the connection to the Sleep.me cloud."""
+
+    HEALTHY = "healthy"
+    DEGRADED = "degraded"
+    RATE_LIMITED = "rate_limited"
+    AUTH_FAILED = "auth_failed"
+    OFFLINE = "offline"
+
+
+class SleepmeHealth:
+    """
+    Health state machine driven by the outcome of every refresh.
+
+    A successful refresh is always healthy. Failed refreshes are degraded
+    while the last data is recent enough to serve, rate limited when the
+    cloud rejected the requests, and offline after several failures in a
+    row. The last data is served, marked as stale, in all of these states.
+    Invalid credentials stay failed until the entry is reauthenticated.
+    Until the first successful refresh the data can only be cached.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the health."""
+        self.state = HealthState.HEALTHY
+        self.consecutive_failures = 0
+        self.last_success: datetime | None = None
+        self.last_error: str | None = None
+
+    @property
+    def available(self) -> bool:
+        """Return True while the data can be shown, even if cached."""
+        return self.state is not HealthState.AUTH_FAILED
+
+    @property
+    def stale(self) -> bool:
+        """Return True if the data is not from the last refresh, or cached."""
+        return self.state is not HealthState.HEALTHY or self.last_success is None
+
+    def record_success(self, now: datetime) -> None:
+        """Record a successful refresh."""
+        self.state = HealthState.HEALTHY
+        self.consecutive_failures = 0
+        self.last_success = now
+        self.last_error = None
+
+    def record_failure(
+        self, error: str, *, rate_limited: bool = False, auth_failed: bool = False
+    ) -> None:
+        """Record a failed refresh."""
+        self.consecutive_failures += 1
+        self.last_error = error
+        if auth_failed:
+            self.state = HealthState.AUTH_FAILED
+        elif rate_limited:
+            self.state = HealthState.RATE_LIMITED
+        elif self.consecutive_failures >= OFFLINE_AFTER_FAILURES:
+            self.state = HealthState.OFFLINE
+        else:
+            self.state = HealthState.DEGRADED
+
+    def next_interval(self, base: timedelta) -> timedelta:
+        """
+        Return the interval until the next refresh.
+
+        Every failure in a row doubles the interval up to a maximum, so a
+        failing cloud does not spend more of the rate limit. The base
+        interval is never shortened.
+        """
+        if self.state in (HealthState.HEALTHY, HealthState.AUTH_FAILED):
+            return base
+        backoff = base * 2 ** (self.consecutive_failures - 1)
+        if self.state is HealthState.RATE_LIMITED:
+            backoff = max(backoff, RATE_LIMIT_BACKOFF)
+        return max(base, min(backoff, MAX_BACKOFF_INTERVAL))
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the health for diagnostics and state attributes."""
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "last_success": self.last_success and self.last_success.isoformat(),
+            "last_error": self.last_error,
+            "stale": self.stale,
+        }
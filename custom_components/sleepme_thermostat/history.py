@@ -0,0 +1,272 @@
+"""Sleep.me reading history module."""
+
+from __future__ import annotations
+
+import math
+from array import array
+from dataclasses import asdict, dataclass
+from typing import Any
+
+FIELDS = ("water_temperature_f", "set_temperature_f", "water_level")
+
+
+@dataclass(frozen=True, slots=True)
+class SleepmeReading:
+    """A single reading of a Sleep.me device."""
+
+    timestamp: float
+    water_temperature_f: float
+    set_temperature_f: float
+    water_level: float
+    active: bool
+
+
+@dataclass(frozen=True, slots=True)
+class SleepmeWindowStatistics:
+    """Statistics of a single field over a window of readings."""
+
+    count: int
+    minimum: float | None
+    maximum: float | None
+    mean: float | None
+
+
+def _as_float(value: Any) -> float:
+    """Return the value as float, using NaN for missing values."""
+    if value is None:
+        return math.nan
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return math.nan
+
+
+def _as_optional(value: float) -> float | None:
+    """Return None for NaN values."""
+    return None if math.isnan(value) else value
+
+
+def _same(first: float, second: float) -> bool:
+    """Return True if two values are equal, treating NaN as equal to NaN."""
+    return first == second or (math.isnan(first) and math.isnan(second))
+
+
+class SleepmeReadingHistory:
+    """
+    Fixed-size ring buffer of recent readings of a single device.
+
+    Each field is stored in its own preallocated array, so appending is O(1)
+    and memory stays bounded by the capacity regardless of uptime.
+    """
+
+    def __init__(self, capacity: int) -> None:
+        """Initialize the history."""
+        if capacity < 1:
+            msg = "History capacity must be at least 1"
+            raise ValueError(msg)
+        self.capacity = capacity
+        self._timestamps = array("d", [math.nan]) * capacity
+        self._values = {field: array("d", [math.nan]) * capacity for field in FIELDS}
+        self._active = array("b", [0]) * capacity
+        self._next = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        """Return the number of stored readings."""
+        return self._size
+
+    def append(self, timestamp: float, data: dict[str, Any]) -> None:
+        """Append a reading from a device's coordinator data."""
+        status = data.get("status") or {}
+        control = data.get("control") or {}
+        index = self._next
+        self._timestamps[index] = timestamp
+        self._values["water_temperature_f"][index] = _as_float(
+            status.get("water_temperature_f")
+        )
+        self._values["set_temperature_f"][index] = _as_float(
+            control.get("set_temperature_f")
+        )
+        self._values["water_level"][index] = _as_float(status.get("water_level"))
+        self._active[index] = control.get("thermal_control_status") == "active"
+        self._next = (index + 1) % self.capacity
+        self._size = min(self._size + 1, self.capacity)
+
+    def latest(self) -> SleepmeReading | None:
+        """Return the most recent reading."""
+        if not self._size:
+            return None
+        return self._reading((self._next - 1) % self.capacity)
+
+    def readings(self, since: float | None = None) -> list[SleepmeReading]:
+        """Return the readings in chronological order, optionally since a time."""
+        return [self._reading(index) for index in self._indices(since)]
+
+    def window(self, field: str, since: float | None = None) -> tuple[array, array]:
+        """Return the timestamps and values of a field, in chronological order."""
+        start, stop = self._bounds(since)
+        return (
+            self._slice(self._timestamps, start, stop),
+            self._slice(self._values[field], start, stop),
+        )
+
+    def statistics(
+        self, field: str, since: float | None = None
+    ) -> SleepmeWindowStatistics:
+        """Return statistics of a field over the readings since a time."""
+        _, values = self.window(field, since)
+        present = [value for value in values if not math.isnan(value)]
+        if not present:
+            return SleepmeWindowStatistics(0, None, None, None)
+        return SleepmeWindowStatistics(
+            count=len(present),
+            minimum=min(present),
+            maximum=max(present),
+            mean=math.fsum(present) / len(present),
+        )
+
+    def ramp_rate(self, window: float) -> float | None:
+        """
+        Return the water temperature trend in °F per minute.
+
+        This is the least-squares slope over the readings of the last window
+        seconds, limited to those since the last mode or setpoint change.
+        """
+        latest = self.latest()
+        if latest is None:
+            return None
+
+        count = 0
+        sum_t = sum_v = sum_tt = sum_tv = 0.0
+        for reading in reversed(self.readings(latest.timestamp - window)):
+            if reading.active != latest.active or not _same(
+                reading.set_temperature_f, latest.set_temperature_f
+            ):
+                break
+            if math.isnan(reading.water_temperature_f):
+                continue
+            # Relative to the latest reading to keep the sums well conditioned
+            t = reading.timestamp - latest.timestamp
+            v = reading.water_temperature_f
+            count += 1
+            sum_t += t
+            sum_v += v
+            sum_tt += t * t
+            sum_tv += t * v
+
+        denominator = count * sum_tt - sum_t * sum_t
+        if count < 2 or denominator == 0:  # noqa: PLR2004
+            return None
+        return (count * sum_tv - sum_t * sum_v) / denominator * 60
+
+    def minutes_to_target(self, window: float, tolerance: float) -> float | None:
+        """Return the estimated minutes until the water reaches the setpoint."""
+        latest = self.latest()
+        if (
+            latest is None
+            or not latest.active
+            or math.isnan(latest.water_temperature_f)
+            or math.isnan(latest.set_temperature_f)
+        ):
+            return None
+
+        remaining = latest.set_temperature_f - latest.water_temperature_f
+        if abs(remaining) <= tolerance:
+            return 0.0
+
+        rate = self.ramp_rate(window)
+        if not rate or (remaining > 0) != (rate > 0):
+            return None
+        return remaining / rate
+
+    def extrapolate_water_temperature(
+        self, timestamp: float, window: float
+    ) -> float | None:
+        """
+        Return the estimated water temperature at a time after the last reading.
+
+        The ramp rate is extrapolated for at most one window, and never past
+        the setpoint. There is no estimate in standby or when the water moves
+        away from the setpoint.
+        """
+        latest = self.latest()
+        if (
+            latest is None
+            or not latest.active
+            or math.isnan(latest.water_temperature_f)
+            or math.isnan(latest.set_temperature_f)
+        ):
+            return None
+
+        remaining = latest.set_temperature_f - latest.water_temperature_f
+        rate = self.ramp_rate(window)
+        if not rate or (remaining > 0) != (rate > 0):
+            return None
+
+        elapsed = min(max(timestamp - latest.timestamp, 0.0), window)
+        step = rate * elapsed / 60
+        step = min(step, remaining) if remaining > 0 else max(step, remaining)
+        return latest.water_temperature_f + step
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the history for diagnostics."""
+        return {
+            "capacity": self.capacity,
+            "size": self._size,
+            "statistics": {field: asdict(self.statistics(field)) for field in FIELDS},
+            "readings": [
+                {
+                    "timestamp": reading.timestamp,
+                    **{
+                        field: _as_optional(getattr(reading, field)) for field in FIELDS
+                    },
+                    "active": reading.active,
+                }
+                for reading in self.readings()
+            ],
+        }
+
+    def _reading(self, index: int) -> SleepmeReading:
+        """Return the reading stored at a buffer index."""
+        return SleepmeReading(
+            timestamp=self._timestamps[index],
+            water_temperature_f=self._values["water_temperature_f"][index],
+            set_temperature_f=self._values["set_temperature_f"][index],
+            water_level=self._values["water_level"][index],
+            active=bool(self._active[index]),
+        )
+
+    def _bounds(self, since: float | None) -> tuple[int, int]:
+        """Return the logical start and stop positions of a window."""
+        start = 0
+        if since is not None:
+            # Readings are appended in time order, so bisect on the timestamps
+            low, high = 0, self._size
+            while low < high:
+                middle = (low + high) // 2
+                if self._timestamps[self._physical(middle)] < since:
+                    low = middle + 1
+                else:
+                    high = middle
+            start = low
+        return start, self._size
+
+    def _indices(self, since: float | None) -> list[int]:
+        """Return the buffer indices of a window, in chronological order."""
+        start, stop = self._bounds(since)
+        return [self._physical(position) for position in range(start, stop)]
+
+    def _physical(self, position: int) -> int:
+        """Map a chronological position to a buffer index."""
+        oldest = self._next if self._size == self.capacity else 0
+        return (oldest + position) % self.capacity
+
+    def _slice(self, values: array, start: int, stop: int) -> array:
+        """Return a chronological slice of an array as a single copy."""
+        if start >= stop:
+            return values[:0]
+        first = self._physical(start)
+        last = self._physical(stop - 1)
+        if first <= last:
+            return values[first : last + 1]
+        return values[first:] + values[: last + 1]
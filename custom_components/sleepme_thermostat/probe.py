@@ -0,0 +1,42 @@
+"""Sleep.me disconnected device probe module."""
+
+from __future__ import annotations
+
+from typing import Any
+
+from .const import PROBE_MAX_INTERVAL, PROBE_MIN_INTERVAL
+
+
+class SleepmeDeviceProbe:
+    """
+    Polling backoff of a device that is not connected to the cloud.
+
+    The cloud keeps answering with the last state of a disconnected device,
+    so polling it every time only spends the rate limit. It is probed at
+    intervals that double with every probe that finds it still disconnected.
+    Times are monotonic seconds.
+    """
+
+    def __init__(self, now: float) -> None:
+        """Initialize the probe when the device is found disconnected."""
+        self.probes = 0
+        self.interval = PROBE_MIN_INTERVAL.total_seconds()
+        self.next_probe = now + self.interval
+
+    def due(self, now: float) -> bool:
+        """Return True once the device should be polled again."""
+        return now >= self.next_probe
+
+    def record_disconnected(self, now: float) -> None:
+        """Back off after a probe found the device still disconnected."""
+        self.probes += 1
+        self.interval = min(self.interval * 2, PROBE_MAX_INTERVAL.total_seconds())
+        self.next_probe = now + self.interval
+
+    def as_dict(self, now: float) -> dict[str, Any]:
+        """Return the probe for diagnostics."""
+        return {
+            "probes": self.probes,
+            "interval": self.interval,
+            "next_probe_in": round(max(self.next_probe - now, 0.0), 1),
+        }
@@ -1,29 +1,83 @@
 """Sleep.me Rate Limiter module."""
 
+from __future__ import annotations
+
 import asyncio
-import threading
-import time
+from collections import deque
+from contextlib import suppress
+from typing import TYPE_CHECKING, Any
+
+from .clock import SYSTEM_CLOCK
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from .clock import Clock
+
+# Common lengths of quota windows in seconds: a minute, an hour and a day
+QUOTA_WINDOWS = (60.0, 3600.0, 86400.0)
 
 
 class RateLimiter:
     """
     Tracks and enforces a maximum number of requests per discrete minute.
 
-    Thread-safe for use in concurrent environments.
+    The limiter belongs to the event loop and takes no locks: its methods
+    must only be called from the loop's thread. Use ThreadSafeRateLimiter
+    from other threads.
     """
 
-    def __init__(self, max_requests_per_minute: int = 10) -> None:
+    def __init__(
+        self,
+        max_requests_per_minute: int = 10,
+        *,
+        period: float = 60.0,
+        clock: Clock | None = None,
+    ) -> None:
         """Initialize the rate limiter."""
         self.max_requests = max_requests_per_minute
-        self.lock = threading.Lock()
-        self.current_minute = int(time.time() // 60)
+        # Length of a window in seconds
+        self.period = period
+        # Windows are counted in monotonic time, which clock corrections
+        # cannot reset or extend. The offset aligns them with the server's.
+        self._clock = clock or SYSTEM_CLOCK
+        self._window_offset = 0.0
+        self.current_minute = self._window(self._clock.monotonic())
         self.request_count = 0
+        # Set once the server reported its quota
+        self.quota_synced = False
+        # Monotonic time until which the server asked to send nothing
+        self._blocked_until = 0.0
+        self._waiters: deque[asyncio.Future[None]] = deque()
+        self._release_handle: asyncio.TimerHandle | None = None
 
     def can_send_request(self) -> bool:
         """Return True only if a request can be sent in the current minute."""
-        with self.lock:
-            self.check_limits()
-            return self.request_count < self.max_requests
+        self.check_limits()
+        # Waiting callers are served first
+        return (
+            not self._waiters
+            and not self._blocked()
+            and self.request_count < self.max_requests
+        )
+
+    def remaining_requests(self) -> int:
+        """Return the number of requests left in the current minute."""
+        self.check_limits()
+        if self._waiters or self._blocked():
+            return 0
+        return max(self.max_requests - self.request_count, 0)
+
+    def seconds_until_available(self) -> float:
+        """
+        Return the seconds until a request can be sent, 0 if one can now.
+
+        Callers already waiting in line are not accounted for.
+        """
+        self.check_limits()
+        if self.request_count >= self.max_requests:
+            return max(self._seconds_until_reset(), 0.0)
+        return max(self._blocked_until - self._clock.monotonic(), 0.0)
 
     def record_request(self) -> None:
         """
@@ -31,25 +85,215 @@ class RateLimiter:
 
         Should be called after confirming can_send_request() is True.
         """
-        with self.lock:
-            self.check_limits()
-            self.request_count += 1
+        self.check_limits()
+        self.request_count += 1
+
+    def try_acquire(self) -> bool:
+        """Record a request and return True, if one can be sent right now."""
+        if not self.can_send_request():
+            return False
+        self.request_count += 1
+        return True
+
+    async def acquire(self) -> None:
+        """
+        Wait until a request can be sent, and record it.
+
+        Callers are served in the order they called. A caller cancelled
+        while waiting gives up its place, or its slot if it was already
+        granted one.
+        """
+        if self.try_acquire():
+            return
+
+        waiter: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self._schedule_release()
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # Granted just before the cancellation, pass the slot on
+                self.request_count -= 1
+                self._release_waiters()
+            raise
+        finally:
+            with suppress(ValueError):
+                self._waiters.remove(waiter)
+            if not self._waiters and self._release_handle is not None:
+                self._release_handle.cancel()
+                self._release_handle = None
+
+    def sync_quota(
+        self,
+        *,
+        limit: int | None = None,
+        remaining: int | None = None,
+        reset: float | None = None,
+        period: float | None = None,
+    ) -> None:
+        """
+        Adopt the quota reported by the server.
+
+        The server also counts the requests of the account's other clients,
+        so its remaining count replaces the local one. The window is moved to
+        end when the server's does. A server that does not name its window
+        length has a longer window than assumed when its window ends later
+        than one could; the shortest common window it fits in is taken.
+        """
+        self.check_limits()
+        if period is not None and period > 0:
+            self.period = period
+        elif reset is not None and reset > self.period:
+            self.period = next((x for x in QUOTA_WINDOWS if x >= reset), reset)
+        if limit is not None and limit >= 0:
+            self.max_requests = limit
+        if reset is not None and reset >= 0:
+            now = self._clock.monotonic()
+            self._window_offset = (now + reset) % self.period
+            # Still the server's current window, the count stays
+            self.current_minute = self._window(now)
+        if remaining is not None and remaining >= 0:
+            self.request_count = max(self.max_requests - remaining, 0)
+        self.quota_synced = True
+        if self._waiters:
+            # The quota may have grown, or the window moved
+            self._release_waiters()
+
+    def block(self, seconds: float) -> None:
+        """Send nothing for a number of seconds, as the server asked."""
+        self._blocked_until = max(
+            self._blocked_until, self._clock.monotonic() + seconds
+        )
+        if self._waiters:
+            self._release_waiters()
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the state of the limiter for diagnostics."""
+        return {
+            "limit": self.max_requests,
+            "remaining": self.remaining_requests(),
+            "period": self.period,
+            "seconds_until_reset": round(self._seconds_until_reset(), 1),
+            "waiting": len(self._waiters),
+            "synced": self.quota_synced,
+        }
 
     async def wait_for_reset(self) -> None:
         """Wait for the rate limit to reset."""
-        with self.lock:
-            self.check_limits()
-            if self.request_count >= self.max_requests:
-                # Wait until the next minute
-                current_time = time.time()
-                next_minute = (int(current_time // 60) + 1) * 60
-                wait_time = next_minute - current_time
-                if wait_time > 0:
-                    await asyncio.sleep(wait_time)
+        self.check_limits()
+        if self.request_count >= self.max_requests or self._blocked():
+            # Wait until the next minute
+            wait_time = self._seconds_until_reset()
+            if wait_time > 0:
+                await self._clock.sleep(wait_time)
 
     def check_limits(self) -> None:
         """Check and reset the rate limit if necessary."""
-        now_minute = int(time.time() // 60)
+        now_minute = self._window(self._clock.monotonic())
         if self.current_minute != now_minute:
             self.current_minute = now_minute
             self.request_count = 0
+
+    def _window(self, now: float) -> int:
+        """Return the index of the window of a monotonic time."""
+        return int((now - self._window_offset) // self.period)
+
+    def _blocked(self) -> bool:
+        """Return True while the server asked to send nothing."""
+        return self._clock.monotonic() < self._blocked_until
+
+    def _seconds_until_reset(self) -> float:
+        """Return the seconds until requests can be sent again."""
+        current_time = self._clock.monotonic()
+        window_end = (
+            self._window(current_time) + 1
+        ) * self.period + self._window_offset
+        return max(window_end, self._blocked_until) - current_time
+
+    def _schedule_release(self) -> None:
+        """Wake the waiting callers once the next window starts."""
+        if self._release_handle is None:
+            self._release_handle = self._clock.call_later(
+                self._seconds_until_reset(), self._release_waiters
+            )
+
+    def _release_waiters(self) -> None:
+        """Grant the free slots to the waiting callers, in order."""
+        if self._release_handle is not None:
+            self._release_handle.cancel()
+            self._release_handle = None
+
+        self.check_limits()
+        while (
+            self._waiters
+            and not self._blocked()
+            and self.request_count < self.max_requests
+        ):
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self.request_count += 1
+                waiter.set_result(None)
+
+        if self._waiters:
+            self._schedule_release()
+
+
+class ThreadSafeRateLimiter:
+    """
+    Facade to use a RateLimiter from threads other than the event loop's.
+
+    Every call is run in the event loop, while the calling thread blocks.
+    It must not be used from the event loop itself, which would deadlock.
+    """
+
+    def __init__(self, limiter: RateLimiter, loop: asyncio.AbstractEventLoop) -> None:
+        """Initialize the facade."""
+        self._limiter = limiter
+        self._loop = loop
+
+    def can_send_request(self) -> bool:
+        """Return True only if a request can be sent in the current minute."""
+        return self._call(self._limiter.can_send_request)
+
+    def remaining_requests(self) -> int:
+        """Return the number of requests left in the current minute."""
+        return self._call(self._limiter.remaining_requests)
+
+    def record_request(self) -> None:
+        """Record a request."""
+        self._call(self._limiter.record_request)
+
+    def try_acquire(self) -> bool:
+        """Record a request and return True, if one can be sent right now."""
+        return self._call(self._limiter.try_acquire)
+
+    def acquire(self, timeout: float | None = None) -> None:
+        """Block until a request can be sent, and record it."""
+        self._check_thread()
+        future = asyncio.run_coroutine_threadsafe(self._limiter.acquire(), self._loop)
+        try:
+            future.result(timeout)
+        except TimeoutError:
+            # Give up the place in the queue
+            future.cancel()
+            raise
+
+    def _call(self, func: Callable[[], Any]) -> Any:
+        """Run a function in the event loop and return its result."""
+        self._check_thread()
+
+        async def _run() -> Any:
+            return func()
+
+        return asyncio.run_coroutine_threadsafe(_run(), self._loop).result()
+
+    def _check_thread(self) -> None:
+        """Raise if called from the event loop, which would deadlock."""
+        try:
+            running_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        if running_loop is self._loop:
+            msg = "Use the RateLimiter directly in the event loop"
+            raise RuntimeError(msg)
@@ -0,0 +1,45 @@
+"""Sleep.me request retry module."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from enum import StrEnum
+
+
+class ErrorClass(StrEnum):
+    """Classes of request failures, which decide whether to retry."""
+
+    TIMEOUT = "timeout"
+    CONNECTION = "connection"
+    SERVER = "server"
+    RATE_LIMIT = "rate_limit"
+    AUTH = "auth"
+    CLIENT = "client"
+    SCHEMA = "schema"
+    UNKNOWN = "unknown"
+
+
+@dataclass(frozen=True, kw_only=True)
+class RetryPolicy:
+    """How often and how late to retry a class of failures."""
+
+    retries: int
+    backoff: float = 0.0
+    factor: float = 2.0
+    max_backoff: float = 30.0
+
+    def delay(self, attempt: int) -> float | None:
+        """Return the seconds to wait after a failed attempt, None to give up."""
+        if attempt > self.retries:
+            return None
+        return min(self.backoff * self.factor ** (attempt - 1), self.max_backoff)
+
+
+# Failures of a class without a policy, like invalid credentials, are final
+DEFAULT_RETRY_POLICIES: dict[ErrorClass, RetryPolicy] = {
+    ErrorClass.TIMEOUT: RetryPolicy(retries=1),
+    ErrorClass.CONNECTION: RetryPolicy(retries=2, backoff=1.0),
+    ErrorClass.SERVER: RetryPolicy(retries=2, backoff=2.0),
+    # Retried once the server's Retry-After has passed, see the API client
+    ErrorClass.RATE_LIMIT: RetryPolicy(retries=1),
+}
@@ -0,0 +1,114 @@
+"""Sleep.me polling schedule module."""
+
+from __future__ import annotations
+
+from datetime import datetime, time, timedelta
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    DENSE_POLL_INTERVAL,
+    SCHEDULE_DECAY,
+    SCHEDULE_THRESHOLD,
+    SPARSE_POLL_INTERVAL,
+    TRANSITION_WINDOW,
+)
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+SLOT_MINUTES = 15
+SLOTS_PER_DAY = 24 * 60 // SLOT_MINUTES
+MINUTES_PER_DAY = 24 * 60
+
+
+def _minute_of_day(when: datetime) -> int:
+    """Return the local minute of the day of a time."""
+    local = dt_util.as_local(when)
+    return local.hour * 60 + local.minute
+
+
+class SleepmePollingSchedule:
+    """
+    Time-of-day polling profile of an account's devices.
+
+    The day is split into 15 minute slots. Every observed on/off transition
+    adds weight to its slot while older observations decay, so slots with
+    enough weight are the times at which transitions are expected. Times set
+    by the user are always expected.
+    """
+
+    def __init__(self, weights: list[float] | None = None) -> None:
+        """Initialize the schedule."""
+        self._weights = list(weights or [0.0] * SLOTS_PER_DAY)
+        if len(self._weights) != SLOTS_PER_DAY:
+            self._weights = [0.0] * SLOTS_PER_DAY
+        self._fixed_minutes: set[int] = set()
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> SleepmePollingSchedule:
+        """Restore a schedule from storage."""
+        return cls(data.get("weights"))
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the schedule for storage and diagnostics."""
+        return {
+            "weights": [round(weight, 4) for weight in self._weights],
+            "expected": sorted(
+                f"{minute // 60:02d}:{minute % 60:02d}"
+                for minute in self._expected_minutes()
+            ),
+        }
+
+    def set_fixed_times(self, times: Iterable[time]) -> None:
+        """Set the times at which the user expects transitions."""
+        self._fixed_minutes = {when.hour * 60 + when.minute for when in times}
+
+    def record_transition(self, when: datetime) -> None:
+        """Record an observed on/off transition."""
+        self._weights = [weight * SCHEDULE_DECAY for weight in self._weights]
+        self._weights[_minute_of_day(when) // SLOT_MINUTES] += 1
+
+    def next_interval(
+        self, now: datetime, base: timedelta, *, active: bool
+    ) -> timedelta:
+        """
+        Return the interval until the next poll.
+
+        Polls are dense around expected transitions, at the base interval
+        while a device is active, and sparse otherwise. Without any expected
+        transitions the base interval is always used.
+        """
+        expected = self._expected_minutes()
+        if not expected:
+            return base
+
+        minute = _minute_of_day(now)
+        window = TRANSITION_WINDOW.total_seconds() // 60
+        distances = [
+            min(
+                (target - minute) % MINUTES_PER_DAY, (minute - target) % MINUTES_PER_DAY
+            )
+            for target in expected
+        ]
+        if min(distances) <= window:
+            return min(base, DENSE_POLL_INTERVAL)
+        if active:
+            return base
+
+        # Sleep until the next transition window opens
+        until_window = min(
+            (target - window - minute) % MINUTES_PER_DAY for target in expected
+        )
+        sparse = max(base, SPARSE_POLL_INTERVAL)
+        return max(DENSE_POLL_INTERVAL, min(sparse, timedelta(minutes=until_window)))
+
+    def _expected_minutes(self) -> set[int]:
+        """Return the minutes of the day at which transitions are expected."""
+        learned = {
+            slot * SLOT_MINUTES + SLOT_MINUTES // 2
+            for slot, weight in enumerate(self._weights)
+            if weight >= SCHEDULE_THRESHOLD
+        }
+        return learned | self._fixed_minutes
@@ -1,107 +1,350 @@
 """Sleep.me Sensor integration for Home Assistant."""
 
-from homeassistant.components.sensor import SensorDeviceClass, SensorEntity
-from homeassistant.const import PERCENTAGE, UnitOfTemperature
-from homeassistant.core import HomeAssistant, callback
-from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
+from __future__ import annotations
 
-from .const import LOGGER, SENSOR_TYPES
-from .coordinator import SleepmeDataUpdateCoordinator
-from .data import SleepmeConfigEntry
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.components.sensor import (
+    SensorDeviceClass,
+    SensorEntity,
+    SensorEntityDescription,
+    SensorStateClass,
+)
+from homeassistant.const import (
+    PERCENTAGE,
+    EntityCategory,
+    Platform,
+    UnitOfTemperature,
+    UnitOfTime,
+)
+from homeassistant.core import callback
+
+from .const import (
+    CONF_DISABLED_SENSORS,
+    CONF_TEMPERATURE_DEADBAND,
+    CONF_WATER_LEVEL_DEADBAND,
+    LOGGER,
+    MAX_TEMPERATURE_F,
+    MIN_TEMPERATURE_F,
+    NAME,
+    RAMP_RATE_WINDOW,
+    SENSOR_TYPES,
+    TARGET_TOLERANCE_F,
+)
+from .entity import SleepmeAccountEntity, SleepmeEntity, async_track_entities
+from .health import HealthState
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from homeassistant.core import HomeAssistant
+    from homeassistant.helpers.entity_platform import AddEntitiesCallback
+    from homeassistant.helpers.typing import StateType
+
+    from .coordinator import SleepmeDataUpdateCoordinator
+    from .data import SleepmeConfigEntry
+    from .history import SleepmeReadingHistory
+    from .rate_limiter import RateLimiter
+    from .throttle import SleepmeStateThrottle
+
+
+@dataclass(frozen=True, kw_only=True)
+class SleepmeSensorEntityDescription(SensorEntityDescription):
+    """Describes a Sleep.me sensor entity."""
+
+    value_fn: Callable[[dict[str, Any]], StateType]
+    # Only created when the config entry option named after the key is set
+    opt_in: bool = False
+    # Option of the deadband within which changes are held back, and the
+    # factor converting it to the sensor's unit
+    deadband_option: str | None = None
+    deadband_scale: float = 1.0
+
+
+SENSOR_DESCRIPTIONS: tuple[SleepmeSensorEntityDescription, ...] = (
+    SleepmeSensorEntityDescription(
+        key="water_temperature",
+        name=SENSOR_TYPES["water_temperature"],
+        device_class=SensorDeviceClass.TEMPERATURE,
+        native_unit_of_measurement=UnitOfTemperature.FAHRENHEIT,
+        suggested_display_precision=0,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda data: data.get("status", {}).get("water_temperature_f"),
+        deadband_option=CONF_TEMPERATURE_DEADBAND,
+    ),
+    SleepmeSensorEntityDescription(
+        key="water_temperature_c",
+        name=SENSOR_TYPES["water_temperature_c"],
+        device_class=SensorDeviceClass.TEMPERATURE,
+        native_unit_of_measurement=UnitOfTemperature.CELSIUS,
+        suggested_unit_of_measurement=UnitOfTemperature.CELSIUS,
+        suggested_display_precision=1,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda data: data.get("status", {}).get("water_temperature_c"),
+        opt_in=True,
+        deadband_option=CONF_TEMPERATURE_DEADBAND,
+        deadband_scale=5 / 9,
+    ),
+    SleepmeSensorEntityDescription(
+        key="water_level",
+        name=SENSOR_TYPES["water_level"],
+        native_unit_of_measurement=PERCENTAGE,
+        suggested_display_precision=0,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda data: data.get("status", {}).get("water_level"),
+        deadband_option=CONF_WATER_LEVEL_DEADBAND,
+    ),
+)
+
+
+@dataclass(frozen=True, kw_only=True)
+class SleepmeTrendSensorEntityDescription(SensorEntityDescription):
+    """Describes a Sleep.me sensor derived from the reading history."""
+
+    value_fn: Callable[[SleepmeReadingHistory], StateType]
+
+
+def _time_to_target(history: SleepmeReadingHistory) -> float | None:
+    """Return the minutes to the setpoint, unless a max heat/cool preset is set."""
+    latest = history.latest()
+    if latest is None or not (
+        MIN_TEMPERATURE_F <= latest.set_temperature_f <= MAX_TEMPERATURE_F
+    ):
+        return None
+    return history.minutes_to_target(RAMP_RATE_WINDOW, TARGET_TOLERANCE_F)
+
+
+TREND_SENSOR_DESCRIPTIONS: tuple[SleepmeTrendSensorEntityDescription, ...] = (
+    SleepmeTrendSensorEntityDescription(
+        key="ramp_rate",
+        name=SENSOR_TYPES["ramp_rate"],
+        native_unit_of_measurement=f"{UnitOfTemperature.FAHRENHEIT}/{UnitOfTime.MINUTES}",
+        suggested_display_precision=2,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda history: history.ramp_rate(RAMP_RATE_WINDOW),
+    ),
+    SleepmeTrendSensorEntityDescription(
+        key="time_to_target",
+        name=SENSOR_TYPES["time_to_target"],
+        device_class=SensorDeviceClass.DURATION,
+        native_unit_of_measurement=UnitOfTime.MINUTES,
+        suggested_display_precision=0,
+        value_fn=_time_to_target,
+    ),
+)
+
+
+HEALTH_SENSOR_DESCRIPTION = SensorEntityDescription(
+    key="health",
+    name=SENSOR_TYPES["health"],
+    device_class=SensorDeviceClass.ENUM,
+    options=[state.value for state in HealthState],
+    entity_category=EntityCategory.DIAGNOSTIC,
+)
+
+RATE_LIMIT_SENSOR_DESCRIPTION = SensorEntityDescription(
+    key="rate_limit_headroom",
+    name=SENSOR_TYPES["rate_limit_headroom"],
+    state_class=SensorStateClass.MEASUREMENT,
+    entity_category=EntityCategory.DIAGNOSTIC,
+)
 
 
 async def async_setup_entry(
-    hass: HomeAssistant,  # noqa: ARG001
+    hass: HomeAssistant,
     config_entry: SleepmeConfigEntry,
     async_add_entities: AddEntitiesCallback,
 ) -> None:
     """Set up Sleep.me sensors from a config entry."""
+    config_entry.runtime_data.trackers[Platform.SENSOR] = async_track_entities(
+        hass, config_entry, async_add_entities, lambda: _build_entities(config_entry)
+    )
+
+
+def _build_entities(
+    config_entry: SleepmeConfigEntry,
+) -> list[SleepmeEntity | SleepmeAccountEntity]:
+    """Build the sensors enabled in the options."""
     coordinator = config_entry.runtime_data.coordinator
+    disabled = set(config_entry.options.get(CONF_DISABLED_SENSORS, []))
 
-    entities = []
-    for sensor_type in SENSOR_TYPES:
+    entities: list[SleepmeEntity | SleepmeAccountEntity] = []
+    for description in SENSOR_DESCRIPTIONS:
+        if description.opt_in and not config_entry.options.get(description.key):
+            continue
+        if description.key in disabled:
+            continue
         for idx in coordinator.data:
-            entities.append(SleepmeSensor(coordinator, idx, sensor_type))
-            LOGGER.debug(f"Adding sensor {sensor_type} for device {idx}")
-
-    async_add_entities(entities)
+            entities.append(SleepmeSensor(coordinator, idx, description))
+            LOGGER.debug(f"Adding sensor {description.key} for device {idx}")
+    for description in TREND_SENSOR_DESCRIPTIONS:
+        if description.key in disabled:
+            continue
+        entities.extend(
+            SleepmeTrendSensor(coordinator, idx, description)
+            for idx in coordinator.data
+        )
+    # The cloud and the rate limit are the account's, not a device's
+    if HEALTH_SENSOR_DESCRIPTION.key not in disabled:
+        entities.append(SleepmeHealthSensor(coordinator))
+    if RATE_LIMIT_SENSOR_DESCRIPTION.key not in disabled:
+        entities.append(SleepmeRateLimitSensor(coordinator))
+    return entities
 
 
-class SleepmeSensor(CoordinatorEntity, SensorEntity):
+class SleepmeSensor(SleepmeEntity, SensorEntity):
     """Sleep.me Sensor Entity."""
 
+    entity_description: SleepmeSensorEntityDescription
+
     def __init__(
         self,
         coordinator: SleepmeDataUpdateCoordinator,
         idx: str,
-        sensor_type: str,
+        description: SleepmeSensorEntityDescription,
     ) -> None:
         """Initialize the sensor."""
-        super().__init__(coordinator)
-        self.idx = idx
-        self._sensor_type = sensor_type
+        super().__init__(coordinator, idx)
+        self.entity_description = description
 
         data = coordinator.data[idx]
 
-        self._name = f"{data['name']} {SENSOR_TYPES[sensor_type]}"
-        self._unique_id = f"{idx}_{sensor_type}"
-        self._device_id = f"{idx}_climate"
+        self._attr_name = f"{data['name']} {description.name}"
+        self._attr_unique_id = f"{idx}_{description.key}"
+
+        self._throttle = self._build_throttle()
 
-        LOGGER.info(
-            f"Initializing SleepmeSensor with device info: "
-            f"{coordinator.data[idx]}, and sensor type: {sensor_type}"
+        LOGGER.debug(
+            f"Initializing SleepmeSensor for device {idx}, "
+            f"and sensor type: {description.key}"
         )
 
     @callback
-    def _handle_coordinator_update(self) -> None:
-        """Handle updated data from the coordinator."""
-        self._attr_is_on = (
-            self.coordinator.data[self.idx]
-            .get("control", {})
-            .get("thermal_control_status")
-            == "active"
-        )
+    def async_options_updated(self) -> None:
+        """Apply a changed deadband or publish interval."""
+        self._throttle = self._build_throttle()
         self.async_write_ha_state()
 
+    def _build_throttle(self) -> SleepmeStateThrottle | None:
+        """Return the throttle of the sensor's reading, if it has one."""
+        description = self.entity_description
+        if description.deadband_option is None:
+            return None
+        return self._state_throttle(
+            description.deadband_option,
+            description.value_fn(self.coordinator.data[self.idx]),
+            description.deadband_scale,
+        )
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Offer the new reading to the throttle before writing the state."""
+        if self._throttle is not None and self.idx in self.coordinator.data:
+            self._throttle.update(
+                self.entity_description.value_fn(self.coordinator.data[self.idx]),
+                self.coordinator.clock.monotonic(),
+            )
+        super()._handle_coordinator_update()
+
+    def _state_snapshot(self) -> tuple[Any, ...] | None:
+        """Return the held back reading, while there is a throttle."""
+        if self._throttle is None:
+            return None
+        return (self.available, self._throttle.value)
+
     @property
-    def name(self) -> str:
-        """Return the name of the sensor."""
-        return self._name
+    def native_value(self) -> StateType:
+        """Return the state of the sensor, or its last significant value."""
+        if self._throttle is not None:
+            return self._throttle.value
+        return self.entity_description.value_fn(self.coordinator.data[self.idx])
+
+
+class SleepmeTrendSensor(SleepmeEntity, SensorEntity):
+    """Sleep.me sensor computed locally from the reading history."""
+
+    entity_description: SleepmeTrendSensorEntityDescription
+
+    def __init__(
+        self,
+        coordinator: SleepmeDataUpdateCoordinator,
+        idx: str,
+        description: SleepmeTrendSensorEntityDescription,
+    ) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator, idx)
+        self.entity_description = description
+
+        data = coordinator.data[idx]
+
+        self._attr_name = f"{data['name']} {description.name}"
+        self._attr_unique_id = f"{idx}_{description.key}"
 
     @property
-    def unique_id(self) -> str:
-        """Return the unique ID of the sensor."""
-        return self._unique_id
+    def native_value(self) -> StateType:
+        """Return the state of the sensor."""
+        return self.entity_description.value_fn(self.coordinator.get_history(self.idx))
+
+
+class SleepmeHealthSensor(SleepmeAccountEntity, SensorEntity):
+    """Sleep.me diagnostic sensor of the connection to the cloud."""
+
+    entity_description = HEALTH_SENSOR_DESCRIPTION
+    _unrecorded_attributes = frozenset(
+        {"consecutive_failures", "last_success", "last_error", "stale"}
+    )
+
+    def __init__(self, coordinator: SleepmeDataUpdateCoordinator) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator)
+
+        entry_id = coordinator.config_entry.entry_id
+        self._attr_name = f"{NAME} {self.entity_description.name}"
+        self._attr_unique_id = f"{entry_id}_{self.entity_description.key}"
 
     @property
-    def state(self) -> str | None:
+    def native_value(self) -> StateType:
         """Return the state of the sensor."""
-        try:
-            status = self.coordinator.data[self.idx].get("status", {})
-            LOGGER.debug(f"Status for device {self.idx}: {status}")
-            return status.get(self._sensor_type)
-        except KeyError:
-            LOGGER.error(
-                f"Error fetching state for sensor {self._unique_id}: "
-                f"{self.coordinator.data[self.idx]}"
-            )
-            return None
+        return self.coordinator.health.state
 
     @property
-    def unit_of_measurement(self) -> str | None:
-        """Return the unit of measurement."""
-        if self._sensor_type == "water_temperature_f":
-            return UnitOfTemperature.FAHRENHEIT
-        if self._sensor_type == "water_temperature_c":
-            return UnitOfTemperature.CELSIUS
-        if self._sensor_type == "water_level":
-            return PERCENTAGE
-        return None
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return how stale the data of the other entities is."""
+        attributes = self.coordinator.health.as_dict()
+        attributes.pop("state")
+        return attributes
+
+
+class SleepmeRateLimitSensor(SleepmeAccountEntity, SensorEntity):
+    """Sleep.me diagnostic sensor of the requests left in the rate limit."""
+
+    entity_description = RATE_LIMIT_SENSOR_DESCRIPTION
+    _unrecorded_attributes = frozenset(
+        {"limit", "period", "seconds_until_reset", "waiting", "synced"}
+    )
+
+    def __init__(self, coordinator: SleepmeDataUpdateCoordinator) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator)
+
+        entry_id = coordinator.config_entry.entry_id
+        self._attr_name = f"{NAME} {self.entity_description.name}"
+        self._attr_unique_id = f"{entry_id}_{self.entity_description.key}"
 
     @property
-    def device_class(self) -> SensorDeviceClass | None:
-        """Return the device class."""
-        if self._sensor_type in ["water_temperature_f", "water_temperature_c"]:
-            return SensorDeviceClass.TEMPERATURE
-        return None
+    def _rate_limiter(self) -> RateLimiter:
+        """Return the rate limiter of the account's requests."""
+        return self.coordinator.config_entry.runtime_data.client.rate_limiter
+
+    @property
+    def native_value(self) -> StateType:
+        """Return the requests left in the current window."""
+        return self._rate_limiter.remaining_requests()
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return the quota the headroom is part of."""
+        attributes = self._rate_limiter.as_dict()
+        attributes.pop("remaining")
+        return attributes
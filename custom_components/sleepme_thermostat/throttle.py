@@ -0,0 +1,37 @@
+"""Sleep.me state write throttle module."""
+
+from __future__ import annotations
+
+
+class SleepmeStateThrottle:
+    """
+    Published value of a reading that only follows significant changes.
+
+    A new reading is published when it differs from the published one by at
+    least the deadband, or once the publish interval has passed since the
+    last publish. Smaller changes are held back, so a value that jitters
+    around the same level writes no new states. A deadband of zero publishes
+    every change. Times are monotonic seconds.
+    """
+
+    def __init__(self, deadband: float, interval: float) -> None:
+        """Initialize the throttle."""
+        self.deadband = deadband
+        self.interval = interval
+        self.value: float | None = None
+        self._published_at: float | None = None
+
+    def update(self, value: float | None, now: float) -> float | None:
+        """Offer a new reading and return the value to publish."""
+        if self._significant(value, now):
+            self.value = value
+            self._published_at = now
+        return self.value
+
+    def _significant(self, value: float | None, now: float) -> bool:
+        """Return True if a reading must be published."""
+        if value is None or self.value is None or self._published_at is None:
+            return True
+        if abs(value - self.value) >= self.deadband:
+            return True
+        return now - self._published_at >= self.interval
@@ -0,0 +1,65 @@
+"""Sleep.me config flow validation cache module."""
+
+from __future__ import annotations
+
+import hashlib
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.util.hass_dict import HassKey
+
+from .clock import SYSTEM_CLOCK
+from .const import DOMAIN, VALIDATION_CACHE_TTL
+
+if TYPE_CHECKING:
+    from homeassistant.core import HomeAssistant
+
+    from .clock import Clock
+
+DATA_VALIDATION_CACHE: HassKey[SleepmeValidationCache] = HassKey(
+    f"{DOMAIN}_validation_cache"
+)
+
+
+class SleepmeValidationCache:
+    """
+    Device lists fetched while validating API keys, kept for a short time.
+
+    The setup of an entry created by the config flow takes the device list
+    from here instead of fetching it again. Entries are keyed by a hash of
+    the API key, so the keys themselves are not kept, and are only used
+    once.
+    """
+
+    def __init__(
+        self, ttl: float = VALIDATION_CACHE_TTL, clock: Clock | None = None
+    ) -> None:
+        """Initialize the cache."""
+        self.ttl = ttl
+        self._clock = clock or SYSTEM_CLOCK
+        self._entries: dict[str, tuple[float, list[dict[str, Any]]]] = {}
+
+    def put(self, api_key: str, devices: list[dict[str, Any]]) -> None:
+        """Cache the device list of an API key."""
+        self._entries[_hash(api_key)] = (self._clock.monotonic() + self.ttl, devices)
+
+    def pop(self, api_key: str) -> list[dict[str, Any]] | None:
+        """Return and forget the device list of an API key, unless expired."""
+        now = self._clock.monotonic()
+        # Expired entries are dropped on every use, the cache stays small
+        self._entries = {
+            key: entry for key, entry in self._entries.items() if entry[0] > now
+        }
+        entry = self._entries.pop(_hash(api_key), None)
+        return None if entry is None else entry[1]
+
+
+def async_get_validation_cache(hass: HomeAssistant) -> SleepmeValidationCache:
+    """Return the validation cache shared by the config flow and the entries."""
+    if (cache := hass.data.get(DATA_VALIDATION_CACHE)) is None:
+        cache = hass.data[DATA_VALIDATION_CACHE] = SleepmeValidationCache()
+    return cache
+
+
+def _hash(api_key: str) -> str:
+    """Return the key of an API key in the cache."""
+    return hashlib.sha256(api_key.encode()).hexdigest()
@@ -4,6 +4,8 @@ import pytest
 from pytest_homeassistant_custom_component.syrupy import HomeAssistantSnapshotExtension
 from syrupy.assertion import SnapshotAssertion
 
+from tests.fake_clock import FakeClock
+
 
 @pytest.fixture
 def snapshot(snapshot: SnapshotAssertion) -> SnapshotAssertion:
@@ -15,3 +17,9 @@ def snapshot(snapshot: SnapshotAssertion) -> SnapshotAssertion:
 def auto_enable_custom_integrations(enable_custom_integrations):  # noqa: ANN001, ANN201, ARG001
     """Enable custom integrations defined in the test dir."""
     yield  # noqa: PT022
+
+
+@pytest.fixture
+def clock() -> FakeClock:
+    """Return a fake clock."""
+    return FakeClock()
@@ -0,0 +1,71 @@
+"""Fake clock for time-dependent tests."""
+
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+from custom_components.sleepme_thermostat.clock import Clock
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+
+@dataclass
+class FakeTimer:
+    """Call scheduled on a fake clock."""
+
+    when: float
+    callback: Callable[[], None]
+    cancelled: bool = False
+
+    def cancel(self) -> None:
+        """Cancel the call."""
+        self.cancelled = True
+
+
+class FakeClock(Clock):
+    """
+    Clock whose time only moves when advanced.
+
+    Sleeping advances the time at once and records the delay, so backoffs
+    take no real time. Scheduled calls run as the time passes them.
+    """
+
+    def __init__(self, start: float = 1000.0) -> None:
+        """Initialize the clock."""
+        self.now = start
+        self.sleeps: list[float] = []
+        self._timers: list[FakeTimer] = []
+
+    def monotonic(self) -> float:
+        """Return the fake time."""
+        return self.now
+
+    async def sleep(self, delay: float) -> None:
+        """Record the delay and advance the time by it."""
+        self.sleeps.append(delay)
+        self.advance(delay)
+        await asyncio.sleep(0)
+
+    def call_later(self, delay: float, callback: Callable[[], None]) -> FakeTimer:  # type: ignore[override]
+        """Schedule a call at a fake time."""
+        timer = FakeTimer(self.now + delay, callback)
+        self._timers.append(timer)
+        return timer
+
+    def advance(self, seconds: float) -> None:
+        """Advance the time, running the calls that become due in order."""
+        target = self.now + seconds
+        while due := [
+            timer
+            for timer in self._timers
+            if not timer.cancelled and timer.when <= target
+        ]:
+            timer = min(due, key=lambda timer: timer.when)
+            self._timers.remove(timer)
+            self.now = max(self.now, timer.when)
+            timer.callback()
+        self._timers = [timer for timer in self._timers if not timer.cancelled]
+        self.now = target
@@ -0,0 +1,397 @@
+"""Tests for the SleepmeApiClient module."""
+
+import asyncio
+import socket
+import time
+from collections.abc import Awaitable, Callable
+from unittest.mock import MagicMock, patch
+
+import aiohttp
+import orjson
+import pytest
+from aioresponses import CallbackResult, aioresponses
+from yarl import URL
+
+from custom_components.sleepme_thermostat.api import (
+    HEDGE_MIN_SAMPLES,
+    SleepmeApiClient,
+    SleepmeApiClientAuthenticationError,
+    SleepmeApiClientCommunicationError,
+    SleepmeApiClientError,
+    SleepmeApiClientRateLimitError,
+    _parse_quota,
+)
+from custom_components.sleepme_thermostat.deadline import Deadline
+from custom_components.sleepme_thermostat.rate_limiter import RateLimiter
+from tests.fake_clock import FakeClock
+
+DEVICE_URL = "https://api.developer.sleep.me/v1/devices/abcd"
+
+
+@pytest.mark.asyncio
+async def test_request_counted(aioresponses: aioresponses) -> None:
+    """Test sent requests are counted."""
+    aioresponses.get(DEVICE_URL, payload={"control": {}})
+    async with aiohttp.ClientSession() as session:
+        client = SleepmeApiClient("1234567890", session)
+
+        assert await client.async_get_device_state("abcd") == {"control": {}}
+
+    assert client.statistics.requests == 1
+
+
+@pytest.mark.asyncio
+async def test_expired_deadline_skips_request(aioresponses: aioresponses) -> None:
+    """Test no request is sent once the deadline has passed."""
+    deadline = MagicMock(timeout=20)
+    deadline.remaining.return_value = 0.0
+    async with aiohttp.ClientSession() as session:
+        client = SleepmeApiClient("1234567890", session)
+
+        with pytest.raises(SleepmeApiClientCommunicationError, match="Deadline"):
+            await client.async_get_device_state("abcd", deadline)
+
+    assert client.statistics.requests == 0
+    assert client.statistics.timeouts == 1
+    assert not aioresponses.requests
+
+
+@pytest.mark.asyncio
+async def test_request_limited_to_deadline(aioresponses: aioresponses) -> None:
+    """Test a request only gets the time left of the deadline."""
+    deadline = MagicMock(timeout=20)
+    deadline.remaining.return_value = 2.5
+    deadline.allows.return_value = False
+    aioresponses.get(DEVICE_URL, exception=TimeoutError())
+    async with aiohttp.ClientSession() as session:
+        client = SleepmeApiClient("1234567890", session)
+
+        with (
+            patch(
+                "custom_components.sleepme_thermostat.api.asyncio.timeout",
+                wraps=asyncio.timeout,
+            ) as mock_timeout,
+            pytest.raises(SleepmeApiClientCommunicationError, match="Timeout"),
+        ):
+            await client.async_get_device_state("abcd", deadline)
+
+    mock_timeout.assert_called_once_with(2.5)
+    assert client.statistics.timeouts == 1
+
+
+@pytest.mark.asyncio
+async def test_cancelled_request_counted(aioresponses: aioresponses) -> None:
+    """Test requests cancelled from outside are counted and re-raised."""
+    aioresponses.get(DEVICE_URL, exception=asyncio.CancelledError())
+    async with aiohttp.ClientSession() as session:
+        client = SleepmeApiClient("1234567890", session)
+
+        with pytest.raises(asyncio.CancelledError):
+            await client.async_get_device_state("abcd")
+
+    assert client.statistics.cancelled == 1
+
+
+def _slow_first_response() -> Callable[..., Awaitable[CallbackResult]]:
+    """Return a callback answering the first request far slower than usual."""
+    calls = 0
+
+    async def _respond(url: object, **kwargs: object) -> CallbackResult:  # noqa: ARG001
+        nonlocal calls
+        calls += 1
+        if calls == 1:
+            await asyncio.sleep(1)
+            return CallbackResult(payload={"attempt": "first"})
+        return CallbackResult(payload={"attempt": "second"})
+
+    return _respond
+
+
+def _hedging_client(
+    session: aiohttp.ClientSession, rate_limiter: RateLimiter | None = None
+) -> SleepmeApiClient:
+    """Return a hedging client that has seen fast responses."""
+    client = SleepmeApiClient("1234567890", session, rate_limiter, hedge_requests=True)
+    client._latencies.extend([0.01] * HEDGE_MIN_SAMPLES)  # noqa: SLF001
+    return client
+
+
+@pytest.mark.asyncio
+async def test_hedged_get(aioresponses: aioresponses) -> None:
+    """Test a slow GET is hedged and the first answer wins."""
+    aioresponses.get(DEVICE_URL, callback=_slow_first_response(), repeat=True)
+    async with aiohttp.ClientSession() as session:
+        client = _hedging_client(session)
+
+        assert await client.async_get_device_state("abcd") == {"attempt": "second"}
+
+    assert client.statistics.hedged == 1
+    assert client.statistics.requests == 2
+    assert client.statistics.cancelled == 1
+
+
+@pytest.mark.asyncio
+async def test_hedge_needs_rate_limit_budget(aioresponses: aioresponses) -> None:
+    """Test no second request is sent when the rate limit has no room."""
+    aioresponses.get(DEVICE_URL, callback=_slow_first_response(), repeat=True)
+    rate_limiter = RateLimiter(max_requests_per_minute=3)
+    async with aiohttp.ClientSession() as session:
+        client = _hedging_client(session, rate_limiter)
+
+        assert await client.async_get_device_state("abcd") == {"attempt": "first"}
+
+    assert client.statistics.hedged == 0
+    assert rate_limiter.remaining_requests() == 2
+
+
+@pytest.mark.asyncio
+async def test_hedge_needs_latency_samples(aioresponses: aioresponses) -> None:
+    """Test nothing is hedged before the usual latency is known."""
+    async with aiohttp.ClientSession() as session:
+        client = SleepmeApiClient("1234567890", session, hedge_requests=True)
+        assert client.hedge_delay() is None
+
+        for _ in range(HEDGE_MIN_SAMPLES):
+            aioresponses.get(DEVICE_URL, payload={})
+            await client.async_get_device_state("abcd")
+
+    assert client.hedge_delay() is not None
+    assert client.statistics.hedged == 0
+
+
+@pytest.mark.asyncio
+async def test_commands_not_hedged(aioresponses: aioresponses) -> None:
+    """Test only GETs are hedged."""
+    aioresponses.patch(DEVICE_URL, payload={"set_temperature_f": 70})
+    async with aiohttp.ClientSession() as session:
+        client = _hedging_client(session)
+
+        await client.async_set_device_temperature("abcd", 70)
+
+    assert client.statistics.requests == 1
+    assert len(client._latencies) == HEDGE_MIN_SAMPLES  # noqa: SLF001
+
+
+@pytest.mark.asyncio
+async def test_transient_error_retried(
+    aioresponses: aioresponses, clock: FakeClock
+) -> None:
+    """Test a DNS failure is retried after a backoff."""
+    aioresponses.get(DEVICE_URL, exception=socket.gaierror())
+    aioresponses.get(DEVICE_URL, payload={"control": {}})
+    async with aiohttp.ClientSession() as session:
+        client = SleepmeApiClient("1234567890", session, clock=clock)
+
+        assert await client.async_get_device_state("abcd", Deadline(20, clock)) == {
+            "control": {}
+        }
+
+    assert clock.sleeps == [1.0]
+    assert client.statistics.retries == 1
+    assert client.statistics.errors == {"connection": 1}
+
+
+@pytest.mark.asyncio
+async def test_server_error_retries_exhausted(
+    aioresponses: aioresponses, clock: FakeClock
+) -> None:
+    """Test server errors are retried with a growing backoff, then raised."""
+    aioresponses.get(DEVICE_URL, status=503, repeat=True)
+    async with aiohttp.ClientSession() as session:
+        client = SleepmeApiClient("1234567890", session, clock=clock)
+
+        with pytest.raises(SleepmeApiClientCommunicationError):
+            await client.async_get_device_state("abcd", Deadline(20, clock))
+
+    assert clock.sleeps == [2.0, 4.0]
+    assert client.statistics.requests == 3
+    assert client.statistics.errors == {"server": 3}
+
+
+@pytest.mark.asyncio
+async def test_retry_needs_deadline(
+    aioresponses: aioresponses, clock: FakeClock
+) -> None:
+    """Test nothing is retried when the backoff does not fit the deadline."""
+    aioresponses.get(DEVICE_URL, status=500, repeat=True)
+    async with aiohttp.ClientSession() as session:
+        client = SleepmeApiClient("1234567890", session, clock=clock)
+
+        with pytest.raises(SleepmeApiClientCommunicationError):
+            await client.async_get_device_state("abcd", Deadline(2, clock))
+
+    assert client.statistics.requests == 1
+    assert client.statistics.retries == 0
+
+
+@pytest.mark.asyncio
+async def test_permanent_errors_not_retried(aioresponses: aioresponses) -> None:
+    """Test invalid credentials and invalid responses fail immediately."""
+    aioresponses.get(DEVICE_URL, status=401)
+    aioresponses.get(DEVICE_URL, body="not json", content_type="application/json")
+    async with aiohttp.ClientSession() as session:
+        client = SleepmeApiClient("1234567890", session)
+
+        with pytest.raises(SleepmeApiClientAuthenticationError):
+            await client.async_get_device_state("abcd", Deadline(20))
+        with pytest.raises(SleepmeApiClientError, match="Unexpected response"):
+            await client.async_get_device_state("abcd", Deadline(20))
+
+    assert client.statistics.requests == 2
+    assert client.statistics.retries == 0
+    assert client.statistics.errors == {"auth": 1, "schema": 1}
+
+
+@pytest.mark.asyncio
+async def test_quota_headers_synced(aioresponses: aioresponses) -> None:
+    """Test the quota reported in the response headers is adopted."""
+    aioresponses.get(
+        DEVICE_URL,
+        payload={},
+        headers={
+            "X-RateLimit-Limit": "30;w=120",
+            "X-RateLimit-Remaining": "12",
+            "X-RateLimit-Reset": "20",
+        },
+    )
+    async with aiohttp.ClientSession() as session:
+        client = SleepmeApiClient("1234567890", session)
+
+        await client.async_get_device_state("abcd")
+
+    assert client.rate_limiter.max_requests == 30
+    assert client.rate_limiter.period == 120
+    assert client.rate_limiter.remaining_requests() == 12
+    assert client.rate_limiter.as_dict()["seconds_until_reset"] == pytest.approx(
+        20, abs=1
+    )
+
+
+@pytest.mark.asyncio
+async def test_quota_headers_without_window(aioresponses: aioresponses) -> None:
+    """Test a quota without its window length gets the window of its reset."""
+    aioresponses.get(
+        DEVICE_URL,
+        payload={},
+        headers={
+            "X-RateLimit-Limit": "1000",
+            "X-RateLimit-Remaining": "900",
+            "X-RateLimit-Reset": "1800",
+        },
+    )
+    async with aiohttp.ClientSession() as session:
+        client = SleepmeApiClient("1234567890", session)
+
+        await client.async_get_device_state("abcd")
+
+    # An hourly quota, not a thousand requests a minute
+    assert client.rate_limiter.max_requests == 1000
+    assert client.rate_limiter.period == 3600
+    assert client.rate_limiter.remaining_requests() == 900
+
+
+@pytest.mark.asyncio
+async def test_rate_limited_response_blocks(
+    aioresponses: aioresponses, clock: FakeClock
+) -> None:
+    """Test a 429 blocks requests until the server's retry time."""
+    aioresponses.get(DEVICE_URL, status=429, headers={"Retry-After": "120"})
+    async with aiohttp.ClientSession() as session:
+        client = SleepmeApiClient("1234567890", session, clock=clock)
+
+        with pytest.raises(SleepmeApiClientRateLimitError):
+            await client.async_get_device_state("abcd", Deadline(20, clock))
+
+    # The retry time is beyond the deadline, nothing is retried
+    assert client.statistics.requests == 1
+    assert client.statistics.retries == 0
+    clock.advance(60)
+    assert client.rate_limiter.can_send_request() is False
+    clock.advance(60)
+    assert client.rate_limiter.can_send_request() is True
+
+
+@pytest.mark.asyncio
+async def test_rate_limited_retried_after(
+    aioresponses: aioresponses, clock: FakeClock
+) -> None:
+    """Test a 429 is retried once the server's retry time has passed."""
+    aioresponses.get(DEVICE_URL, status=429, headers={"Retry-After": "3"})
+    aioresponses.get(DEVICE_URL, payload={"control": {}})
+    async with aiohttp.ClientSession() as session:
+        client = SleepmeApiClient("1234567890", session, clock=clock)
+
+        assert await client.async_get_device_state("abcd", Deadline(20, clock)) == {
+            "control": {}
+        }
+
+    assert clock.sleeps == [3.0]
+    assert client.statistics.requests == 2
+    assert client.statistics.retries == 1
+    assert client.statistics.errors == {"rate_limit": 1}
+
+
+def test_parse_quota() -> None:
+    """Test the quota header conventions are understood."""
+    assert _parse_quota({}) == {}
+    assert _parse_quota({"RateLimit-Limit": "invalid"}) == {}
+    quota = _parse_quota(
+        {
+            "RateLimit-Limit": "10, 10;w=60",
+            "RateLimit-Remaining": "3",
+            "RateLimit-Reset": str(int(time.time()) + 30),
+        }
+    )
+    assert quota["limit"] == 10
+    assert quota["remaining"] == 3
+    assert quota["reset"] == pytest.approx(30, abs=2)
+
+
+@pytest.mark.asyncio
+async def test_get_sent_without_body(aioresponses: aioresponses) -> None:
+    """Test GETs send no body and no content type."""
+    aioresponses.get(DEVICE_URL, payload={"control": {}})
+    async with aiohttp.ClientSession() as session:
+        client = SleepmeApiClient("1234567890", session)
+
+        await client.async_get_device_state("abcd")
+
+    (request,) = aioresponses.requests[("get", URL(DEVICE_URL))]
+    assert request.kwargs["data"] is None
+    assert request.kwargs["headers"] == {"Authorization": "Bearer 1234567890"}
+
+
+def test_get_headers_shared() -> None:
+    """Test GETs share the headers built with the client, and build no body."""
+    client = SleepmeApiClient("1234567890", MagicMock())
+
+    headers, body = client._request_args(None)  # noqa: SLF001
+
+    assert body is None
+    assert client._request_args(None)[0] is headers  # noqa: SLF001
+
+
+@pytest.mark.asyncio
+async def test_patch_body_serialized_once(
+    aioresponses: aioresponses, clock: FakeClock
+) -> None:
+    """Test a retried PATCH sends the same body, serialized once."""
+    aioresponses.patch(DEVICE_URL, status=503)
+    aioresponses.patch(DEVICE_URL, payload={"set_temperature_f": 70})
+    async with aiohttp.ClientSession() as session:
+        client = SleepmeApiClient("1234567890", session, clock=clock)
+
+        with patch(
+            "custom_components.sleepme_thermostat.api.orjson.dumps",
+            wraps=orjson.dumps,
+        ) as mock_dumps:
+            await client.async_set_device_temperature("abcd", 70)
+
+    mock_dumps.assert_called_once_with({"set_temperature_f": 70})
+    first, second = aioresponses.requests[("patch", URL(DEVICE_URL))]
+    assert first.kwargs["data"] == b'{"set_temperature_f":70}'
+    assert second.kwargs["data"] is first.kwargs["data"]
+    assert first.kwargs["headers"] == {
+        "Content-type": "application/json; charset=UTF-8",
+        "Authorization": "Bearer 1234567890",
+    }
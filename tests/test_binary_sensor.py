@@ -1,14 +1,15 @@
 """Tests for the SleepmeBinarySensor module."""
 
-from unittest.mock import MagicMock, patch
+from unittest.mock import MagicMock
 
 import pytest
 
 from custom_components.sleepme_thermostat.binary_sensor import (
+    BINARY_SENSOR_DESCRIPTIONS,
     SleepmeBinarySensor,
+    SleepmeBinarySensorEntityDescription,
     async_setup_entry,
 )
-from custom_components.sleepme_thermostat.const import BINARY_SENSOR_TYPES
 from custom_components.sleepme_thermostat.coordinator import (
     SleepmeDataUpdateCoordinator,
 )
@@ -21,11 +22,11 @@ def mock_coordinator() -> MagicMock:
     coordinator.data = {
         "dev1": {
             "name": "Bed 1",
-            "status": {"is_connected": True},
+            "status": {"is_connected": True, "is_water_low": False},
         },
         "dev2": {
             "name": "Bed 2",
-            "status": {"is_connected": False},
+            "status": {"is_connected": False, "is_water_low": True},
         },
     }
     return coordinator
@@ -48,45 +49,54 @@ async def test_async_setup_entry_adds_entities(
     await async_setup_entry(hass, mock_config_entry, add_entities)
 
     # Should add one entity per device per sensor type
-    expected_count = len(BINARY_SENSOR_TYPES) * len(mock_coordinator.data)
+    expected_count = len(BINARY_SENSOR_DESCRIPTIONS) * len(mock_coordinator.data)
     assert len(added_entities) == expected_count
     # All should be SleepmeBinarySensor
     assert all(isinstance(e, SleepmeBinarySensor) for e in added_entities)
 
 
+def _description(key: str) -> SleepmeBinarySensorEntityDescription:
+    """Return the binary sensor description for a key."""
+    return next(d for d in BINARY_SENSOR_DESCRIPTIONS if d.key == key)
+
+
 @pytest.mark.parametrize(
-    ("sensor_type", "is_connected", "expected"),
+    ("device_id", "sensor_type", "expected"),
     [
-        ("is_connected", True, True),
-        ("is_connected", False, False),
+        ("dev1", "is_connected", True),
+        ("dev2", "is_connected", False),
+        ("dev1", "is_water_low", False),
+        ("dev2", "is_water_low", True),
     ],
 )
 def test_binary_sensor_properties(
     mock_coordinator: MagicMock,
+    device_id: str,
     sensor_type: str,
     *,
-    is_connected: bool,
     expected: bool,
 ) -> None:
-    """Test binary sensor properties for is_connected sensor type."""
-    # Patch BINARY_SENSOR_TYPES to ensure sensor_type is valid
-    with patch(
-        "custom_components.sleepme_thermostat.binary_sensor.BINARY_SENSOR_TYPES",
-        {sensor_type: "Test Sensor"},
-    ):
-        # Patch status for the device - the implementation only checks is_connected
-        mock_coordinator.data["dev1"]["status"] = {"is_connected": is_connected}
-        sensor = SleepmeBinarySensor(mock_coordinator, "dev1", sensor_type)
-        # Name and unique_id
-        assert sensor.name == "Bed 1 Test Sensor"
-        assert sensor.unique_id == f"dev1_{sensor_type}"
-        # is_on property - the implementation only checks is_connected regardless of
-        # sensor_type
-        assert sensor.is_on == expected
+    """Test binary sensor properties for each sensor type."""
+    description = _description(sensor_type)
+    sensor = SleepmeBinarySensor(mock_coordinator, device_id, description)
+
+    device_name = mock_coordinator.data[device_id]["name"]
+    assert sensor.name == f"{device_name} {description.name}"
+    assert sensor.unique_id == f"{device_id}_{sensor_type}"
+    assert sensor.is_on == expected
+
+
+def test_binary_sensor_is_connected_missing_status(mock_coordinator: MagicMock) -> None:
+    """Test is_connected defaults to False when status is missing."""
+    mock_coordinator.data["dev1"].pop("status")
+    sensor = SleepmeBinarySensor(mock_coordinator, "dev1", _description("is_connected"))
+
+    assert sensor.is_on is False
 
 
 def test_binary_sensor_is_on_key_error(mock_coordinator: MagicMock) -> None:
     """Test binary sensor KeyError during initialization."""
-    # The current implementation raises KeyError during __init__, not during is_on
     with pytest.raises(KeyError):
-        SleepmeBinarySensor(mock_coordinator, "missing_dev", "is_connected")
+        SleepmeBinarySensor(
+            mock_coordinator, "missing_dev", _description("is_connected")
+        )
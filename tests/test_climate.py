@@ -1,5 +1,7 @@
 """Tests for the SleepmeClimate module."""
 
+from collections.abc import Awaitable, Callable
+from datetime import UTC, datetime
 from unittest.mock import MagicMock, patch
 
 import pytest
@@ -10,16 +12,31 @@ from homeassistant.components.climate.const import (
 )
 from homeassistant.const import UnitOfTemperature
 from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers.entity import Entity
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
 from custom_components.sleepme_thermostat.climate import (
     SleepmeClimate,
     async_setup_entry,
 )
-from custom_components.sleepme_thermostat.const import PRESET_MAX_COOL, PRESET_MAX_HEAT
+from custom_components.sleepme_thermostat.const import (
+    CONF_PUBLISH_INTERVAL,
+    CONF_TEMPERATURE_DEADBAND,
+    OFFLINE_AFTER_FAILURES,
+    PRESET_MAX_COOL,
+    PRESET_MAX_HEAT,
+)
 from custom_components.sleepme_thermostat.coordinator import (
     SleepmeDataUpdateCoordinator,
 )
+from custom_components.sleepme_thermostat.exceptions import (
+    SleepmeApiClientCommunicationError,
+)
+from custom_components.sleepme_thermostat.health import SleepmeHealth
+from custom_components.sleepme_thermostat.history import SleepmeReadingHistory
+
+from .fake_clock import FakeClock
 
 
 class TestSleepmeClimate:
@@ -51,6 +68,11 @@ class TestSleepmeClimate:
                 },
             }
         }
+        coordinator.last_update_success = True
+        coordinator.health = SleepmeHealth()
+        coordinator.unchanged = set()
+        coordinator.config_entry = MagicMock(options={})
+        coordinator.clock = FakeClock()
         return coordinator
 
     @pytest.fixture
@@ -144,6 +166,14 @@ class TestSleepmeClimate:
         assert attributes["is_water_low"] is False
         assert attributes["is_connected"] is True
 
+    def test_extra_state_attributes_unrecorded(
+        self, climate_entity: SleepmeClimate
+    ) -> None:
+        """Test the binary sensor mirrors are excluded from the recorder."""
+        unrecorded = climate_entity._unrecorded_attributes  # noqa: SLF001
+
+        assert {"is_water_low", "is_connected"} <= unrecorded
+
     def test_available_connected(self, climate_entity: SleepmeClimate) -> None:
         """Test available property when device is connected."""
         assert climate_entity.available is True
@@ -157,6 +187,23 @@ class TestSleepmeClimate:
 
         assert entity.available is False
 
+    def test_available_offline(
+        self, mock_coordinator: MagicMock, climate_entity: SleepmeClimate
+    ) -> None:
+        """Test the entity keeps its last data once the cloud is offline."""
+        for _ in range(OFFLINE_AFTER_FAILURES):
+            mock_coordinator.health.record_failure("timeout")
+
+        assert climate_entity.available is True
+
+    def test_available_auth_failed(
+        self, mock_coordinator: MagicMock, climate_entity: SleepmeClimate
+    ) -> None:
+        """Test the entity is unavailable with invalid credentials."""
+        mock_coordinator.health.record_failure("Invalid", auth_failed=True)
+
+        assert climate_entity.available is False
+
     def test_available_missing_status(
         self, mock_coordinator: SleepmeDataUpdateCoordinator
     ) -> None:
@@ -251,6 +298,9 @@ class TestSleepmeClimate:
 
             assert climate_entity.target_temperature == 75
             mock_write.assert_called_once()
+        climate_entity.coordinator.async_set_device_temperature.assert_awaited_once_with(
+            "device_123", 75.0
+        )
 
     @pytest.mark.asyncio
     async def test_async_set_temperature_none(
@@ -286,6 +336,9 @@ class TestSleepmeClimate:
 
             assert climate_entity.hvac_mode == HVACMode.HEAT_COOL
             mock_write.assert_called_once()
+        climate_entity.coordinator.async_set_device_mode.assert_awaited_once_with(
+            "device_123", "active"
+        )
 
     @pytest.mark.asyncio
     async def test_async_set_hvac_mode_off(
@@ -303,15 +356,169 @@ class TestSleepmeClimate:
     async def test_async_update(self, climate_entity: SleepmeClimate) -> None:
         """Test async update method."""
         with patch.object(
-            climate_entity.coordinator, "async_request_refresh"
+            climate_entity.coordinator, "async_refresh_device"
         ) as mock_refresh:
             await climate_entity.async_update()
 
-            mock_refresh.assert_called_once()
+            mock_refresh.assert_called_once_with("device_123")
             # Verify state was updated from coordinator data
             assert climate_entity.target_temperature == 72.0
             assert climate_entity.current_temperature == 74.0
 
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        ("call", "translation_key"),
+        [
+            (
+                lambda entity: entity.async_set_temperature(temperature=75.0),
+                "set_temperature_failed",
+            ),
+            (
+                lambda entity: entity.async_set_hvac_mode(HVACMode.HEAT_COOL),
+                "set_hvac_mode_failed",
+            ),
+            (lambda entity: entity.async_update(), "refresh_failed"),
+        ],
+        ids=["set_temperature", "set_hvac_mode", "update"],
+    )
+    async def test_service_call_failed(
+        self,
+        climate_entity: SleepmeClimate,
+        call: Callable[[SleepmeClimate], Awaitable[None]],
+        translation_key: str,
+    ) -> None:
+        """Test a failed request of a service call shows an error, not a traceback."""
+        coordinator = climate_entity.coordinator
+        error = SleepmeApiClientCommunicationError("timeout")
+        coordinator.async_set_device_temperature.side_effect = error
+        coordinator.async_set_device_mode.side_effect = error
+        target_temperature = climate_entity.target_temperature
+
+        with (
+            patch.object(coordinator, "async_refresh_device", side_effect=error),
+            patch.object(climate_entity, "async_write_ha_state") as mock_write,
+            pytest.raises(HomeAssistantError) as exc_info,
+        ):
+            await call(climate_entity)
+
+        assert exc_info.value.translation_key == translation_key
+        assert exc_info.value.translation_placeholders == {
+            "name": "Test Bed",
+            "error": "timeout",
+        }
+        assert exc_info.value.__cause__ is error
+        # Nothing is shown as if the command went through
+        assert climate_entity.target_temperature == target_temperature
+        mock_write.assert_not_called()
+
+    def test_interpolate_current_temperature(
+        self, mock_coordinator: MagicMock, climate_entity: SleepmeClimate
+    ) -> None:
+        """Test the current temperature is interpolated until the next poll."""
+        history = SleepmeReadingHistory(5)
+        history.append(0.0, mock_coordinator.data["device_123"])
+        mock_coordinator.data["device_123"]["status"]["water_temperature_f"] = 73.0
+        history.append(60.0, mock_coordinator.data["device_123"])
+        mock_coordinator.get_history.return_value = history
+
+        with patch.object(climate_entity, "async_write_ha_state") as mock_write:
+            climate_entity._async_interpolate(  # noqa: SLF001
+                datetime.fromtimestamp(90.0, tz=UTC)
+            )
+            assert climate_entity.current_temperature == 72.5
+            mock_write.assert_called_once()
+
+            # Unchanged estimates are not written again
+            climate_entity._async_interpolate(  # noqa: SLF001
+                datetime.fromtimestamp(90.0, tz=UTC)
+            )
+            mock_write.assert_called_once()
+
+            climate_entity._handle_coordinator_update()  # noqa: SLF001
+            assert climate_entity.current_temperature == 73.0
+
+    def test_interpolate_without_estimate(
+        self, mock_coordinator: MagicMock, climate_entity: SleepmeClimate
+    ) -> None:
+        """Test nothing is published without an estimate."""
+        mock_coordinator.get_history.return_value = SleepmeReadingHistory(5)
+
+        with patch.object(climate_entity, "async_write_ha_state") as mock_write:
+            climate_entity._async_interpolate(  # noqa: SLF001
+                datetime.fromtimestamp(90.0, tz=UTC)
+            )
+
+        mock_write.assert_not_called()
+        assert climate_entity.current_temperature == 74.0
+
+    def test_no_interpolation_while_disconnected(
+        self, mock_coordinator: MagicMock, climate_entity: SleepmeClimate
+    ) -> None:
+        """Test nothing is published for a device that is not connected."""
+        mock_coordinator.data["device_123"]["status"]["is_connected"] = False
+
+        with patch.object(climate_entity, "async_write_ha_state") as mock_write:
+            climate_entity._async_interpolate(  # noqa: SLF001
+                datetime.fromtimestamp(90.0, tz=UTC)
+            )
+
+        mock_write.assert_not_called()
+        mock_coordinator.get_history.assert_not_called()
+
+    def test_unchanged_device_not_written(
+        self, mock_coordinator: MagicMock, climate_entity: SleepmeClimate
+    ) -> None:
+        """Test no state is written when the device was not polled."""
+        mock_coordinator.unchanged = {"device_123"}
+
+        with patch.object(climate_entity, "async_write_ha_state") as mock_write:
+            climate_entity._handle_coordinator_update()  # noqa: SLF001
+
+        mock_write.assert_not_called()
+
+    def test_current_temperature_throttled(self, mock_coordinator: MagicMock) -> None:
+        """Test changes within the deadband are held back until the interval."""
+        mock_coordinator.config_entry.options = {
+            CONF_TEMPERATURE_DEADBAND: 2,
+            CONF_PUBLISH_INTERVAL: 10,
+        }
+        entity = SleepmeClimate(mock_coordinator, "device_123")
+        status = mock_coordinator.data["device_123"]["status"]
+
+        with patch.object(entity, "async_write_ha_state"):
+            status["water_temperature_f"] = 73.0
+            entity._handle_coordinator_update()  # noqa: SLF001
+            assert entity.current_temperature == 74.0
+
+            status["water_temperature_f"] = 72.0
+            entity._handle_coordinator_update()  # noqa: SLF001
+            assert entity.current_temperature == 72.0
+
+            status["water_temperature_f"] = 71.5
+            entity._handle_coordinator_update()  # noqa: SLF001
+            assert entity.current_temperature == 72.0
+            mock_coordinator.clock.now += 600
+            entity._handle_coordinator_update()  # noqa: SLF001
+            assert entity.current_temperature == 71.5
+
+    def test_throttled_state_not_written(self, mock_coordinator: MagicMock) -> None:
+        """Test no state is written while the deadband holds everything back."""
+        mock_coordinator.config_entry.options = {CONF_TEMPERATURE_DEADBAND: 2}
+        entity = SleepmeClimate(mock_coordinator, "device_123")
+        data = mock_coordinator.data["device_123"]
+
+        with patch.object(Entity, "async_write_ha_state") as mock_write:
+            entity._handle_coordinator_update()  # noqa: SLF001
+            assert mock_write.call_count == 1
+
+            data["status"]["water_temperature_f"] = 73.0
+            entity._handle_coordinator_update()  # noqa: SLF001
+            assert mock_write.call_count == 1
+
+            data["control"]["set_temperature_f"] = 70.0
+            entity._handle_coordinator_update()  # noqa: SLF001
+            assert mock_write.call_count == 2
+
 
 class TestClimateSetup:
     """Test cases for climate setup."""
@@ -325,6 +532,8 @@ class TestClimateSetup:
         mock_runtime_data = MagicMock()
         mock_runtime_data.coordinator = mock_coordinator
         mock_config_entry.runtime_data = mock_runtime_data
+        mock_config_entry.options = {}
+        mock_coordinator.config_entry = mock_config_entry
 
         # Mock coordinator data
         mock_coordinator.data = {
@@ -357,6 +566,8 @@ class TestClimateSetup:
         mock_runtime_data = MagicMock()
         mock_runtime_data.coordinator = mock_coordinator
         mock_config_entry.runtime_data = mock_runtime_data
+        mock_config_entry.options = {}
+        mock_coordinator.config_entry = mock_config_entry
 
         # Mock empty coordinator data
         mock_coordinator.data = {}
@@ -0,0 +1,26 @@
+"""Tests for the Clock module."""
+
+import asyncio
+from unittest.mock import patch
+
+import pytest
+
+from custom_components.sleepme_thermostat.clock import SYSTEM_CLOCK
+
+
+class TestClock:
+    """Test cases for the Clock class."""
+
+    def test_monotonic_ignores_wall_clock(self) -> None:
+        """Test a step of the wall clock does not move the clock back."""
+        before = SYSTEM_CLOCK.monotonic()
+        with patch("time.time", return_value=0):
+            assert SYSTEM_CLOCK.monotonic() >= before
+
+    @pytest.mark.asyncio
+    async def test_call_later(self) -> None:
+        """Test scheduled calls run in the event loop."""
+        called = asyncio.Event()
+        SYSTEM_CLOCK.call_later(0, called.set)
+        await SYSTEM_CLOCK.sleep(0)
+        await asyncio.wait_for(called.wait(), timeout=1)
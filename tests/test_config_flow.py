@@ -7,8 +7,20 @@ import pytest
 from aioresponses import aioresponses
 from homeassistant import config_entries, setup
 from homeassistant.core import HomeAssistant
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+from yarl import URL
 
-from custom_components.sleepme_thermostat.const import CONF_API_KEY, DOMAIN
+from custom_components.sleepme_thermostat.const import (
+    CONF_API_KEY,
+    CONF_BEDTIME,
+    CONF_WAKE_TIME,
+    DOMAIN,
+)
+from custom_components.sleepme_thermostat.validation_cache import (
+    async_get_validation_cache,
+)
+
+DEVICES_URL = "https://api.developer.sleep.me/v1/devices"
 
 
 @pytest.mark.asyncio
@@ -41,8 +53,117 @@ async def test_form(hass: HomeAssistant, aioresponses: aioresponses) -> None:
             )
 
         assert result2.get("type") == "form"
+        assert result2.get("errors") == {"base": "cannot_connect"}
 
         await hass.async_block_till_done()
 
         assert len(mock_setup.mock_calls) == 0
         assert len(mock_setup_entry.mock_calls) == 0
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ("status", "error"),
+    [(401, "auth"), (429, "rate_limited"), (500, "cannot_connect")],
+)
+async def test_form_errors(
+    hass: HomeAssistant, aioresponses: aioresponses, status: int, error: str
+) -> None:
+    """Test failed validations are told apart, without retrying."""
+    aioresponses.get(DEVICES_URL, status=status)
+    result = await hass.config_entries.flow.async_init(
+        DOMAIN, context={"source": config_entries.SOURCE_USER}
+    )
+    result = await hass.config_entries.flow.async_configure(
+        result["flow_id"], {CONF_API_KEY: "1234567890"}
+    )
+
+    assert result.get("type") == "form"
+    assert result.get("errors") == {"base": error}
+    assert len(aioresponses.requests[("get", URL(DEVICES_URL))]) == 1
+
+
+@pytest.mark.asyncio
+async def test_form_no_devices(hass: HomeAssistant, aioresponses: aioresponses) -> None:
+    """Test an account without supported devices is rejected."""
+    aioresponses.get(DEVICES_URL, payload=[{"id": "abcd", "name": "A Bed"}])
+    result = await hass.config_entries.flow.async_init(
+        DOMAIN, context={"source": config_entries.SOURCE_USER}
+    )
+    result = await hass.config_entries.flow.async_configure(
+        result["flow_id"], {CONF_API_KEY: "1234567890"}
+    )
+
+    assert result.get("errors") == {"base": "no_devices"}
+
+
+@pytest.mark.asyncio
+async def test_form_resubmitted(
+    hass: HomeAssistant, aioresponses: aioresponses
+) -> None:
+    """Test a resubmitted key is checked again, and no device list is cached."""
+    aioresponses.get(DEVICES_URL, payload=[{"id": "abcd", "name": "A Bed"}])
+    aioresponses.get(DEVICES_URL, status=401)
+    result = await hass.config_entries.flow.async_init(
+        DOMAIN, context={"source": config_entries.SOURCE_USER}
+    )
+    result = await hass.config_entries.flow.async_configure(
+        result["flow_id"], {CONF_API_KEY: "1234567890"}
+    )
+    assert result.get("errors") == {"base": "no_devices"}
+    assert async_get_validation_cache(hass).pop("1234567890") is None
+
+    result = await hass.config_entries.flow.async_configure(
+        result["flow_id"], {CONF_API_KEY: "1234567890"}
+    )
+
+    assert result.get("errors") == {"base": "auth"}
+    assert len(aioresponses.requests[("get", URL(DEVICES_URL))]) == 2
+
+
+@pytest.mark.asyncio
+async def test_setup_reuses_device_list(
+    hass: HomeAssistant, aioresponses: aioresponses
+) -> None:
+    """Test the setup after the flow does not fetch the device list again."""
+    aioresponses.get(
+        DEVICES_URL,
+        payload=[{"id": "abcd", "name": "A Bed", "attachments": ["CHILIPAD_PRO"]}],
+    )
+    aioresponses.get(
+        f"{DEVICES_URL}/abcd",
+        payload={"status": {"is_connected": True, "water_temperature_f": 74}},
+    )
+    result = await hass.config_entries.flow.async_init(
+        DOMAIN, context={"source": config_entries.SOURCE_USER}
+    )
+    result = await hass.config_entries.flow.async_configure(
+        result["flow_id"], {CONF_API_KEY: "1234567890"}
+    )
+    await hass.async_block_till_done()
+
+    assert result.get("type") == "create_entry"
+    assert result["result"].state is config_entries.ConfigEntryState.LOADED
+    assert len(aioresponses.requests[("get", URL(DEVICES_URL))]) == 1
+    assert hass.states.get("climate.a_bed")
+
+
+@pytest.mark.asyncio
+async def test_options_clear_bedtime(hass: HomeAssistant) -> None:
+    """Test a cleared bedtime is removed from the options, to be learned again."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        version=2,
+        data={CONF_API_KEY: "1234567890"},
+        options={CONF_BEDTIME: "22:00:00", CONF_WAKE_TIME: "06:30:00"},
+    )
+    entry.add_to_hass(hass)
+
+    result = await hass.config_entries.options.async_init(entry.entry_id)
+    result = await hass.config_entries.options.async_configure(
+        result["flow_id"], {CONF_WAKE_TIME: "07:00:00"}
+    )
+
+    assert result.get("type") == "create_entry"
+    assert CONF_BEDTIME not in entry.options
+    assert entry.options[CONF_WAKE_TIME] == "07:00:00"
@@ -1,18 +1,54 @@
 """Tests for the SleepmeDataUpdateCoordinator module."""
 
-from unittest.mock import AsyncMock, MagicMock
+import asyncio
+from collections.abc import Coroutine, Generator
+from datetime import timedelta
+from unittest.mock import ANY, AsyncMock, MagicMock, patch
 
 import pytest
+from homeassistant.helpers.device_registry import CONNECTION_NETWORK_MAC
 
+from custom_components.sleepme_thermostat.api import (
+    SleepmeApiClientCommunicationError,
+    SleepmeApiClientError,
+    SleepmeApiClientRateLimitError,
+)
+from custom_components.sleepme_thermostat.const import (
+    CONF_BEDTIME,
+    DENSE_POLL_INTERVAL,
+    DOMAIN,
+    FOLLOW_UP_DELAYS,
+    OFFLINE_AFTER_FAILURES,
+    PROBE_MIN_INTERVAL,
+)
 from custom_components.sleepme_thermostat.coordinator import (
     SleepmeDataUpdateCoordinator,
 )
+from custom_components.sleepme_thermostat.health import HealthState
+from custom_components.sleepme_thermostat.probe import SleepmeDeviceProbe
+from tests.fake_clock import FakeClock
 
 
 class DummyConfigEntry:
     """Dummy config entry."""
 
 
+@pytest.fixture(autouse=True)
+def mock_store() -> Generator[MagicMock]:
+    """Mock the storage of the polling schedule."""
+    with patch(
+        "custom_components.sleepme_thermostat.coordinator.Store", autospec=True
+    ) as store_class:
+        store_class.return_value.async_load.return_value = None
+        yield store_class.return_value
+
+
+def _close_task(_hass: object, coro: Coroutine, _name: str) -> MagicMock:
+    """Discard a background task instead of running it."""
+    coro.close()
+    return MagicMock()
+
+
 @pytest.mark.asyncio
 async def test_async_set_device_mode_sets_control() -> None:
     """Test async_set_device_mode updates the device control data."""
@@ -25,6 +61,7 @@ async def test_async_set_device_mode_sets_control() -> None:
     mock_runtime_data.client = mock_api_client
     mock_config_entry = MagicMock()
     mock_config_entry.runtime_data = mock_runtime_data
+    mock_config_entry.async_create_background_task.side_effect = _close_task
 
     # Setup coordinator with mock config entry and data
     mock_hass = MagicMock()
@@ -41,3 +78,502 @@ async def test_async_set_device_mode_sets_control() -> None:
     mock_api_client.async_set_device_mode.assert_awaited_once_with("dev1", "active")
     # Assert coordinator data was updated
     assert coordinator.data["dev1"]["control"] == {"thermal_control_status": "active"}
+    # Assert the device is refreshed until it confirms the command
+    mock_config_entry.async_create_background_task.assert_called_once()
+
+
+@pytest.fixture
+def device_data() -> dict:
+    """Return coordinator data for a single device."""
+    return {
+        "dev1": {
+            "id": "dev1",
+            "name": "Bed 1",
+            "about": {
+                "model": "DP999NA",
+                "firmware_version": "5.39.2134",
+                "mac_address": "B4:8A:0A:4F:90:54",
+                "serial_number": "32404160372",
+                "ip_address": "70.190.108.13",
+            },
+        }
+    }
+
+
+def test_get_device_info_builds_from_about(device_data: dict) -> None:
+    """Test get_device_info builds the registry info from the about data."""
+    coordinator = SleepmeDataUpdateCoordinator(MagicMock(), MagicMock(), name="test")
+    coordinator.data = device_data
+
+    device_info = coordinator.get_device_info("dev1")
+
+    assert device_info["identifiers"] == {(DOMAIN, "dev1")}
+    assert device_info["name"] == "Bed 1"
+    assert device_info["model"] == "DP999NA"
+    assert device_info["serial_number"] == "32404160372"
+    assert device_info["sw_version"] == "5.39.2134"
+    assert device_info["connections"] == {(CONNECTION_NETWORK_MAC, "b4:8a:0a:4f:90:54")}
+
+
+def test_get_device_info_without_mac(device_data: dict) -> None:
+    """Test get_device_info omits connections when the MAC is unknown."""
+    coordinator = SleepmeDataUpdateCoordinator(MagicMock(), MagicMock(), name="test")
+    device_data["dev1"].pop("about")
+    coordinator.data = device_data
+
+    device_info = coordinator.get_device_info("dev1")
+
+    assert "connections" not in device_info
+    assert device_info["model"] is None
+
+
+def test_get_device_info_is_shared_until_details_change(device_data: dict) -> None:
+    """Test the device info is cached and only rebuilt on identity changes."""
+    coordinator = SleepmeDataUpdateCoordinator(MagicMock(), MagicMock(), name="test")
+    coordinator.data = device_data
+
+    first = coordinator.get_device_info("dev1")
+    device_data["dev1"]["about"]["ip_address"] = "70.190.108.14"
+    assert coordinator.get_device_info("dev1") is first
+
+    device_data["dev1"]["about"]["firmware_version"] = "5.40.0"
+    updated = coordinator.get_device_info("dev1")
+    assert updated is not first
+    assert updated["sw_version"] == "5.40.0"
+
+
+def test_update_device_registry_on_firmware_change(
+    device_data: dict,
+) -> None:
+    """Test known devices are updated in the registry on firmware changes."""
+    coordinator = SleepmeDataUpdateCoordinator(MagicMock(), MagicMock(), name="test")
+    coordinator.data = device_data
+    first = coordinator.get_device_info("dev1")
+
+    registry = MagicMock()
+    with patch(
+        "custom_components.sleepme_thermostat.coordinator.dr.async_get",
+        return_value=registry,
+    ):
+        coordinator._async_update_device_registry(device_data)  # noqa: SLF001
+        registry.async_update_device.assert_not_called()
+
+        changed = {"dev1": {**device_data["dev1"], "about": {"model": "DP999NA"}}}
+        coordinator._async_update_device_registry(changed)  # noqa: SLF001
+
+    registry.async_update_device.assert_called_once_with(
+        registry.async_get_device.return_value.id,
+        model="DP999NA",
+        serial_number=None,
+        sw_version=None,
+    )
+    assert coordinator.get_device_info("dev1") is not first
+
+
+def test_record_history_appends_per_device(device_data: dict) -> None:
+    """Test each fetched device state is appended to its history."""
+    coordinator = SleepmeDataUpdateCoordinator(MagicMock(), MagicMock(), name="test")
+    device_data["dev1"]["status"] = {"water_temperature_f": 74}
+
+    coordinator._record_history(device_data)  # noqa: SLF001
+    coordinator._record_history(device_data)  # noqa: SLF001
+
+    history = coordinator.get_history("dev1")
+    assert len(history) == 2
+    latest = history.latest()
+    assert latest
+    assert latest.water_temperature_f == 74
+
+
+def _coordinator_with_client(devices: list[dict]) -> tuple:
+    """Return a coordinator and its mock client serving a device list."""
+    client = AsyncMock()
+    client.async_get_devices = AsyncMock(return_value=devices)
+    client.async_get_device_state = AsyncMock(
+        side_effect=lambda device_id, _deadline=None: {
+            "about": {"model": "DP999NA"},
+            "control": {"set_temperature_f": 70},
+            "status": {"water_temperature_f": 74, "id": device_id},
+        }
+    )
+    config_entry = MagicMock()
+    config_entry.runtime_data.client = client
+    coordinator = SleepmeDataUpdateCoordinator(MagicMock(), MagicMock(), name="test")
+    coordinator.config_entry = config_entry
+    return coordinator, client
+
+
+def _listed(device_id: str, *, with_state: bool) -> dict:
+    """Return a device list entry, optionally carrying its state."""
+    device = {"id": device_id, "name": device_id}
+    if with_state:
+        device["control"] = {"set_temperature_f": 68}
+        device["status"] = {"water_temperature_f": 80}
+    return device
+
+
+@pytest.mark.asyncio
+async def test_update_uses_device_list_states() -> None:
+    """Test a device list carrying states needs a single request per refresh."""
+    coordinator, client = _coordinator_with_client(
+        [_listed("dev1", with_state=True), _listed("dev2", with_state=True)]
+    )
+    await coordinator._async_setup()  # noqa: SLF001
+
+    # The first refresh reuses the setup list, but needs the about data
+    coordinator.data = await coordinator._async_update_data()  # noqa: SLF001
+    assert client.async_get_devices.await_count == 1
+    assert client.async_get_device_state.await_count == 2
+
+    coordinator.data = await coordinator._async_update_data()  # noqa: SLF001
+    assert client.async_get_devices.await_count == 2
+    assert client.async_get_device_state.await_count == 2
+    assert coordinator.data["dev1"]["status"] == {"water_temperature_f": 80}
+    assert coordinator.data["dev1"]["about"] == {"model": "DP999NA"}
+
+
+@pytest.mark.asyncio
+async def test_update_falls_back_for_devices_missing_state() -> None:
+    """Test devices missing from the bulk states are fetched on their own."""
+    coordinator, client = _coordinator_with_client(
+        [_listed("dev1", with_state=True), _listed("dev2", with_state=False)]
+    )
+    await coordinator._async_setup()  # noqa: SLF001
+    coordinator.data = await coordinator._async_update_data()  # noqa: SLF001
+    client.async_get_device_state.reset_mock()
+
+    coordinator.data = await coordinator._async_update_data()  # noqa: SLF001
+
+    client.async_get_device_state.assert_awaited_once_with("dev2", ANY)
+    assert coordinator.data["dev2"]["status"]["water_temperature_f"] == 74
+
+
+@pytest.mark.asyncio
+async def test_update_without_device_list_states() -> None:
+    """Test the device list is not refetched when it carries no states."""
+    coordinator, client = _coordinator_with_client(
+        [_listed("dev1", with_state=False), _listed("dev2", with_state=False)]
+    )
+    await coordinator._async_setup()  # noqa: SLF001
+
+    coordinator.data = await coordinator._async_update_data()  # noqa: SLF001
+    coordinator.data = await coordinator._async_update_data()  # noqa: SLF001
+
+    assert client.async_get_devices.await_count == 1
+    assert client.async_get_device_state.await_count == 4
+
+
+@pytest.mark.asyncio
+async def test_update_stops_bulk_when_states_disappear() -> None:
+    """Test the coordinator falls back once the device list loses the states."""
+    coordinator, client = _coordinator_with_client([_listed("dev1", with_state=True)])
+    await coordinator._async_setup()  # noqa: SLF001
+    coordinator.data = await coordinator._async_update_data()  # noqa: SLF001
+
+    client.async_get_devices.return_value = [_listed("dev1", with_state=False)]
+    coordinator.data = await coordinator._async_update_data()  # noqa: SLF001
+    coordinator.data = await coordinator._async_update_data()  # noqa: SLF001
+
+    assert client.async_get_devices.await_count == 2
+    assert client.async_get_device_state.await_count == 3
+
+
+@pytest.mark.asyncio
+async def test_setup_loads_schedule(mock_store: MagicMock) -> None:
+    """Test the stored schedule and the fixed times are loaded on setup."""
+    mock_store.async_load.return_value = {"weights": [0.0] * 95 + [1.0]}
+    coordinator, _ = _coordinator_with_client([_listed("dev1", with_state=False)])
+    coordinator.config_entry.options = {CONF_BEDTIME: "22:00:00"}
+
+    await coordinator._async_setup()  # noqa: SLF001
+
+    assert coordinator.schedule.as_dict()["expected"] == ["22:00", "23:52"]
+
+
+@pytest.mark.asyncio
+async def test_update_learns_transitions(mock_store: MagicMock) -> None:
+    """Test on/off transitions are recorded and the interval adapted."""
+    coordinator, client = _coordinator_with_client([_listed("dev1", with_state=True)])
+    coordinator.update_interval = timedelta(minutes=10)
+    coordinator._base_update_interval = coordinator.update_interval  # noqa: SLF001
+    await coordinator._async_setup()  # noqa: SLF001
+    coordinator.data = await coordinator._async_update_data()  # noqa: SLF001
+    mock_store.async_delay_save.assert_not_called()
+
+    active = _listed("dev1", with_state=True)
+    active["control"]["thermal_control_status"] = "active"
+    client.async_get_devices.return_value = [active]
+    coordinator.data = await coordinator._async_update_data()  # noqa: SLF001
+
+    mock_store.async_delay_save.assert_called_once()
+    assert len(coordinator.schedule.as_dict()["expected"]) == 1
+    # Right after the transition polling is dense
+    assert coordinator.update_interval == DENSE_POLL_INTERVAL
+
+
+@pytest.mark.asyncio
+async def test_follow_up_stops_once_confirmed(clock: FakeClock) -> None:
+    """Test the follow-up refresh stops once the device reports the command."""
+    coordinator, client = _coordinator_with_client([])
+    coordinator.clock = clock
+    coordinator.data = {"dev1": {"control": {"set_temperature_f": 68}}}
+
+    await coordinator._async_follow_up("dev1", {"set_temperature_f": 70})  # noqa: SLF001
+
+    assert clock.sleeps == [FOLLOW_UP_DELAYS[0]]
+    client.async_get_device_state.assert_awaited_once_with("dev1")
+    assert coordinator.data["dev1"]["control"] == {"set_temperature_f": 70}
+    assert len(coordinator.get_history("dev1")) == 1
+
+
+@pytest.mark.asyncio
+async def test_follow_up_gives_up_after_last_delay(clock: FakeClock) -> None:
+    """Test the follow-up refresh is bounded when the device never confirms."""
+    coordinator, client = _coordinator_with_client([])
+    coordinator.clock = clock
+    coordinator.data = {"dev1": {"control": {}}}
+    client.async_get_device_state.side_effect = [
+        SleepmeApiClientError("timeout"),
+        {"control": {"set_temperature_f": 68}},
+        {"control": {"set_temperature_f": 68}},
+    ]
+
+    await coordinator._async_follow_up("dev1", {"set_temperature_f": 70})  # noqa: SLF001
+
+    # Sleeps are relative to the previous refresh
+    assert clock.sleeps == [
+        FOLLOW_UP_DELAYS[0],
+        FOLLOW_UP_DELAYS[1] - FOLLOW_UP_DELAYS[0],
+        FOLLOW_UP_DELAYS[2] - FOLLOW_UP_DELAYS[1],
+    ]
+    assert client.async_get_device_state.await_count == len(FOLLOW_UP_DELAYS)
+    assert coordinator.data["dev1"]["control"] == {"set_temperature_f": 68}
+
+
+@pytest.mark.asyncio
+async def test_new_command_cancels_follow_up() -> None:
+    """Test a newer command replaces the pending follow-up of its device."""
+    coordinator, client = _coordinator_with_client([])
+    coordinator.config_entry.async_create_background_task.side_effect = _close_task
+    client.async_set_device_temperature.return_value = {"set_temperature_f": 70}
+    coordinator.data = {"dev1": {"control": {}}}
+
+    await coordinator.async_set_device_temperature("dev1", 70)
+    first = coordinator._follow_ups["dev1"]  # noqa: SLF001
+    await coordinator.async_set_device_temperature("dev1", 72)
+
+    first.cancel.assert_called_once()
+    client.async_set_device_temperature.assert_awaited_with("dev1", 72)
+
+
+@pytest.mark.asyncio
+async def test_update_failure_serves_cached_data() -> None:
+    """Test failed refreshes keep the last data and back off."""
+    coordinator, client = _coordinator_with_client([_listed("dev1", with_state=True)])
+    coordinator.update_interval = timedelta(minutes=10)
+    coordinator._base_update_interval = coordinator.update_interval  # noqa: SLF001
+    await coordinator._async_setup()  # noqa: SLF001
+    coordinator.data = await coordinator._async_update_data()  # noqa: SLF001
+    cached = coordinator.data
+
+    client.async_get_devices.side_effect = SleepmeApiClientCommunicationError("down")
+    assert await coordinator._async_update_data() is cached  # noqa: SLF001
+    assert coordinator.health.state is HealthState.DEGRADED
+    assert await coordinator._async_update_data() is cached  # noqa: SLF001
+    assert coordinator.update_interval == timedelta(minutes=20)
+
+    client.async_get_devices.side_effect = None
+    coordinator.data = await coordinator._async_update_data()  # noqa: SLF001
+    assert coordinator.health.state is HealthState.HEALTHY
+    assert coordinator.update_interval == timedelta(minutes=10)
+
+
+@pytest.mark.asyncio
+async def test_update_failure_offline_serves_cached_data() -> None:
+    """Test the last data is served, as stale, while the cloud is offline."""
+    coordinator, client = _coordinator_with_client([_listed("dev1", with_state=True)])
+    await coordinator._async_setup()  # noqa: SLF001
+    coordinator.data = await coordinator._async_update_data()  # noqa: SLF001
+    cached = coordinator.data
+    last_success = coordinator.health.last_success
+
+    client.async_get_devices.side_effect = SleepmeApiClientRateLimitError("429")
+    await coordinator._async_update_data()  # noqa: SLF001
+    assert coordinator.health.state is HealthState.RATE_LIMITED
+
+    client.async_get_devices.side_effect = SleepmeApiClientCommunicationError("down")
+    for _ in range(OFFLINE_AFTER_FAILURES - 1):
+        assert await coordinator._async_update_data() is cached  # noqa: SLF001
+    assert coordinator.health.state is HealthState.OFFLINE
+    assert coordinator.health.stale
+    assert coordinator.health.last_success == last_success
+
+
+@pytest.mark.asyncio
+async def test_update_fetches_devices_concurrently() -> None:
+    """Test the devices are fetched at the same time."""
+    coordinator, client = _coordinator_with_client(
+        [_listed("dev1", with_state=False), _listed("dev2", with_state=False)]
+    )
+    started = {"dev1": asyncio.Event(), "dev2": asyncio.Event()}
+
+    async def _get_device_state(device_id: str, _deadline: object) -> dict:
+        started[device_id].set()
+        # Only returns once every device's request is in flight
+        for event in started.values():
+            await event.wait()
+        return {"status": {"id": device_id}}
+
+    client.async_get_device_state.side_effect = _get_device_state
+    await coordinator._async_setup()  # noqa: SLF001
+
+    data = await asyncio.wait_for(coordinator._async_update_data(), 1)  # noqa: SLF001
+
+    assert list(data) == ["dev1", "dev2"]
+    assert data["dev2"]["status"] == {"id": "dev2"}
+
+
+@pytest.mark.asyncio
+async def test_load_cached_data(mock_store: MagicMock) -> None:
+    """Test the coordinator can start from the last run's data."""
+    coordinator, _ = _coordinator_with_client([])
+    mock_store.async_load.return_value = {"dev1": {"name": "Bed 1", "status": {}}}
+
+    assert await coordinator.async_load_cached_data()
+
+    assert coordinator.data == {"dev1": {"name": "Bed 1", "status": {}}}
+    assert coordinator.health.stale
+    # The time of the cached readings is not known
+    assert len(coordinator.get_history("dev1")) == 0
+
+
+@pytest.mark.asyncio
+async def test_refresh_cached_retries_discovery(mock_store: MagicMock) -> None:
+    """Test discovery that failed while starting from cached data is retried."""
+    coordinator, client = _coordinator_with_client([])
+    mock_store.async_load.return_value = {"dev1": {"name": "dev1", "status": {}}}
+    client.async_get_devices.side_effect = [
+        SleepmeApiClientCommunicationError("down"),
+        [_listed("dev1", with_state=True)],
+        [_listed("dev1", with_state=True)],
+    ]
+    assert await coordinator.async_load_cached_data()
+    with patch.object(coordinator, "async_refresh"):
+        await coordinator.async_refresh_cached()
+
+    # The cached devices are polled, then discovery is tried again
+    coordinator.data = await coordinator._async_update_data()  # noqa: SLF001
+    assert client.async_get_devices.await_count == 1
+    coordinator.data = await coordinator._async_update_data()  # noqa: SLF001
+    assert client.async_get_devices.await_count == 2
+    coordinator.data = await coordinator._async_update_data()  # noqa: SLF001
+
+    # The device list carries the states, no device is fetched on its own
+    assert client.async_get_devices.await_count == 3
+    assert client.async_get_device_state.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_update_saves_data(mock_store: MagicMock) -> None:
+    """Test every successful refresh stores the data for the next startup."""
+    coordinator, _ = _coordinator_with_client([_listed("dev1", with_state=True)])
+    assert not await coordinator.async_load_cached_data()
+    await coordinator._async_setup()  # noqa: SLF001
+
+    coordinator.data = await coordinator._async_update_data()  # noqa: SLF001
+
+    assert not coordinator.health.stale
+    assert mock_store.async_delay_save.called
+
+
+@pytest.mark.asyncio
+async def test_disconnected_device_probed(clock: FakeClock) -> None:
+    """Test a disconnected device is only polled when its probe is due."""
+    coordinator, client = _coordinator_with_client(
+        [_listed("dev1", with_state=False), _listed("dev2", with_state=False)]
+    )
+    coordinator.clock = clock
+    connected = {"dev1": False, "dev2": True}
+    client.async_get_device_state.side_effect = lambda device_id, _deadline=None: {
+        "control": {},
+        "status": {"is_connected": connected[device_id]},
+    }
+    await coordinator._async_setup()  # noqa: SLF001
+    coordinator.data = await coordinator._async_update_data()  # noqa: SLF001
+    assert set(coordinator.probes) == {"dev1"}
+    client.async_get_device_state.reset_mock()
+
+    # Before the probe is due the last data is reused without a request
+    clock.advance(PROBE_MIN_INTERVAL.total_seconds() - 1)
+    previous = coordinator.data["dev1"]
+    coordinator.data = await coordinator._async_update_data()  # noqa: SLF001
+    client.async_get_device_state.assert_awaited_once_with("dev2", ANY)
+    assert coordinator.data["dev1"] is previous
+    assert coordinator.unchanged == {"dev1"}
+    assert len(coordinator.get_history("dev1")) == 1
+
+    # A probe that finds the device still disconnected backs off
+    clock.advance(1)
+    coordinator.data = await coordinator._async_update_data()  # noqa: SLF001
+    assert client.async_get_device_state.await_count == 3
+    assert coordinator.unchanged == set()
+    assert coordinator.probes["dev1"].interval == (
+        2 * PROBE_MIN_INTERVAL.total_seconds()
+    )
+
+    # Once reconnected it is polled on every refresh again
+    connected["dev1"] = True
+    clock.advance(2 * PROBE_MIN_INTERVAL.total_seconds())
+    coordinator.data = await coordinator._async_update_data()  # noqa: SLF001
+    assert coordinator.probes == {}
+    coordinator.data = await coordinator._async_update_data()  # noqa: SLF001
+    assert client.async_get_device_state.await_count == 7
+
+
+@pytest.mark.asyncio
+async def test_listed_device_ends_probe(clock: FakeClock) -> None:
+    """Test the states carried by the device list start and end probes."""
+    listed = _listed("dev1", with_state=True)
+    listed["status"]["is_connected"] = False
+    coordinator, client = _coordinator_with_client([listed])
+    coordinator.clock = clock
+    client.async_get_device_state.side_effect = None
+    client.async_get_device_state.return_value = {"status": {"is_connected": False}}
+    await coordinator._async_setup()  # noqa: SLF001
+
+    # The first refresh fetches the device for its about data
+    coordinator.data = await coordinator._async_update_data()  # noqa: SLF001
+    assert set(coordinator.probes) == {"dev1"}
+
+    reconnected = _listed("dev1", with_state=True)
+    reconnected["status"]["is_connected"] = True
+    client.async_get_devices.return_value = [reconnected]
+    coordinator.data = await coordinator._async_update_data()  # noqa: SLF001
+    assert coordinator.probes == {}
+
+    # Probes of devices that left the list are dropped
+    client.async_get_device_state.return_value = {"status": {"is_connected": True}}
+    client.async_get_devices.return_value = [listed, _listed("dev2", with_state=True)]
+    coordinator.data = await coordinator._async_update_data()  # noqa: SLF001
+    assert set(coordinator.probes) == {"dev1"}
+    client.async_get_devices.return_value = [_listed("dev2", with_state=True)]
+    coordinator.data = await coordinator._async_update_data()  # noqa: SLF001
+    assert coordinator.probes == {}
+    assert client.async_get_device_state.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_refresh_device_ends_probe(clock: FakeClock) -> None:
+    """Test a single device refresh that finds it connected ends its probe."""
+    coordinator, client = _coordinator_with_client([])
+    coordinator.clock = clock
+    coordinator.data = {"dev1": {"status": {"is_connected": False}}}
+    coordinator.probes["dev1"] = SleepmeDeviceProbe(clock.monotonic())
+    coordinator.unchanged = {"dev1"}
+    client.async_get_device_state.side_effect = None
+    client.async_get_device_state.return_value = {"status": {"is_connected": True}}
+
+    await coordinator.async_refresh_device("dev1")
+
+    assert coordinator.probes == {}
+    assert coordinator.unchanged == set()
@@ -0,0 +1,24 @@
+"""Tests for the Deadline module."""
+
+from custom_components.sleepme_thermostat.deadline import Deadline
+from tests.fake_clock import FakeClock
+
+
+class TestDeadline:
+    """Test cases for the Deadline class."""
+
+    def test_remaining(self, clock: FakeClock) -> None:
+        """Test the remaining time shrinks until the deadline."""
+        deadline = Deadline(10, clock)
+        clock.advance(4)
+        assert deadline.remaining() == 6
+        assert deadline.allows(6)
+        assert not deadline.allows(7)
+        assert not deadline.expired
+
+    def test_expired(self, clock: FakeClock) -> None:
+        """Test the remaining time never drops below zero."""
+        deadline = Deadline(10, clock)
+        clock.advance(11)
+        assert deadline.remaining() == 0
+        assert deadline.expired
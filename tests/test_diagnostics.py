@@ -1,5 +1,7 @@
 """Test the Sleep.me diagnostics."""
 
+from unittest.mock import patch
+
 from homeassistant.core import HomeAssistant
 from pytest_homeassistant_custom_component.common import MockConfigEntry
 from pytest_homeassistant_custom_component.components.diagnostics import (
@@ -15,6 +17,8 @@ from custom_components.sleepme_thermostat.const import (
     DOMAIN,
 )
 
+from .fake_clock import FakeClock
+
 # Fields to exclude from snapshot as they change each run
 TO_EXCLUDE = {
     "id",
@@ -26,6 +30,7 @@ TO_EXCLUDE = {
     "created_at",
     "modified_at",
     "entry_id",
+    "seconds_until_reset",
 }
 
 
@@ -38,6 +43,7 @@ async def test_entry_diagnostics(
     hass: HomeAssistant,
     hass_client: ClientSessionGenerator,
     snapshot: SnapshotAssertion,
+    clock: FakeClock,
 ) -> None:
     """Test config entry diagnostics."""
     entry = MockConfigEntry(
@@ -48,8 +54,10 @@ async def test_entry_diagnostics(
         },
     )
     entry.add_to_hass(hass)
-    await hass.config_entries.async_setup(entry.entry_id)
-    await hass.async_block_till_done()
+    # The rate limit window must not roll over between the requests
+    with patch("custom_components.sleepme_thermostat.rate_limiter.SYSTEM_CLOCK", clock):
+        await hass.config_entries.async_setup(entry.entry_id)
+        await hass.async_block_till_done()
 
     assert await get_diagnostics_for_config_entry(hass, hass_client, entry) == snapshot(
         exclude=limit_diagnostic_attrs
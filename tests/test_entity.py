@@ -1,15 +1,14 @@
 """Tests for the SleepmeEntity module."""
 
-from unittest.mock import MagicMock, patch
+from unittest.mock import MagicMock
 
 import pytest
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
-from custom_components.sleepme_thermostat.const import ATTRIBUTION, DOMAIN, NAME
+from custom_components.sleepme_thermostat.const import ATTRIBUTION, DOMAIN
 from custom_components.sleepme_thermostat.coordinator import (
     SleepmeDataUpdateCoordinator,
 )
-from custom_components.sleepme_thermostat.data import SleepmeConfigEntry
 from custom_components.sleepme_thermostat.entity import SleepmeEntity
 
 
@@ -21,7 +20,7 @@ class TestSleepmeEntity:
         """Create a mock coordinator."""
         coordinator = MagicMock(spec=SleepmeDataUpdateCoordinator)
         coordinator.data = {
-            "test_entry_id": {
+            "dev1": {
                 "about": {
                     "model": "DP999NA",
                     "firmware_version": "5.39.2134",
@@ -38,92 +37,42 @@ class TestSleepmeEntity:
                 },
             }
         }
+        coordinator.get_device_info.return_value = {"identifiers": {(DOMAIN, "dev1")}}
         return coordinator
 
     @pytest.fixture
-    def mock_config_entry(self) -> MagicMock:
-        """Create a mock config entry."""
-        config_entry = MagicMock(spec=SleepmeConfigEntry)
-        config_entry.entry_id = "test_entry_id"
-        return config_entry
-
-    @pytest.fixture
-    def entity(
-        self, mock_coordinator: MagicMock, mock_config_entry: MagicMock
-    ) -> SleepmeEntity:
+    def entity(self, mock_coordinator: MagicMock) -> SleepmeEntity:
         """Create a SleepmeEntity instance for testing."""
-        return SleepmeEntity(mock_coordinator, mock_config_entry)
+        return SleepmeEntity(mock_coordinator, "dev1")
 
-    def test_initialization(
-        self, mock_coordinator: MagicMock, mock_config_entry: MagicMock
-    ) -> None:
+    def test_initialization(self, mock_coordinator: MagicMock) -> None:
         """Test SleepmeEntity initialization."""
-        entity = SleepmeEntity(mock_coordinator, mock_config_entry)
+        entity = SleepmeEntity(mock_coordinator, "dev1")
 
         assert entity.coordinator == mock_coordinator
-        assert entity.config_entry == mock_config_entry
-
-    def test_unique_id(self, entity: SleepmeEntity) -> None:
-        """Test unique_id property."""
-        assert entity.unique_id == "test_entry_id"
-
-    def test_device_info(self, entity: SleepmeEntity) -> None:
-        """Test device_info property."""
-        device_info = entity.device_info
-
-        assert device_info["identifiers"] == {(DOMAIN, "test_entry_id")}
-        assert device_info["name"] == NAME
-        assert device_info["model"] == "DP999NA"
-        assert device_info["manufacturer"] == NAME
-        assert device_info["serial_number"] == "32404160372"
-        assert device_info["mac_address"] == "b4:8a:0a:4f:90:54"
-        assert device_info["lan_address"] == "192.168.1.230"
-        assert device_info["ip_address"] == "70.190.108.13"
-        assert device_info["firmware_version"] == "5.39.2134"
-        assert device_info["time_zone"] == "America/Phoenix"
-
-    def test_device_info_missing_about_data(
-        self, mock_coordinator: MagicMock, mock_config_entry: MagicMock
-    ) -> None:
-        """Test device_info when about data is missing."""
-        # Remove about data
-        mock_coordinator.data["test_entry_id"].pop("about", None)
-        entity = SleepmeEntity(mock_coordinator, mock_config_entry)
-
-        # The current implementation doesn't handle None values properly
-        # So we expect it to raise an AttributeError
-        with pytest.raises(AttributeError):
-            _ = entity.device_info
+        assert entity.idx == "dev1"
 
-    def test_device_info_missing_control_data(
-        self, mock_coordinator: MagicMock, mock_config_entry: MagicMock
+    def test_device_info_from_coordinator(
+        self, mock_coordinator: MagicMock, entity: SleepmeEntity
     ) -> None:
-        """Test device_info when control data is missing."""
-        # Remove control data
-        mock_coordinator.data["test_entry_id"].pop("control", None)
-        entity = SleepmeEntity(mock_coordinator, mock_config_entry)
-
-        # The current implementation doesn't handle None values properly
-        # So we expect it to raise an AttributeError
-        with pytest.raises(AttributeError):
-            _ = entity.device_info
+        """Test device_info is the coordinator's shared device info."""
+        mock_coordinator.get_device_info.assert_called_once_with("dev1")
+        assert entity.device_info is mock_coordinator.get_device_info.return_value
 
     def test_device_state_attributes(self, entity: SleepmeEntity) -> None:
         """Test device_state_attributes property."""
         attributes = entity.device_state_attributes
 
         assert attributes["attribution"] == ATTRIBUTION
-        assert attributes["id"] == "test_entry_id"
+        assert attributes["id"] == "dev1"
         assert attributes["integration"] == DOMAIN
         assert attributes["brightness_level"] == 100
 
     def test_device_state_attributes_missing_status_data(
-        self, mock_coordinator: MagicMock, mock_config_entry: MagicMock
+        self, mock_coordinator: MagicMock, entity: SleepmeEntity
     ) -> None:
         """Test device_state_attributes when status data is missing."""
-        # Remove status data
-        mock_coordinator.data["test_entry_id"].pop("status", None)
-        entity = SleepmeEntity(mock_coordinator, mock_config_entry)
+        mock_coordinator.data["dev1"].pop("status", None)
 
         # The current implementation doesn't handle None values properly
         # So we expect it to raise an AttributeError
@@ -131,176 +80,41 @@ class TestSleepmeEntity:
             _ = entity.device_state_attributes
 
     def test_device_state_attributes_missing_data(
-        self, mock_coordinator: MagicMock, mock_config_entry: MagicMock
+        self, mock_coordinator: MagicMock, entity: SleepmeEntity
     ) -> None:
         """Test device_state_attributes when all data is missing."""
-        # Remove all data
         mock_coordinator.data = {}
-        entity = SleepmeEntity(mock_coordinator, mock_config_entry)
 
         # The current implementation doesn't handle missing keys properly
         # So we expect it to raise a KeyError
         with pytest.raises(KeyError):
             _ = entity.device_state_attributes
 
-    @pytest.mark.asyncio
-    async def test_async_turn_on(self, entity: SleepmeEntity) -> None:
-        """Test async_turn_on method."""
-        with patch.object(entity.coordinator, "async_request_refresh") as mock_refresh:
-            await entity.async_turn_on()
-
-            mock_refresh.assert_called_once()
-
-    @pytest.mark.asyncio
-    async def test_async_turn_off(self, entity: SleepmeEntity) -> None:
-        """Test async_turn_off method."""
-        with patch.object(entity.coordinator, "async_request_refresh") as mock_refresh:
-            await entity.async_turn_off()
-
-            mock_refresh.assert_called_once()
-
-    def test_device_info_partial_about_data(
-        self, mock_coordinator: MagicMock, mock_config_entry: MagicMock
-    ) -> None:
-        """Test device_info with partial about data."""
-        # Set only some about fields
-        mock_coordinator.data["test_entry_id"]["about"] = {
-            "model": "DP999NA",
-            "serial_number": "32404160372",
-        }
-        entity = SleepmeEntity(mock_coordinator, mock_config_entry)
-
-        device_info = entity.device_info
-
-        assert device_info["identifiers"] == {(DOMAIN, "test_entry_id")}
-        assert device_info["name"] == NAME
-        assert device_info["model"] == "DP999NA"
-        assert device_info["manufacturer"] == NAME
-        assert device_info["serial_number"] == "32404160372"
-        assert device_info["mac_address"] is None
-        assert device_info["lan_address"] is None
-        assert device_info["ip_address"] is None
-        assert device_info["firmware_version"] is None
-        assert device_info["time_zone"] == "America/Phoenix"
-
     def test_device_state_attributes_partial_status_data(
-        self, mock_coordinator: MagicMock, mock_config_entry: MagicMock
+        self, mock_coordinator: MagicMock, entity: SleepmeEntity
     ) -> None:
         """Test device_state_attributes with partial status data."""
-        # Set only some status fields
-        mock_coordinator.data["test_entry_id"]["status"] = {
+        mock_coordinator.data["dev1"]["status"] = {
             "brightness_level": 75,
         }
-        entity = SleepmeEntity(mock_coordinator, mock_config_entry)
 
         attributes = entity.device_state_attributes
 
-        assert attributes["attribution"] == ATTRIBUTION
-        assert attributes["id"] == "test_entry_id"
-        assert attributes["integration"] == DOMAIN
         assert attributes["brightness_level"] == 75
 
-    def test_device_info_empty_about_data(
-        self, mock_coordinator: MagicMock, mock_config_entry: MagicMock
-    ) -> None:
-        """Test device_info with empty about data."""
-        # Set empty about data
-        mock_coordinator.data["test_entry_id"]["about"] = {}
-        entity = SleepmeEntity(mock_coordinator, mock_config_entry)
-
-        device_info = entity.device_info
-
-        assert device_info["identifiers"] == {(DOMAIN, "test_entry_id")}
-        assert device_info["name"] == NAME
-        assert device_info["model"] is None
-        assert device_info["manufacturer"] == NAME
-        assert device_info["serial_number"] is None
-        assert device_info["mac_address"] is None
-        assert device_info["lan_address"] is None
-        assert device_info["ip_address"] is None
-        assert device_info["firmware_version"] is None
-        assert device_info["time_zone"] == "America/Phoenix"
-
     def test_device_state_attributes_empty_status_data(
-        self, mock_coordinator: MagicMock, mock_config_entry: MagicMock
+        self, mock_coordinator: MagicMock, entity: SleepmeEntity
     ) -> None:
         """Test device_state_attributes with empty status data."""
-        # Set empty status data
-        mock_coordinator.data["test_entry_id"]["status"] = {}
-        entity = SleepmeEntity(mock_coordinator, mock_config_entry)
+        mock_coordinator.data["dev1"]["status"] = {}
 
         attributes = entity.device_state_attributes
 
         assert attributes["attribution"] == ATTRIBUTION
-        assert attributes["id"] == "test_entry_id"
+        assert attributes["id"] == "dev1"
         assert attributes["integration"] == DOMAIN
         assert attributes["brightness_level"] is None
 
-    def test_device_info_none_values(
-        self, mock_coordinator: MagicMock, mock_config_entry: MagicMock
-    ) -> None:
-        """Test device_info with None values in data."""
-        # Set some fields to None
-        mock_coordinator.data["test_entry_id"]["about"]["model"] = None
-        mock_coordinator.data["test_entry_id"]["about"]["serial_number"] = None
-        entity = SleepmeEntity(mock_coordinator, mock_config_entry)
-
-        device_info = entity.device_info
-
-        assert device_info["identifiers"] == {(DOMAIN, "test_entry_id")}
-        assert device_info["name"] == NAME
-        assert device_info["model"] is None
-        assert device_info["manufacturer"] == NAME
-        assert device_info["serial_number"] is None
-        assert device_info["mac_address"] == "b4:8a:0a:4f:90:54"
-        assert device_info["lan_address"] == "192.168.1.230"
-        assert device_info["ip_address"] == "70.190.108.13"
-        assert device_info["firmware_version"] == "5.39.2134"
-        assert device_info["time_zone"] == "America/Phoenix"
-
-    def test_device_state_attributes_none_values(
-        self, mock_coordinator: MagicMock, mock_config_entry: MagicMock
-    ) -> None:
-        """Test device_state_attributes with None values in data."""
-        # Set brightness_level to None
-        mock_coordinator.data["test_entry_id"]["status"]["brightness_level"] = None
-        entity = SleepmeEntity(mock_coordinator, mock_config_entry)
-
-        attributes = entity.device_state_attributes
-
-        assert attributes["attribution"] == ATTRIBUTION
-        assert attributes["id"] == "test_entry_id"
-        assert attributes["integration"] == DOMAIN
-        assert attributes["brightness_level"] is None
-
-    @pytest.mark.asyncio
-    async def test_async_turn_on_coordinator_error(self, entity: SleepmeEntity) -> None:
-        """Test async_turn_on when coordinator raises an error."""
-        with patch.object(  # noqa: SIM117
-            entity.coordinator,
-            "async_request_refresh",
-            side_effect=Exception("Test error"),
-        ):
-            # The current implementation doesn't handle errors
-            # So we expect it to raise the exception
-            with pytest.raises(Exception, match="Test error"):
-                await entity.async_turn_on()
-
-    @pytest.mark.asyncio
-    async def test_async_turn_off_coordinator_error(
-        self, entity: SleepmeEntity
-    ) -> None:
-        """Test async_turn_off when coordinator raises an error."""
-        with patch.object(  # noqa: SIM117
-            entity.coordinator,
-            "async_request_refresh",
-            side_effect=Exception("Test error"),
-        ):
-            # The current implementation doesn't handle errors
-            # So we expect it to raise the exception
-            with pytest.raises(Exception, match="Test error"):
-                await entity.async_turn_off()
-
     def test_inheritance_from_coordinator_entity(self, entity: SleepmeEntity) -> None:
         """Test that SleepmeEntity properly inherits from CoordinatorEntity."""
         assert isinstance(entity, CoordinatorEntity)
@@ -0,0 +1,94 @@
+"""Tests for the SleepmeHealth module."""
+
+from datetime import UTC, datetime, timedelta
+
+from custom_components.sleepme_thermostat.const import (
+    MAX_BACKOFF_INTERVAL,
+    OFFLINE_AFTER_FAILURES,
+    RATE_LIMIT_BACKOFF,
+)
+from custom_components.sleepme_thermostat.health import HealthState, SleepmeHealth
+
+BASE = timedelta(minutes=2)
+
+
+class TestSleepmeHealth:
+    """Test cases for the SleepmeHealth class."""
+
+    def test_initial_state(self) -> None:
+        """Test the health starts healthy."""
+        health = SleepmeHealth()
+
+        assert health.state is HealthState.HEALTHY
+        assert health.available
+        assert health.next_interval(BASE) == BASE
+        # Until the first refresh, only cached data can be shown
+        assert health.stale
+
+    def test_degraded_then_offline(self) -> None:
+        """Test failures in a row degrade the health until it is offline."""
+        health = SleepmeHealth()
+
+        health.record_failure("timeout")
+        assert health.state is HealthState.DEGRADED
+        assert health.available
+        assert health.stale
+
+        for _ in range(OFFLINE_AFTER_FAILURES - 1):
+            health.record_failure("timeout")
+        assert health.state is HealthState.OFFLINE
+        # The last data is still served, marked as stale
+        assert health.available
+        assert health.stale
+
+    def test_recovers_on_success(self) -> None:
+        """Test a successful refresh restores the health."""
+        health = SleepmeHealth()
+        for _ in range(OFFLINE_AFTER_FAILURES):
+            health.record_failure("timeout")
+        now = datetime(2025, 1, 1, tzinfo=UTC)
+
+        health.record_success(now)
+
+        assert health.state is HealthState.HEALTHY
+        assert health.consecutive_failures == 0
+        assert not health.stale
+        assert health.as_dict()["last_success"] == "2025-01-01T00:00:00+00:00"
+
+    def test_auth_failed(self) -> None:
+        """Test invalid credentials make the data unavailable."""
+        health = SleepmeHealth()
+
+        health.record_failure("Invalid credentials", auth_failed=True)
+
+        assert health.state is HealthState.AUTH_FAILED
+        assert not health.available
+        assert health.next_interval(BASE) == BASE
+
+    def test_backoff_doubles(self) -> None:
+        """Test every failure in a row doubles the interval up to a maximum."""
+        health = SleepmeHealth()
+        intervals = []
+        for _ in range(8):
+            health.record_failure("timeout")
+            intervals.append(health.next_interval(BASE))
+
+        assert intervals[:3] == [BASE, BASE * 2, BASE * 4]
+        assert intervals[-1] == MAX_BACKOFF_INTERVAL
+
+    def test_backoff_rate_limited(self) -> None:
+        """Test a rate limited cloud is left alone for a while."""
+        health = SleepmeHealth()
+
+        health.record_failure("Rate limit exceeded", rate_limited=True)
+
+        assert health.state is HealthState.RATE_LIMITED
+        assert health.available
+        assert health.next_interval(BASE) == RATE_LIMIT_BACKOFF
+
+    def test_backoff_never_shortens_base(self) -> None:
+        """Test a long base interval is kept while backing off."""
+        health = SleepmeHealth()
+        health.record_failure("timeout")
+
+        assert health.next_interval(timedelta(hours=2)) == timedelta(hours=2)
@@ -0,0 +1,206 @@
+"""Tests for the SleepmeReadingHistory module."""
+
+import math
+
+import pytest
+
+from custom_components.sleepme_thermostat.history import SleepmeReadingHistory
+
+
+def _data(water: float | None, target: float = 70, *, active: bool = True) -> dict:
+    """Return coordinator data for a device reading."""
+    return {
+        "control": {
+            "set_temperature_f": target,
+            "thermal_control_status": "active" if active else "standby",
+        },
+        "status": {"water_temperature_f": water, "water_level": 100},
+    }
+
+
+class TestSleepmeReadingHistory:
+    """Test cases for the SleepmeReadingHistory class."""
+
+    def test_invalid_capacity(self) -> None:
+        """Test the capacity must be positive."""
+        with pytest.raises(ValueError, match="capacity"):
+            SleepmeReadingHistory(0)
+
+    def test_empty(self) -> None:
+        """Test an empty history."""
+        history = SleepmeReadingHistory(3)
+
+        assert len(history) == 0
+        assert history.latest() is None
+        assert history.readings() == []
+        assert history.statistics("water_temperature_f").count == 0
+
+    def test_append_and_latest(self) -> None:
+        """Test appending readings."""
+        history = SleepmeReadingHistory(3)
+        history.append(100.0, _data(80))
+        history.append(160.0, _data(78, active=False))
+
+        latest = history.latest()
+        assert len(history) == 2
+        assert latest
+        assert latest.timestamp == 160.0
+        assert latest.water_temperature_f == 78
+        assert latest.set_temperature_f == 70
+        assert latest.water_level == 100
+        assert latest.active is False
+
+    def test_wraps_around_at_capacity(self) -> None:
+        """Test the oldest readings are overwritten once full."""
+        history = SleepmeReadingHistory(3)
+        for index in range(5):
+            history.append(float(index), _data(80 - index))
+
+        assert len(history) == 3
+        assert [reading.timestamp for reading in history.readings()] == [2, 3, 4]
+        timestamps, values = history.window("water_temperature_f")
+        assert list(timestamps) == [2, 3, 4]
+        assert list(values) == [78, 77, 76]
+
+    def test_window_since(self) -> None:
+        """Test windows only include readings at or after a time."""
+        history = SleepmeReadingHistory(4)
+        for index in range(6):
+            history.append(float(index * 60), _data(80 - index))
+
+        timestamps, values = history.window("water_temperature_f", since=180)
+        assert list(timestamps) == [180, 240, 300]
+        assert list(values) == [77, 76, 75]
+        assert history.window("water_temperature_f", since=1000)[0].tolist() == []
+
+    def test_statistics_skip_missing_values(self) -> None:
+        """Test statistics ignore missing values."""
+        history = SleepmeReadingHistory(4)
+        history.append(0.0, _data(80))
+        history.append(60.0, _data(None))
+        history.append(120.0, _data(76))
+
+        stats = history.statistics("water_temperature_f")
+        assert stats.count == 2
+        assert stats.minimum == 76
+        assert stats.maximum == 80
+        assert stats.mean == 78
+        assert math.isnan(history.readings()[1].water_temperature_f)
+
+    def test_as_dict(self) -> None:
+        """Test the diagnostics representation."""
+        history = SleepmeReadingHistory(2)
+        history.append(0.0, _data(None))
+
+        result = history.as_dict()
+        assert result["capacity"] == 2
+        assert result["size"] == 1
+        assert result["readings"] == [
+            {
+                "timestamp": 0.0,
+                "water_temperature_f": None,
+                "set_temperature_f": 70,
+                "water_level": 100,
+                "active": True,
+            }
+        ]
+        assert result["statistics"]["water_temperature_f"]["count"] == 0
+
+
+class TestTrend:
+    """Test cases for the trend estimates of the history."""
+
+    @pytest.fixture
+    def cooling(self) -> SleepmeReadingHistory:
+        """Return a history cooling 1°F per minute towards 70°F."""
+        history = SleepmeReadingHistory(10)
+        for minute in range(4):
+            history.append(minute * 60.0, _data(80 - minute, target=70))
+        return history
+
+    def test_ramp_rate(self, cooling: SleepmeReadingHistory) -> None:
+        """Test the ramp rate is the slope in °F per minute."""
+        assert cooling.ramp_rate(3600) == pytest.approx(-1)
+
+    def test_ramp_rate_limited_to_window(self, cooling: SleepmeReadingHistory) -> None:
+        """Test the ramp rate only uses readings inside the window."""
+        cooling.append(240.0, _data(77, target=70))
+
+        assert cooling.ramp_rate(60) == pytest.approx(0)
+
+    def test_ramp_rate_needs_two_readings(self) -> None:
+        """Test the ramp rate is unknown without enough readings."""
+        history = SleepmeReadingHistory(3)
+        assert history.ramp_rate(3600) is None
+        history.append(0.0, _data(80))
+        assert history.ramp_rate(3600) is None
+
+    def test_ramp_rate_resets_on_setpoint_change(
+        self, cooling: SleepmeReadingHistory
+    ) -> None:
+        """Test readings before a setpoint change are ignored."""
+        cooling.append(240.0, _data(76, target=90))
+
+        assert cooling.ramp_rate(3600) is None
+
+    def test_ramp_rate_resets_on_mode_change(
+        self, cooling: SleepmeReadingHistory
+    ) -> None:
+        """Test readings before a mode change are ignored."""
+        cooling.append(240.0, _data(76, target=70, active=False))
+        cooling.append(300.0, _data(76, target=70, active=False))
+
+        assert cooling.ramp_rate(3600) == pytest.approx(0)
+
+    def test_minutes_to_target(self, cooling: SleepmeReadingHistory) -> None:
+        """Test the ETA extrapolates the ramp rate to the setpoint."""
+        assert cooling.minutes_to_target(3600, 1) == pytest.approx(7)
+
+    def test_minutes_to_target_arrived(self) -> None:
+        """Test the ETA is zero within the tolerance."""
+        history = SleepmeReadingHistory(3)
+        history.append(0.0, _data(70.5, target=70))
+
+        assert history.minutes_to_target(3600, 1) == 0
+
+    def test_minutes_to_target_moving_away(self) -> None:
+        """Test the ETA is unknown when the water moves away from the target."""
+        history = SleepmeReadingHistory(3)
+        history.append(0.0, _data(80, target=70))
+        history.append(60.0, _data(81, target=70))
+
+        assert history.minutes_to_target(3600, 1) is None
+
+    def test_minutes_to_target_standby(self) -> None:
+        """Test the ETA is unknown while the device is in standby."""
+        history = SleepmeReadingHistory(3)
+        history.append(0.0, _data(80, target=70, active=False))
+        history.append(60.0, _data(79, target=70, active=False))
+
+        assert history.minutes_to_target(3600, 1) is None
+
+    def test_extrapolate_water_temperature(
+        self, cooling: SleepmeReadingHistory
+    ) -> None:
+        """Test the water temperature is extrapolated along the ramp rate."""
+        assert cooling.extrapolate_water_temperature(300.0, 3600) == pytest.approx(75)
+
+    def test_extrapolate_stops_at_setpoint(
+        self, cooling: SleepmeReadingHistory
+    ) -> None:
+        """Test the extrapolation never overshoots the setpoint."""
+        assert cooling.extrapolate_water_temperature(1800.0, 3600) == pytest.approx(70)
+
+    def test_extrapolate_limited_to_window(
+        self, cooling: SleepmeReadingHistory
+    ) -> None:
+        """Test the extrapolation is capped at one window after the reading."""
+        assert cooling.extrapolate_water_temperature(1800.0, 120) == pytest.approx(75)
+
+    def test_extrapolate_standby(self) -> None:
+        """Test there is no estimate in standby."""
+        history = SleepmeReadingHistory(3)
+        history.append(0.0, _data(80, target=70, active=False))
+        history.append(60.0, _data(79, target=70, active=False))
+
+        assert history.extrapolate_water_temperature(120.0, 3600) is None
@@ -0,0 +1,97 @@
+"""Tests of the modules the integration's modules load on import, and its time."""
+
+import subprocess
+import sys
+from collections.abc import Callable
+from pathlib import Path
+
+import pytest
+
+PACKAGE = "custom_components.sleepme_thermostat"
+ROOT = Path(__file__).parents[1]
+
+# The API client and the coordinator, with everything they load themselves
+CLIENT_CHAIN = {
+    f"{PACKAGE}.api",
+    f"{PACKAGE}.coordinator",
+    f"{PACKAGE}.rate_limiter",
+    f"{PACKAGE}.retry",
+    f"{PACKAGE}.schedule",
+    f"{PACKAGE}.history",
+}
+
+# Generous budget for the integration's own modules, excluding dependencies.
+# It catches heavy work at module level, not the number of modules.
+IMPORT_BUDGET_US = 100_000
+
+
+def _loaded_modules(module: str) -> set[str]:
+    """Import a module in a fresh interpreter and return the integration's modules."""
+    result = subprocess.run(  # noqa: S603
+        [
+            sys.executable,
+            "-c",
+            f"import sys, {module}; print(*sys.modules, sep='\\n')",
+        ],
+        capture_output=True,
+        check=True,
+        cwd=ROOT,
+        text=True,
+    )
+    return {name for name in result.stdout.split() if name.startswith(PACKAGE)}
+
+
+def _import_times(module: str) -> dict[str, tuple[int, int]]:
+    """Import a module in a fresh interpreter, return the self and cumulative times."""
+    result = subprocess.run(  # noqa: S603
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        check=True,
+        cwd=ROOT,
+        text=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_time, cumulative, name = line.removeprefix("import time:").split("|")
+        times[name.strip()] = (int(self_time), int(cumulative))
+    return times
+
+
+def test_config_flow_is_light() -> None:
+    """Test the config flow does not load the client, coordinator or platforms."""
+    assert _loaded_modules(f"{PACKAGE}.config_flow") == {
+        PACKAGE,
+        f"{PACKAGE}.config_flow",
+        f"{PACKAGE}.const",
+        f"{PACKAGE}.data",
+        f"{PACKAGE}.exceptions",
+    }
+
+
+@pytest.mark.parametrize("platform", ["binary_sensor", "climate", "sensor"])
+def test_platform_is_light(platform: str) -> None:
+    """Test the platforms do not load the client or the coordinator."""
+    loaded = _loaded_modules(f"{PACKAGE}.{platform}")
+
+    assert f"{PACKAGE}.{platform}" in loaded
+    assert not loaded & CLIENT_CHAIN
+
+
+def test_import_time_budget(record_property: Callable[[str, object], None]) -> None:
+    """Test the integration's own modules import within budget, and report it."""
+    # The best of a few runs, so a busy machine does not fail the budget
+    runs = [_import_times(PACKAGE) for _ in range(3)]
+    own = min(
+        sum(times[0] for name, times in run.items() if name.startswith(PACKAGE))
+        for run in runs
+    )
+    total = min(run[PACKAGE][1] for run in runs)
+
+    record_property("import_time_own_us", own)
+    record_property("import_time_total_us", total)
+    print(  # noqa: T201
+        f"\nimport {PACKAGE}: {own} us in its own modules, {total} us in total"
+    )
+    assert own < IMPORT_BUDGET_US
@@ -0,0 +1,39 @@
+"""Tests for the SleepmeDeviceProbe module."""
+
+from custom_components.sleepme_thermostat.const import (
+    PROBE_MAX_INTERVAL,
+    PROBE_MIN_INTERVAL,
+)
+from custom_components.sleepme_thermostat.probe import SleepmeDeviceProbe
+
+MIN_INTERVAL = PROBE_MIN_INTERVAL.total_seconds()
+
+
+class TestSleepmeDeviceProbe:
+    """Test cases for the SleepmeDeviceProbe class."""
+
+    def test_due(self) -> None:
+        """Test a probe is due after its interval."""
+        probe = SleepmeDeviceProbe(1000.0)
+        assert not probe.due(1000.0 + MIN_INTERVAL - 1)
+        assert probe.due(1000.0 + MIN_INTERVAL)
+
+    def test_backoff_doubles_up_to_maximum(self) -> None:
+        """Test every probe of a disconnected device doubles the interval."""
+        probe = SleepmeDeviceProbe(0.0)
+        probe.record_disconnected(MIN_INTERVAL)
+        assert probe.interval == 2 * MIN_INTERVAL
+        assert probe.next_probe == 3 * MIN_INTERVAL
+
+        for _ in range(10):
+            probe.record_disconnected(probe.next_probe)
+        assert probe.interval == PROBE_MAX_INTERVAL.total_seconds()
+
+    def test_as_dict(self) -> None:
+        """Test the probe diagnostics."""
+        probe = SleepmeDeviceProbe(0.0)
+        assert probe.as_dict(60.0) == {
+            "probes": 0,
+            "interval": MIN_INTERVAL,
+            "next_probe_in": MIN_INTERVAL - 60,
+        }
@@ -1,12 +1,44 @@
 """Tests for the RateLimiter module."""
 
+import asyncio
 import threading
 import time
+from collections import Counter
+from collections.abc import Iterator
 from unittest.mock import patch
 
 import pytest
 
-from custom_components.sleepme_thermostat.rate_limiter import RateLimiter
+from custom_components.sleepme_thermostat.rate_limiter import (
+    RateLimiter,
+    ThreadSafeRateLimiter,
+)
+from tests.fake_clock import FakeClock
+
+
+@pytest.fixture
+def loop_thread() -> Iterator[asyncio.AbstractEventLoop]:
+    """Run an event loop in a thread of its own."""
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    yield loop
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join()
+    loop.close()
+
+
+async def _advance_until_done(
+    clock: FakeClock, tasks: list[asyncio.Task], seconds: float = 60.0
+) -> None:
+    """Advance the clock a window at a time until the tasks are done."""
+    for _ in range(100):
+        if all(task.done() for task in tasks):
+            return
+        clock.advance(seconds)
+        await asyncio.sleep(0)
+    msg = "Tasks still waiting"
+    raise AssertionError(msg)
 
 
 class TestRateLimiter:
@@ -17,7 +49,7 @@ class TestRateLimiter:
         limiter = RateLimiter()
         assert limiter.max_requests == 10
         assert limiter.request_count == 0
-        assert isinstance(limiter.lock, threading.Lock)
+        assert not hasattr(limiter, "lock")
 
     def test_initialization_custom_limit(self) -> None:
         """Test RateLimiter initialization with custom limit."""
@@ -51,6 +83,23 @@ class TestRateLimiter:
         limiter.record_request()  # This shouldn't normally happen, but test it
         assert limiter.can_send_request() is False
 
+    def test_remaining_requests(self) -> None:
+        """Test remaining_requests counts down to zero."""
+        limiter = RateLimiter(max_requests_per_minute=2)
+        assert limiter.remaining_requests() == 2
+        limiter.record_request()
+        assert limiter.remaining_requests() == 1
+        limiter.record_request()
+        limiter.record_request()
+        assert limiter.remaining_requests() == 0
+
+    def test_try_acquire(self) -> None:
+        """Test try_acquire records a request only while below the limit."""
+        limiter = RateLimiter(max_requests_per_minute=1)
+        assert limiter.try_acquire() is True
+        assert limiter.try_acquire() is False
+        assert limiter.request_count == 1
+
     def test_record_request_increments_count(self) -> None:
         """Test record_request increments the request count."""
         limiter = RateLimiter(max_requests_per_minute=5)
@@ -62,128 +111,126 @@ class TestRateLimiter:
 
     def test_check_limits_resets_on_new_minute(self) -> None:
         """Test check_limits resets count when minute changes."""
-        with patch("time.time") as mock_time:
-            # Start at minute 100
-            mock_time.return_value = 6000  # 100 minutes * 60 seconds
-            limiter = RateLimiter(max_requests_per_minute=3)
-            limiter.record_request()
-            limiter.record_request()
-            assert limiter.request_count == 2
+        # Start at minute 100
+        clock = FakeClock(6000)  # 100 minutes * 60 seconds
+        limiter = RateLimiter(max_requests_per_minute=3, clock=clock)
+        limiter.record_request()
+        limiter.record_request()
+        assert limiter.request_count == 2
 
-            # Move to minute 101
-            mock_time.return_value = 6060  # 101 minutes * 60 seconds
-            limiter.check_limits()
-            assert limiter.request_count == 0
-            assert limiter.current_minute == 101
+        # Move to minute 101
+        clock.now = 6060  # 101 minutes * 60 seconds
+        limiter.check_limits()
+        assert limiter.request_count == 0
+        assert limiter.current_minute == 101
 
     def test_check_limits_no_reset_same_minute(self) -> None:
         """Test check_limits doesn't reset count in same minute."""
-        with patch("time.time") as mock_time:
-            mock_time.return_value = 6000  # 100 minutes * 60 seconds
-            limiter = RateLimiter(max_requests_per_minute=3)
-            limiter.record_request()
-            assert limiter.request_count == 1
+        clock = FakeClock(6000)  # 100 minutes * 60 seconds
+        limiter = RateLimiter(max_requests_per_minute=3, clock=clock)
+        limiter.record_request()
+        assert limiter.request_count == 1
 
-            # Still in same minute
-            mock_time.return_value = 6030  # 100.5 minutes * 60 seconds
-            limiter.check_limits()
-            assert limiter.request_count == 1
-            assert limiter.current_minute == 100
+        # Still in same minute
+        clock.now = 6030  # 100.5 minutes * 60 seconds
+        limiter.check_limits()
+        assert limiter.request_count == 1
+        assert limiter.current_minute == 100
 
     def test_can_send_request_resets_on_new_minute(self) -> None:
         """Test can_send_request resets when minute changes."""
-        with patch("time.time") as mock_time:
-            # Start at minute 100
-            mock_time.return_value = 6000  # 100 minutes * 60 seconds
-            limiter = RateLimiter(max_requests_per_minute=2)
-            limiter.record_request()
-            limiter.record_request()
-            assert limiter.can_send_request() is False
+        # Start at minute 100
+        clock = FakeClock(6000)  # 100 minutes * 60 seconds
+        limiter = RateLimiter(max_requests_per_minute=2, clock=clock)
+        limiter.record_request()
+        limiter.record_request()
+        assert limiter.can_send_request() is False
 
-            # Move to minute 101
-            mock_time.return_value = 6060  # 101 minutes * 60 seconds
-            assert limiter.can_send_request() is True
+        # Move to minute 101
+        clock.now = 6060  # 101 minutes * 60 seconds
+        assert limiter.can_send_request() is True
 
     def test_record_request_resets_on_new_minute(self) -> None:
         """Test record_request resets when minute changes."""
-        with patch("time.time") as mock_time:
-            # Start at minute 100
-            mock_time.return_value = 6000  # 100 minutes * 60 seconds
-            limiter = RateLimiter(max_requests_per_minute=2)
-            limiter.record_request()
-            limiter.record_request()
-            assert limiter.request_count == 2
+        # Start at minute 100
+        clock = FakeClock(6000)  # 100 minutes * 60 seconds
+        limiter = RateLimiter(max_requests_per_minute=2, clock=clock)
+        limiter.record_request()
+        limiter.record_request()
+        assert limiter.request_count == 2
 
-            # Move to minute 101
-            mock_time.return_value = 6060  # 101 minutes * 60 seconds
-            limiter.record_request()
-            assert limiter.request_count == 1
+        # Move to minute 101
+        clock.now = 6060  # 101 minutes * 60 seconds
+        limiter.record_request()
+        assert limiter.request_count == 1
+
+    def test_windows_ignore_wall_clock(self) -> None:
+        """Test a step of the wall clock neither resets nor extends a window."""
+        clock = FakeClock(6000)
+        limiter = RateLimiter(max_requests_per_minute=1, clock=clock)
+        limiter.record_request()
+
+        with patch("time.time", return_value=0):
+            assert limiter.can_send_request() is False
 
     @pytest.mark.asyncio
-    async def test_wait_for_reset_no_wait_when_below_limit(self) -> None:
+    async def test_wait_for_reset_no_wait_when_below_limit(
+        self, clock: FakeClock
+    ) -> None:
         """Test wait_for_reset doesn't wait when below limit."""
-        limiter = RateLimiter(max_requests_per_minute=3)
+        limiter = RateLimiter(max_requests_per_minute=3, clock=clock)
         limiter.record_request()
 
-        start_time = time.time()
         await limiter.wait_for_reset()
-        end_time = time.time()
 
-        # Should not wait significantly
-        assert end_time - start_time < 0.1
+        # Should not wait
+        assert clock.sleeps == []
 
     @pytest.mark.asyncio
     async def test_wait_for_reset_waits_when_at_limit(self) -> None:
         """Test wait_for_reset waits when at limit."""
-        with patch("time.time") as mock_time:
-            # Start at minute 100, 30 seconds in
-            mock_time.return_value = 6030  # 100 minutes * 60 seconds + 30 seconds
-            limiter = RateLimiter(max_requests_per_minute=1)
-            limiter.record_request()
+        # Start at minute 100, 30 seconds in
+        clock = FakeClock(6030)  # 100 minutes * 60 seconds + 30 seconds
+        limiter = RateLimiter(max_requests_per_minute=1, clock=clock)
+        limiter.record_request()
 
-            # Should wait until next minute (30 seconds)
-            with patch("asyncio.sleep") as mock_sleep:
-                await limiter.wait_for_reset()
-                mock_sleep.assert_called_once_with(30.0)
+        # Should wait until next minute (30 seconds)
+        await limiter.wait_for_reset()
+        assert clock.sleeps == [30.0]
+        assert limiter.can_send_request() is True
 
     @pytest.mark.asyncio
     async def test_wait_for_reset_waits_when_above_limit(self) -> None:
         """Test wait_for_reset waits when above limit."""
-        with patch("time.time") as mock_time:
-            # Start at minute 100, 45 seconds in
-            mock_time.return_value = 6045  # 100 minutes * 60 seconds + 45 seconds
-            limiter = RateLimiter(max_requests_per_minute=1)
-            limiter.record_request()
-            limiter.record_request()  # Above limit
+        # Start at minute 100, 45 seconds in
+        clock = FakeClock(6045)  # 100 minutes * 60 seconds + 45 seconds
+        limiter = RateLimiter(max_requests_per_minute=1, clock=clock)
+        limiter.record_request()
+        limiter.record_request()  # Above limit
 
-            # Should wait until next minute (15 seconds)
-            with patch("asyncio.sleep") as mock_sleep:
-                await limiter.wait_for_reset()
-                mock_sleep.assert_called_once_with(15.0)
+        # Should wait until next minute (15 seconds)
+        await limiter.wait_for_reset()
+        assert clock.sleeps == [15.0]
 
     @pytest.mark.asyncio
     async def test_wait_for_reset_no_wait_at_minute_boundary(self) -> None:
         """Test wait_for_reset doesn't wait at minute boundary."""
-        with patch("time.time") as mock_time:
-            # Start at minute 100, 59.9 seconds in
-            mock_time.return_value = 6059.9  # 100 minutes * 60 seconds + 59.9 seconds
-            limiter = RateLimiter(max_requests_per_minute=1)
-            limiter.record_request()
+        # Start at minute 100, 59.9 seconds in
+        clock = FakeClock(6059.9)  # 100 minutes * 60 seconds + 59.9 seconds
+        limiter = RateLimiter(max_requests_per_minute=1, clock=clock)
+        limiter.record_request()
+
+        # Should wait very little time
+        await limiter.wait_for_reset()
+        assert clock.sleeps == [pytest.approx(0.1)]
 
-            # Should wait very little time
-            with patch("asyncio.sleep") as mock_sleep:
-                await limiter.wait_for_reset()
-                # Use assert_called_once() and check the argument separately
-                # to handle floating point precision
-                assert mock_sleep.call_count == 1
-                actual_wait_time = mock_sleep.call_args[0][0]
-                assert (
-                    abs(actual_wait_time - 0.1) < 0.001
-                )  # Allow for small floating point differences
-
-    def test_thread_safety_multiple_threads(self) -> None:
+    def test_thread_safety_multiple_threads(
+        self, loop_thread: asyncio.AbstractEventLoop
+    ) -> None:
         """Test thread safety with multiple threads."""
-        limiter = RateLimiter(max_requests_per_minute=100)
+        limiter = ThreadSafeRateLimiter(
+            RateLimiter(max_requests_per_minute=100), loop_thread
+        )
         results = []
 
         def worker() -> None:
@@ -207,7 +254,7 @@ class TestRateLimiter:
             thread.join()
 
         # Verify total requests don't exceed limit
-        assert limiter.request_count <= 100
+        assert limiter.remaining_requests() >= 0
         # Verify we got some successful requests
         assert any(results)
 
@@ -235,16 +282,19 @@ class TestRateLimiter:
             limiter.record_request()
         assert limiter.request_count == total_requests
 
-    def test_concurrent_access_pattern(self) -> None:
+    def test_concurrent_access_pattern(
+        self, loop_thread: asyncio.AbstractEventLoop
+    ) -> None:
         """Test realistic concurrent access pattern."""
         max_requests_per_minute = 5
-        limiter = RateLimiter(max_requests_per_minute=max_requests_per_minute)
+        rate_limiter = RateLimiter(max_requests_per_minute=max_requests_per_minute)
+        limiter = ThreadSafeRateLimiter(rate_limiter, loop_thread)
 
         def concurrent_worker() -> None:
             """Worker that checks and records requests concurrently."""
             for _ in range(3):
-                if limiter.can_send_request():
-                    limiter.record_request()
+                # Checking and recording in one call cannot race other threads
+                if limiter.try_acquire():
                     time.sleep(0.001)  # Small delay to increase concurrency
 
         # Create multiple threads
@@ -259,4 +309,227 @@ class TestRateLimiter:
             thread.join()
 
         # Should not exceed the limit
-        assert limiter.request_count <= max_requests_per_minute
+        assert rate_limiter.request_count <= max_requests_per_minute
+
+    @pytest.mark.asyncio
+    async def test_acquire_below_limit(self) -> None:
+        """Test acquire records the request without waiting."""
+        limiter = RateLimiter(max_requests_per_minute=2)
+        await limiter.acquire()
+        await limiter.acquire()
+        assert limiter.request_count == 2
+        assert limiter.can_send_request() is False
+
+    @pytest.mark.asyncio
+    async def test_acquire_waits_in_order(self, clock: FakeClock) -> None:
+        """Test waiting callers are served in order once the window resets."""
+        limiter = RateLimiter(max_requests_per_minute=1, clock=clock)
+        limiter.record_request()
+        order = []
+
+        async def acquire(index: int) -> None:
+            await limiter.acquire()
+            order.append(index)
+
+        tasks = [asyncio.create_task(acquire(index)) for index in range(3)]
+        await asyncio.sleep(0)
+        # Waiting callers hold back new ones
+        assert limiter.can_send_request() is False
+        assert limiter.remaining_requests() == 0
+
+        await _advance_until_done(clock, tasks)
+        assert order == [0, 1, 2]
+        # One caller per minute
+        assert clock.now == 1000 + 3 * 60
+        assert not limiter._waiters  # noqa: SLF001
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_gives_up_place(self, clock: FakeClock) -> None:
+        """Test a cancelled waiter leaves the queue."""
+        limiter = RateLimiter(max_requests_per_minute=1, clock=clock)
+        limiter.record_request()
+        first = asyncio.create_task(limiter.acquire())
+        second = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0)
+
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        assert len(limiter._waiters) == 1  # noqa: SLF001
+
+        await _advance_until_done(clock, [second])
+        assert limiter.request_count == 1
+        assert not limiter._waiters  # noqa: SLF001
+
+    @pytest.mark.asyncio
+    async def test_cancelled_granted_waiter_passes_slot(self) -> None:
+        """Test a waiter cancelled after being granted passes the slot on."""
+        limiter = RateLimiter(max_requests_per_minute=1)
+        limiter.record_request()
+        first = asyncio.create_task(limiter.acquire())
+        second = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0)
+
+        # A new window grants the slot to the first, which is then cancelled
+        limiter.request_count = 0
+        limiter._release_waiters()  # noqa: SLF001
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+
+        await asyncio.wait_for(second, timeout=1)
+        assert limiter.request_count == 1
+        assert not limiter._waiters  # noqa: SLF001
+
+    @pytest.mark.asyncio
+    async def test_acquire_stress(self, clock: FakeClock) -> None:
+        """Test many concurrent callers, some cancelled, respect limit and order."""
+        limiter = RateLimiter(max_requests_per_minute=5, clock=clock)
+        grants: list[tuple[int, int]] = []
+
+        async def acquire(index: int) -> None:
+            await limiter.acquire()
+            grants.append((index, limiter.current_minute))
+
+        tasks = [asyncio.create_task(acquire(index)) for index in range(40)]
+        await asyncio.sleep(0)
+        cancelled = set(range(6, 40, 7))
+        for index in cancelled:
+            tasks[index].cancel()
+
+        await _advance_until_done(clock, tasks)
+        granted = [index for index, _ in grants]
+        assert granted == [index for index in range(40) if index not in cancelled]
+        windows = Counter(window for _, window in grants)
+        assert max(windows.values()) <= 5
+        assert not limiter._waiters  # noqa: SLF001
+
+    @pytest.mark.asyncio
+    async def test_thread_safe_acquire_from_executor(self) -> None:
+        """Test executor threads acquire through the facade."""
+        loop = asyncio.get_running_loop()
+        limiter = RateLimiter(max_requests_per_minute=2)
+        facade = ThreadSafeRateLimiter(limiter, loop)
+
+        await loop.run_in_executor(None, facade.acquire)
+        await loop.run_in_executor(None, facade.record_request)
+        assert await loop.run_in_executor(None, facade.can_send_request) is False
+        assert limiter.request_count == 2
+
+    @pytest.mark.asyncio
+    async def test_thread_safe_acquire_timeout(self) -> None:
+        """Test a blocked executor thread gives up its place on timeout."""
+        loop = asyncio.get_running_loop()
+        limiter = RateLimiter(max_requests_per_minute=0)
+        facade = ThreadSafeRateLimiter(limiter, loop)
+
+        with pytest.raises(TimeoutError):
+            await loop.run_in_executor(None, facade.acquire, 0.05)
+        await asyncio.sleep(0)
+        assert not limiter._waiters  # noqa: SLF001
+
+    @pytest.mark.asyncio
+    async def test_thread_safe_refuses_event_loop(self) -> None:
+        """Test the facade refuses calls from the event loop, which would deadlock."""
+        facade = ThreadSafeRateLimiter(RateLimiter(), asyncio.get_running_loop())
+        with pytest.raises(RuntimeError):
+            facade.can_send_request()
+        with pytest.raises(RuntimeError):
+            facade.acquire()
+
+    def test_sync_quota_adopts_server_counts(self, clock: FakeClock) -> None:
+        """Test the server's limit and remaining count replace the local ones."""
+        limiter = RateLimiter(max_requests_per_minute=10, clock=clock)
+        limiter.record_request()
+        assert limiter.quota_synced is False
+
+        limiter.sync_quota(limit=20, remaining=5)
+
+        assert limiter.max_requests == 20
+        assert limiter.remaining_requests() == 5
+        assert limiter.quota_synced is True
+
+    @pytest.mark.asyncio
+    async def test_sync_quota_moves_window(self) -> None:
+        """Test the window is moved to end when the server's does."""
+        clock = FakeClock(6000)  # The local window would end at 6060
+        limiter = RateLimiter(max_requests_per_minute=5, clock=clock)
+        limiter.sync_quota(remaining=0, reset=10, period=30)
+        assert limiter.can_send_request() is False
+
+        await limiter.wait_for_reset()
+        assert clock.sleeps == [10.0]
+        assert limiter.remaining_requests() == 5
+
+        # The following windows have the server's length
+        limiter.sync_quota(remaining=0)
+        clock.advance(29)
+        assert limiter.can_send_request() is False
+        clock.advance(1)
+        assert limiter.can_send_request() is True
+
+    def test_sync_quota_window_from_reset(self, clock: FakeClock) -> None:
+        """Test a window of unknown length is worked out from its reset."""
+        limiter = RateLimiter(max_requests_per_minute=10, clock=clock)
+
+        # Fits the assumed minute
+        limiter.sync_quota(limit=100, remaining=100, reset=30)
+        assert limiter.period == 60
+
+        # Ends later than a minute could, an hourly quota
+        limiter.sync_quota(limit=100, remaining=99, reset=1800)
+        assert limiter.period == 3600
+        assert limiter.as_dict()["seconds_until_reset"] == pytest.approx(1800)
+
+        # Close to its end, the window stays an hour long
+        limiter.sync_quota(limit=100, remaining=1, reset=20)
+        assert limiter.period == 3600
+
+    def test_block(self, clock: FakeClock) -> None:
+        """Test nothing is sent while blocked, even in a new window."""
+        limiter = RateLimiter(max_requests_per_minute=5, clock=clock)
+        limiter.block(90)
+        assert limiter.remaining_requests() == 0
+
+        clock.advance(60)
+        assert limiter.can_send_request() is False
+        clock.advance(30)
+        assert limiter.can_send_request() is True
+
+    def test_seconds_until_available(self, clock: FakeClock) -> None:
+        """Test the wait for a request covers blocks and exhausted windows."""
+        limiter = RateLimiter(max_requests_per_minute=1, clock=clock)
+        assert limiter.seconds_until_available() == 0
+
+        limiter.block(5)
+        assert limiter.seconds_until_available() == 5
+
+        clock.advance(10)
+        limiter.record_request()
+        # Exhausted, until the window ends
+        assert limiter.seconds_until_available() == pytest.approx(
+            limiter.as_dict()["seconds_until_reset"]
+        )
+        assert limiter.seconds_until_available() > 0
+
+    @pytest.mark.asyncio
+    async def test_sync_quota_releases_waiters(self, clock: FakeClock) -> None:
+        """Test waiting callers are served at once when the quota grows."""
+        limiter = RateLimiter(max_requests_per_minute=1, clock=clock)
+        limiter.record_request()
+        waiter = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0)
+        assert not waiter.done()
+
+        limiter.sync_quota(limit=2)
+        await asyncio.sleep(0)
+
+        assert waiter.done()
+        assert limiter.as_dict() == {
+            "limit": 2,
+            "remaining": 0,
+            "period": 60.0,
+            "seconds_until_reset": 20.0,
+            "waiting": 0,
+            "synced": True,
+        }
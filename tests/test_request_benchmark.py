@@ -0,0 +1,119 @@
+"""
+Benchmarks of the API client's request building.
+
+The numbers are reported, not asserted, so a busy machine cannot fail them.
+Run with `pytest -s tests/test_request_benchmark.py` to see them.
+"""
+
+import json
+import timeit
+import tracemalloc
+from collections.abc import Callable
+from functools import partial
+from unittest.mock import MagicMock
+
+import orjson
+
+from custom_components.sleepme_thermostat.api import HEADERS, SleepmeApiClient
+
+API_KEY = "1234567890abcdef1234567890abcdef"
+CALLS = 1000
+
+# The type of pytest's record_property fixture
+RecordProperty = Callable[[str, object], None]
+
+
+def _build_request_per_call(data: dict | None) -> tuple[dict[str, str], str | None]:
+    """Build a request as every call did before, body serialized by json."""
+    headers = HEADERS.copy()
+    headers["Authorization"] = f"Bearer {API_KEY}"
+    return headers, None if data is None else json.dumps(data)
+
+
+def _bytes_per_call(build: Callable[[], object]) -> float:
+    """Return the memory the results of a function's calls keep, per call."""
+    tracemalloc.start()
+    try:
+        results = [build() for _ in range(CALLS)]
+        allocated, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del results
+    return allocated / CALLS
+
+
+def _seconds_per_call(build: Callable[[], object]) -> float:
+    """Return the time of a function's call, the best of a few runs."""
+    return min(timeit.repeat(build, number=CALLS, repeat=5)) / CALLS
+
+
+def _report(
+    record_property: RecordProperty,
+    name: str,
+    before: float,
+    after: float,
+    unit: str,
+) -> None:
+    """Report a measurement before and after, to the output and the test report."""
+    record_property(f"{name}_before", before)
+    record_property(f"{name}_after", after)
+    ratio = before / after if after else float("inf")
+    print(  # noqa: T201
+        f"\n{name}: {before:.3g} {unit} per call before, {after:.3g} {unit} "
+        f"after ({ratio:.1f}x)"
+    )
+
+
+def test_get_request_benchmark(record_property: RecordProperty) -> None:
+    """Report what building the GET of a poll allocates and takes."""
+    client = SleepmeApiClient(API_KEY, MagicMock())
+    before = partial(_build_request_per_call, None)
+    after = partial(client._request_args, None)  # noqa: SLF001
+
+    # The same request is built, without a body to declare the type of
+    assert after()[0]["Authorization"] == before()[0]["Authorization"]
+    assert after()[1] is None
+
+    _report(
+        record_property,
+        "get_allocations",
+        _bytes_per_call(before),
+        _bytes_per_call(after),
+        "bytes",
+    )
+    _report(
+        record_property,
+        "get_time",
+        _seconds_per_call(before) * 1e6,
+        _seconds_per_call(after) * 1e6,
+        "µs",
+    )
+
+
+def test_patch_request_benchmark(
+    record_property: RecordProperty,
+) -> None:
+    """Report what building a PATCH, with its body serialized, takes."""
+    client = SleepmeApiClient(API_KEY, MagicMock())
+    data = {"set_temperature_f": 70}
+    before = partial(_build_request_per_call, data)
+    after = partial(client._request_args, data)  # noqa: SLF001
+
+    # The same request is built
+    assert after()[0] == before()[0]
+    assert orjson.loads(after()[1]) == json.loads(before()[1])
+
+    _report(
+        record_property,
+        "patch_allocations",
+        _bytes_per_call(before),
+        _bytes_per_call(after),
+        "bytes",
+    )
+    _report(
+        record_property,
+        "patch_time",
+        _seconds_per_call(before) * 1e6,
+        _seconds_per_call(after) * 1e6,
+        "µs",
+    )
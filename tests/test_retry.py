@@ -0,0 +1,25 @@
+"""Tests for the retry module."""
+
+from custom_components.sleepme_thermostat.retry import RetryPolicy
+
+
+class TestRetryPolicy:
+    """Test cases for the RetryPolicy class."""
+
+    def test_exponential_backoff(self) -> None:
+        """Test the backoff grows with every attempt."""
+        policy = RetryPolicy(retries=3, backoff=1.0)
+
+        assert [policy.delay(attempt) for attempt in (1, 2, 3)] == [1, 2, 4]
+
+    def test_gives_up_after_retries(self) -> None:
+        """Test no delay is returned once the retries are used up."""
+        policy = RetryPolicy(retries=1, backoff=1.0)
+
+        assert policy.delay(2) is None
+
+    def test_backoff_capped(self) -> None:
+        """Test the backoff never exceeds its maximum."""
+        policy = RetryPolicy(retries=5, backoff=10.0, max_backoff=15.0)
+
+        assert policy.delay(3) == 15
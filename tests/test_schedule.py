@@ -0,0 +1,88 @@
+"""Tests for the SleepmePollingSchedule module."""
+
+from datetime import UTC, datetime, time, timedelta
+
+import pytest
+from homeassistant.core import HomeAssistant
+
+from custom_components.sleepme_thermostat.const import (
+    DENSE_POLL_INTERVAL,
+    SPARSE_POLL_INTERVAL,
+)
+from custom_components.sleepme_thermostat.schedule import SleepmePollingSchedule
+
+BASE = timedelta(minutes=10)
+
+
+def _at(hour: int, minute: int = 0) -> datetime:
+    """Return a time of day, in the UTC test time zone."""
+    return datetime(2025, 1, 1, hour, minute, tzinfo=UTC)
+
+
+@pytest.fixture(autouse=True)
+async def utc_time_zone(hass: HomeAssistant) -> None:
+    """Use UTC as local time zone."""
+    await hass.config.async_set_time_zone("UTC")
+
+
+class TestSleepmePollingSchedule:
+    """Test cases for the SleepmePollingSchedule class."""
+
+    def test_base_interval_without_expected_transitions(self) -> None:
+        """Test nothing changes until a transition is expected."""
+        schedule = SleepmePollingSchedule()
+
+        assert schedule.next_interval(_at(14), BASE, active=False) == BASE
+        assert schedule.as_dict()["expected"] == []
+
+    def test_learned_transition(self) -> None:
+        """Test polling is dense around a learned transition, sparse otherwise."""
+        schedule = SleepmePollingSchedule()
+        schedule.record_transition(_at(22, 5))
+
+        assert schedule.as_dict()["expected"] == ["22:07"]
+        assert schedule.next_interval(_at(21, 50), BASE, active=False) == (
+            DENSE_POLL_INTERVAL
+        )
+        assert schedule.next_interval(_at(14), BASE, active=False) == (
+            SPARSE_POLL_INTERVAL
+        )
+        assert schedule.next_interval(_at(14), BASE, active=True) == BASE
+
+    def test_sparse_interval_ends_at_window(self) -> None:
+        """Test a sparse poll never skips past the start of a window."""
+        schedule = SleepmePollingSchedule()
+        schedule.set_fixed_times([time(22, 0)])
+
+        assert schedule.next_interval(_at(21, 20), BASE, active=False) == (
+            timedelta(minutes=10)
+        )
+
+    def test_window_wraps_around_midnight(self) -> None:
+        """Test windows wrap around midnight."""
+        schedule = SleepmePollingSchedule()
+        schedule.set_fixed_times([time(0, 10)])
+
+        assert schedule.next_interval(_at(23, 50), BASE, active=False) == (
+            DENSE_POLL_INTERVAL
+        )
+
+    def test_observations_decay(self) -> None:
+        """Test transitions that stop recurring are forgotten."""
+        schedule = SleepmePollingSchedule()
+        schedule.record_transition(_at(3))
+        for _ in range(7):
+            schedule.record_transition(_at(22))
+
+        assert schedule.as_dict()["expected"] == ["22:07"]
+
+    def test_restore(self) -> None:
+        """Test a stored schedule is restored, ignoring malformed data."""
+        schedule = SleepmePollingSchedule()
+        schedule.record_transition(_at(7))
+
+        restored = SleepmePollingSchedule.from_dict(schedule.as_dict())
+        assert restored.as_dict() == schedule.as_dict()
+        assert SleepmePollingSchedule.from_dict({"weights": [1]}).as_dict() == (
+            SleepmePollingSchedule().as_dict()
+        )
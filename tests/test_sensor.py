@@ -1,21 +1,36 @@
 """Test sensor for Sleep.me Thermostat."""
 
+from copy import deepcopy
+from datetime import timedelta
+from typing import Any
+from unittest.mock import patch
+
 import aiohttp
 import pytest
 from aioresponses import aioresponses
 from homeassistant.core import HomeAssistant
+from homeassistant.helpers import device_registry as dr
+from homeassistant.helpers import entity_registry as er
 from pytest_homeassistant_custom_component.common import MockConfigEntry
 
 from custom_components.sleepme_thermostat.const import (
     CONF_API_KEY,
+    CONF_DISABLED_DEVICES,
+    CONF_DISABLED_SENSORS,
+    CONF_HEDGE_REQUESTS,
+    CONF_INTERPOLATE_TEMPERATURE,
+    CONF_TEMPERATURE_DEADBAND,
     CONF_UPDATE_INTERVAL,
+    CONF_WATER_LEVEL_DEADBAND,
+    CONF_WATER_TEMPERATURE_C,
     DOMAIN,
+    OFFLINE_AFTER_FAILURES,
 )
+from custom_components.sleepme_thermostat.retry import DEFAULT_RETRY_POLICIES
 
 
-@pytest.mark.asyncio
-async def test_sensor(hass: HomeAssistant, aioresponses: aioresponses) -> None:
-    """Test sensor."""
+def _mock_api(aioresponses: aioresponses) -> None:
+    """Mock the device list and device state endpoints."""
     aioresponses.get(
         "https://api.developer.sleep.me/v1/devices",
         headers={
@@ -29,6 +44,8 @@ async def test_sensor(hass: HomeAssistant, aioresponses: aioresponses) -> None:
         headers={
             "Authorization": "Bearer 1234567890",
             "Content-Type": "application/json",
+            "X-RateLimit-Limit": "20",
+            "X-RateLimit-Remaining": "17",
         },
         payload={
             "about": {
@@ -56,27 +73,519 @@ async def test_sensor(hass: HomeAssistant, aioresponses: aioresponses) -> None:
             },
         },
     )
+
+
+async def _setup_entry(
+    hass: HomeAssistant,
+    options: dict[str, Any] | None = None,
+) -> MockConfigEntry:
+    """Set up a config entry for the mocked account."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        version=2,
+        data={
+            "id": "abcd",
+            "name": "A Bed",
+            CONF_API_KEY: "1234567890",
+            CONF_UPDATE_INTERVAL: 10,
+        },
+        options=options or {},
+    )
+    entry.add_to_hass(hass)
+    await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    return entry
+
+
+@pytest.mark.asyncio
+async def test_sensor(hass: HomeAssistant, aioresponses: aioresponses) -> None:
+    """Test sensor."""
+    _mock_api(aioresponses)
     async with aiohttp.ClientSession():
-        entry = MockConfigEntry(
-            domain=DOMAIN,
-            data={
-                "id": "abcd",
-                "name": "A Bed",
-                CONF_API_KEY: "1234567890",
-                CONF_UPDATE_INTERVAL: 10,
+        await _setup_entry(hass)
+
+        state_water_temperature = hass.states.get("sensor.a_bed_water_temperature")
+        state_water_level = hass.states.get("sensor.a_bed_water_level")
+
+        # Reported in Fahrenheit, converted to the metric test unit system
+        assert state_water_temperature
+        assert state_water_temperature.state == "23.3333333333333"
+        assert state_water_temperature.attributes["unit_of_measurement"] == "°C"
+        assert hass.states.get("sensor.a_bed_water_temperature_c") is None
+        assert state_water_level
+        assert state_water_level.state == "100"
+        assert state_water_level.attributes["state_class"] == "measurement"
+        assert state_water_temperature.attributes["state_class"] == "measurement"
+
+        # A single reading in standby gives no trend
+        state_ramp_rate = hass.states.get("sensor.a_bed_water_temperature_ramp_rate")
+        state_time_to_target = hass.states.get("sensor.a_bed_time_to_target")
+        assert state_ramp_rate
+        assert state_ramp_rate.state == "unknown"
+        assert state_ramp_rate.attributes["unit_of_measurement"] == "°F/min"
+        assert state_time_to_target
+        assert state_time_to_target.state == "unknown"
+
+        state_health = hass.states.get("sensor.sleep_me_cloud_health")
+        assert state_health
+        assert state_health.state == "healthy"
+        assert state_health.attributes["stale"] is False
+
+        # The quota reported by the server replaces the default
+        state_headroom = hass.states.get("sensor.sleep_me_rate_limit_headroom")
+        assert state_headroom
+        assert state_headroom.state == "17"
+        assert state_headroom.attributes["limit"] == 20
+        assert state_headroom.attributes["synced"] is True
+
+        device_registry = dr.async_get(hass)
+        entity_registry = er.async_get(hass)
+        device = device_registry.async_get_device(identifiers={(DOMAIN, "abcd")})
+        assert device
+        assert device.sw_version == "5.39.2134"
+        entities = er.async_entries_for_device(entity_registry, device.id)
+        assert {entity.domain for entity in entities} == {
+            "sensor",
+            "binary_sensor",
+            "climate",
+        }
+
+
+@pytest.mark.asyncio
+async def test_sensor_celsius_opt_in(
+    hass: HomeAssistant, aioresponses: aioresponses
+) -> None:
+    """Test the Celsius sensor is only created when enabled in the options."""
+    _mock_api(aioresponses)
+    async with aiohttp.ClientSession():
+        await _setup_entry(hass, options={CONF_WATER_TEMPERATURE_C: True})
+
+        state_water_temperature_c = hass.states.get("sensor.a_bed_water_temperature_c")
+        assert state_water_temperature_c
+        assert state_water_temperature_c.state == "23.5"
+
+
+@pytest.mark.asyncio
+async def test_sensor_deadband(hass: HomeAssistant, aioresponses: aioresponses) -> None:
+    """Test changes within the deadbands do not update the sensors."""
+    _mock_api(aioresponses)
+    async with aiohttp.ClientSession():
+        entry = await _setup_entry(
+            hass,
+            options={
+                CONF_WATER_TEMPERATURE_C: True,
+                CONF_TEMPERATURE_DEADBAND: 2,
+                CONF_WATER_LEVEL_DEADBAND: 10,
             },
         )
-        entry.add_to_hass(hass)
-        await hass.config_entries.async_setup(entry.entry_id)
+
+        coordinator = entry.runtime_data.coordinator
+        state = hass.states.get("sensor.a_bed_water_temperature")
+        assert state
+        reported = state.last_reported
+        data = deepcopy(coordinator.data)
+        data["abcd"]["status"].update(
+            water_temperature_f=75, water_temperature_c=24.0, water_level=80
+        )
+        coordinator.async_set_updated_data(data)
         await hass.async_block_till_done()
 
-        state_water_temperature_f = hass.states.get("sensor.a_bed_water_temperature_f")
-        state_water_temperature_c = hass.states.get("sensor.a_bed_water_temperature_c")
-        state_water_level = hass.states.get("sensor.a_bed_water_level")
+        # Held back, the state is not even written again
+        state = hass.states.get("sensor.a_bed_water_temperature")
+        assert state
+        assert state.last_reported == reported
+        state = hass.states.get("sensor.a_bed_water_temperature_c")
+        assert state
+        assert state.state == "23.5"
+        state = hass.states.get("sensor.a_bed_water_level")
+        assert state
+        assert state.state == "80"
+
+        data = deepcopy(data)
+        data["abcd"]["status"].update(water_temperature_f=77, water_temperature_c=25.0)
+        coordinator.async_set_updated_data(data)
+        await hass.async_block_till_done()
+
+        state = hass.states.get("sensor.a_bed_water_temperature_c")
+        assert state
+        assert state.state == "25.0"
+        state = hass.states.get("sensor.a_bed_water_temperature")
+        assert state
+        assert state.state == "25.0"
+
+
+@pytest.mark.asyncio
+async def test_climate_only(hass: HomeAssistant, aioresponses: aioresponses) -> None:
+    """Test platforms switched off in the options are not set up."""
+    _mock_api(aioresponses)
+    async with aiohttp.ClientSession():
+        entry = await _setup_entry(
+            hass, options={"sensor": False, "binary_sensor": False}
+        )
+
+        assert hass.states.async_entity_ids() == ["climate.a_bed"]
+        assert entry.runtime_data.platforms == ["climate"]
+        assert await hass.config_entries.async_unload(entry.entry_id)
+
+
+@pytest.mark.asyncio
+async def test_disabled_sensors(
+    hass: HomeAssistant, aioresponses: aioresponses
+) -> None:
+    """Test sensor types disabled in the options are not created."""
+    _mock_api(aioresponses)
+    entity_registry = er.async_get(hass)
+    async with aiohttp.ClientSession():
+        entry = await _setup_entry(hass)
+        assert hass.states.get("sensor.a_bed_water_level")
+
+        hass.config_entries.async_update_entry(
+            entry, options={CONF_DISABLED_SENSORS: ["water_level", "is_water_low"]}
+        )
+        await hass.async_block_till_done()
+
+        assert hass.states.get("sensor.a_bed_water_level") is None
+        assert hass.states.get("binary_sensor.a_bed_is_water_low") is None
+        assert hass.states.get("sensor.a_bed_water_temperature")
+        assert hass.states.get("binary_sensor.a_bed_connected")
+        # Not left behind as unavailable entities
+        assert entity_registry.async_get("sensor.a_bed_water_level") is None
+
+
+@pytest.mark.asyncio
+async def test_disabled_device(hass: HomeAssistant, aioresponses: aioresponses) -> None:
+    """Test devices disabled in the options get no entities and are not polled."""
+    _mock_api(aioresponses)
+    device_registry = dr.async_get(hass)
+    async with aiohttp.ClientSession():
+        entry = await _setup_entry(hass)
+        assert device_registry.async_get_device(identifiers={(DOMAIN, "abcd")})
+
+        result = await hass.config_entries.options.async_init(entry.entry_id)
+        assert result["type"] == "form"
+        schema = result["data_schema"].schema
+        assert schema[CONF_DISABLED_DEVICES].options == {"abcd": "A Bed"}
+
+        aioresponses.requests.clear()
+        result = await hass.config_entries.options.async_configure(
+            result["flow_id"], {CONF_DISABLED_DEVICES: ["abcd"]}
+        )
+        await hass.async_block_till_done()
+
+        assert entry.options[CONF_DISABLED_DEVICES] == ["abcd"]
+        # Only the sensors of the whole account are left
+        assert set(hass.states.async_entity_ids()) == {
+            "sensor.sleep_me_cloud_health",
+            "sensor.sleep_me_rate_limit_headroom",
+        }
+        assert entry.runtime_data.coordinator.data == {}
+        assert not any(url.path.endswith("/abcd") for _, url in aioresponses.requests)
+        assert device_registry.async_get_device(identifiers={(DOMAIN, "abcd")}) is None
+
+        # Enabled again, the device is polled right away
+        _mock_api(aioresponses)
+        hass.config_entries.async_update_entry(entry, options={})
+        await hass.async_block_till_done()
+
+        assert any(url.path.endswith("/abcd") for _, url in aioresponses.requests)
+        assert hass.states.get("climate.a_bed")
+        assert hass.states.get("sensor.a_bed_water_level")
+
+
+@pytest.mark.asyncio
+async def test_platform_set_up_again(
+    hass: HomeAssistant, aioresponses: aioresponses, caplog: pytest.LogCaptureFixture
+) -> None:
+    """Test a platform unloaded on its own stops tracking its entities."""
+    _mock_api(aioresponses)
+    async with aiohttp.ClientSession():
+        entry = await _setup_entry(hass)
+        coordinator = entry.runtime_data.coordinator
+        listeners = len(coordinator._listeners)  # noqa: SLF001
+
+        hass.config_entries.async_update_entry(entry, options={"sensor": False})
+        await hass.async_block_till_done()
+        assert hass.states.get("sensor.a_bed_water_level") is None
+        hass.config_entries.async_update_entry(entry, options={})
+        await hass.async_block_till_done()
+        assert len(coordinator._listeners) == listeners  # noqa: SLF001
+
+        # The device added again gets its entities once, from the new platform
+        hass.config_entries.async_update_entry(
+            entry, options={CONF_DISABLED_DEVICES: ["abcd"]}
+        )
+        await hass.async_block_till_done()
+        _mock_api(aioresponses)
+        hass.config_entries.async_update_entry(entry, options={})
+        await hass.async_block_till_done()
+
+        assert "does not generate unique IDs" not in caplog.text
+        assert hass.states.get("sensor.a_bed_water_level")
+        assert len(coordinator._listeners) == listeners  # noqa: SLF001
+
+
+@pytest.mark.asyncio
+async def test_options_applied_in_place(
+    hass: HomeAssistant, aioresponses: aioresponses
+) -> None:
+    """Test changed options apply to the running entry without any request."""
+    _mock_api(aioresponses)
+    async with aiohttp.ClientSession():
+        entry = await _setup_entry(hass)
+        coordinator = entry.runtime_data.coordinator
+        state = hass.states.get("sensor.a_bed_water_level")
+        aioresponses.requests.clear()
 
-        assert state_water_temperature_f
-        assert state_water_temperature_f.state == "74"
+        hass.config_entries.async_update_entry(
+            entry,
+            options={
+                CONF_UPDATE_INTERVAL: 3,
+                CONF_HEDGE_REQUESTS: True,
+                CONF_INTERPOLATE_TEMPERATURE: True,
+                CONF_WATER_TEMPERATURE_C: True,
+                "binary_sensor": False,
+            },
+        )
+        await hass.async_block_till_done()
+
+        assert entry.runtime_data.coordinator is coordinator
+        assert not aioresponses.requests
+        assert coordinator._base_update_interval == timedelta(minutes=3)  # noqa: SLF001
+        assert entry.runtime_data.client.hedge_requests is True
+        # Kept entities are not set up again
+        assert hass.states.get("sensor.a_bed_water_level") == state
+        state_water_temperature_c = hass.states.get("sensor.a_bed_water_temperature_c")
         assert state_water_temperature_c
         assert state_water_temperature_c.state == "23.5"
-        assert state_water_level
-        assert state_water_level.state == "100"
+        assert hass.states.get("binary_sensor.a_bed_connected") is None
+        climate = hass.data["climate"].get_entity("climate.a_bed")
+        assert climate._unsub_interpolate is not None  # noqa: SLF001
+
+        hass.config_entries.async_update_entry(entry, options={})
+        await hass.async_block_till_done()
+
+        assert not aioresponses.requests
+        assert hass.states.get("binary_sensor.a_bed_connected")
+        assert hass.states.get("sensor.a_bed_water_temperature_c") is None
+        assert climate._unsub_interpolate is None  # noqa: SLF001
+        assert await hass.config_entries.async_unload(entry.entry_id)
+
+
+@pytest.mark.asyncio
+async def test_migrate_fahrenheit_sensor(
+    hass: HomeAssistant, aioresponses: aioresponses
+) -> None:
+    """
+    Test the Fahrenheit sensor keeps its entity ID as the single sensor.
+
+    The Celsius sensor of version 1 is removed unless opted in.
+    """
+    _mock_api(aioresponses)
+    entity_registry = er.async_get(hass)
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        version=1,
+        data={CONF_API_KEY: "1234567890", CONF_UPDATE_INTERVAL: 10},
+    )
+    entry.add_to_hass(hass)
+    entity_registry.async_get_or_create(
+        "sensor",
+        DOMAIN,
+        "abcd_water_temperature_f",
+        config_entry=entry,
+        suggested_object_id="a_bed_water_temperature_f",
+    )
+    entity_registry.async_get_or_create(
+        "sensor",
+        DOMAIN,
+        "abcd_water_temperature_c",
+        config_entry=entry,
+        suggested_object_id="a_bed_water_temperature_c",
+    )
+
+    async with aiohttp.ClientSession():
+        await hass.config_entries.async_setup(entry.entry_id)
+        await hass.async_block_till_done()
+
+    assert entry.version == 2
+    assert (
+        entity_registry.async_get_entity_id("sensor", DOMAIN, "abcd_water_temperature")
+        == "sensor.a_bed_water_temperature_f"
+    )
+    assert hass.states.get("sensor.a_bed_water_temperature_f")
+    assert hass.states.get("sensor.a_bed_water_temperature") is None
+    assert entity_registry.async_get("sensor.a_bed_water_temperature_c") is None
+
+
+@pytest.mark.asyncio
+async def test_sensor_setup_from_cache(
+    hass: HomeAssistant,
+    aioresponses: aioresponses,  # noqa: ARG001
+    hass_storage: dict[str, Any],
+) -> None:
+    """Test entities are set up from cached data while the cloud is down."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        version=2,
+        data={CONF_API_KEY: "1234567890", CONF_UPDATE_INTERVAL: 10},
+    )
+    hass_storage[f"{DOMAIN}.{entry.entry_id}.devices"] = {
+        "version": 1,
+        "key": f"{DOMAIN}.{entry.entry_id}.devices",
+        "data": {
+            "abcd": {
+                "id": "abcd",
+                "name": "A Bed",
+                "about": {"model": "DP999NA"},
+                "control": {"thermal_control_status": "standby"},
+                "status": {"water_temperature_f": 74, "water_level": 100},
+            }
+        },
+    }
+    entry.add_to_hass(hass)
+
+    with patch.dict(DEFAULT_RETRY_POLICIES, clear=True):
+        async with aiohttp.ClientSession():
+            assert await hass.config_entries.async_setup(entry.entry_id)
+            await hass.async_block_till_done(wait_background_tasks=True)
+
+    assert entry.runtime_data.coordinator.startup["from_cache"] is True
+    state_water_level = hass.states.get("sensor.a_bed_water_level")
+    assert state_water_level
+    assert state_water_level.state == "100"
+    state_health = hass.states.get("sensor.sleep_me_cloud_health")
+    assert state_health
+    assert state_health.state == "degraded"
+    assert state_health.attributes["stale"] is True
+
+
+def _listed(device_id: str, name: str) -> dict[str, Any]:
+    """Return a device list entry that carries the device state."""
+    return {
+        "id": device_id,
+        "name": name,
+        "attachments": ["CHILIPAD_PRO"],
+        "about": {"model": "DP999NA"},
+        "control": {"thermal_control_status": "standby", "set_temperature_f": 71},
+        "status": {"is_connected": True, "water_level": 100, "water_temperature_f": 74},
+    }
+
+
+@pytest.mark.asyncio
+async def test_offline_serves_cached_data(
+    hass: HomeAssistant, aioresponses: aioresponses
+) -> None:
+    """Test the entities keep the last data, marked as stale, while offline."""
+    devices_url = "https://api.developer.sleep.me/v1/devices"
+    aioresponses.get(devices_url, payload=[_listed("abcd", "A Bed")])
+    aioresponses.get(devices_url, status=500, repeat=True)
+    with patch.dict(DEFAULT_RETRY_POLICIES, clear=True):
+        async with aiohttp.ClientSession():
+            entry = await _setup_entry(hass)
+            coordinator = entry.runtime_data.coordinator
+            for _ in range(OFFLINE_AFTER_FAILURES):
+                await coordinator.async_refresh()
+            await hass.async_block_till_done()
+
+    assert coordinator.last_update_success
+    state_water_level = hass.states.get("sensor.a_bed_water_level")
+    assert state_water_level
+    assert state_water_level.state == "100"
+    state_climate = hass.states.get("climate.a_bed")
+    assert state_climate
+    assert state_climate.state != "unavailable"
+    state_health = hass.states.get("sensor.sleep_me_cloud_health")
+    assert state_health
+    assert state_health.state == "offline"
+    assert state_health.attributes["stale"] is True
+    assert state_health.attributes["last_success"]
+
+
+@pytest.mark.asyncio
+async def test_device_left_account(
+    hass: HomeAssistant, aioresponses: aioresponses
+) -> None:
+    """Test the entities of a device that leaves the device list are removed."""
+    devices_url = "https://api.developer.sleep.me/v1/devices"
+    aioresponses.get(
+        devices_url, payload=[_listed("abcd", "A Bed"), _listed("efgh", "B Bed")]
+    )
+    aioresponses.get(devices_url, payload=[_listed("abcd", "A Bed")])
+    async with aiohttp.ClientSession():
+        entry = await _setup_entry(hass, {CONF_TEMPERATURE_DEADBAND: 2})
+        coordinator = entry.runtime_data.coordinator
+        assert hass.states.get("climate.b_bed")
+        assert hass.states.get("sensor.b_bed_water_temperature")
+
+        await coordinator.async_refresh()
+        await hass.async_block_till_done()
+
+    assert coordinator.last_update_success
+    assert list(coordinator.data) == ["abcd"]
+    assert hass.states.get("climate.b_bed") is None
+    assert hass.states.get("sensor.b_bed_water_temperature") is None
+    state_water_level = hass.states.get("sensor.a_bed_water_level")
+    assert state_water_level
+    assert state_water_level.state == "100"
+
+
+@pytest.mark.asyncio
+async def test_account_sensors_once(
+    hass: HomeAssistant, aioresponses: aioresponses
+) -> None:
+    """Test the cloud health and rate limit sensors exist once per account."""
+    aioresponses.get(
+        "https://api.developer.sleep.me/v1/devices",
+        payload=[_listed("abcd", "A Bed"), _listed("efgh", "B Bed")],
+    )
+    entity_registry = er.async_get(hass)
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        version=2,
+        data={CONF_API_KEY: "1234567890", CONF_UPDATE_INTERVAL: 10},
+    )
+    entry.add_to_hass(hass)
+
+    async with aiohttp.ClientSession():
+        await hass.config_entries.async_setup(entry.entry_id)
+        await hass.async_block_till_done()
+
+    unique_ids = {
+        entity_entry.unique_id
+        for entity_entry in er.async_entries_for_config_entry(
+            entity_registry, entry.entry_id
+        )
+        if entity_entry.unique_id.endswith(("_health", "_rate_limit_headroom"))
+    }
+    assert unique_ids == {
+        f"{entry.entry_id}_health",
+        f"{entry.entry_id}_rate_limit_headroom",
+    }
+    health = entity_registry.async_get("sensor.sleep_me_cloud_health")
+    assert health
+    device = dr.async_get(hass).async_get(health.device_id)
+    assert device
+    assert device.entry_type is dr.DeviceEntryType.SERVICE
+
+
+@pytest.mark.asyncio
+async def test_remove_entry_removes_storage(
+    hass: HomeAssistant, hass_storage: dict[str, Any]
+) -> None:
+    """Test removing an entry removes the data stored for it."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        version=2,
+        data={CONF_API_KEY: "1234567890", CONF_UPDATE_INTERVAL: 10},
+    )
+    entry.add_to_hass(hass)
+    for key in (
+        f"{DOMAIN}.{entry.entry_id}.devices",
+        f"{DOMAIN}.{entry.entry_id}.schedule",
+    ):
+        hass_storage[key] = {"version": 1, "key": key, "data": {}}
+
+    await hass.config_entries.async_remove(entry.entry_id)
+    await hass.async_block_till_done()
+
+    assert not [key for key in hass_storage if entry.entry_id in key]
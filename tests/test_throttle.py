@@ -0,0 +1,47 @@
+"""Tests for the SleepmeStateThrottle module."""
+
+from custom_components.sleepme_thermostat.throttle import SleepmeStateThrottle
+
+
+class TestSleepmeStateThrottle:
+    """Test cases for the SleepmeStateThrottle class."""
+
+    def test_first_value_published(self) -> None:
+        """Test the first reading is always published."""
+        throttle = SleepmeStateThrottle(2.0, 600.0)
+        assert throttle.update(74.0, 0.0) == 74.0
+
+    def test_small_change_held_back(self) -> None:
+        """Test a change within the deadband keeps the published value."""
+        throttle = SleepmeStateThrottle(2.0, 600.0)
+        throttle.update(74.0, 0.0)
+        assert throttle.update(75.5, 60.0) == 74.0
+        assert throttle.update(72.5, 120.0) == 74.0
+
+    def test_significant_change_published(self) -> None:
+        """Test a change of at least the deadband is published."""
+        throttle = SleepmeStateThrottle(2.0, 600.0)
+        throttle.update(74.0, 0.0)
+        assert throttle.update(72.0, 60.0) == 72.0
+
+    def test_published_after_interval(self) -> None:
+        """Test a small change is published once the interval has passed."""
+        throttle = SleepmeStateThrottle(2.0, 600.0)
+        throttle.update(74.0, 0.0)
+        throttle.update(74.5, 300.0)
+        assert throttle.update(74.5, 600.0) == 74.5
+        # The interval restarts with the publish
+        assert throttle.update(75.0, 900.0) == 74.5
+
+    def test_missing_value_published(self) -> None:
+        """Test readings going missing and coming back are published."""
+        throttle = SleepmeStateThrottle(2.0, 600.0)
+        throttle.update(74.0, 0.0)
+        assert throttle.update(None, 60.0) is None
+        assert throttle.update(74.5, 120.0) == 74.5
+
+    def test_zero_deadband_publishes_every_change(self) -> None:
+        """Test a deadband of zero publishes every reading."""
+        throttle = SleepmeStateThrottle(0.0, 600.0)
+        throttle.update(74.0, 0.0)
+        assert throttle.update(74.1, 1.0) == 74.1
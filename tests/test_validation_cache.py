@@ -0,0 +1,34 @@
+"""Tests for the SleepmeValidationCache module."""
+
+from custom_components.sleepme_thermostat.validation_cache import (
+    SleepmeValidationCache,
+)
+
+from .fake_clock import FakeClock
+
+DEVICES = [{"id": "abcd", "name": "A Bed"}]
+
+
+class TestSleepmeValidationCache:
+    """Test cases for the SleepmeValidationCache class."""
+
+    def test_pop_once(self, clock: FakeClock) -> None:
+        """Test a cached device list is only returned once."""
+        cache = SleepmeValidationCache(60, clock)
+        cache.put("1234567890", DEVICES)
+        assert cache.pop("other") is None
+        assert cache.pop("1234567890") == DEVICES
+        assert cache.pop("1234567890") is None
+
+    def test_expired(self, clock: FakeClock) -> None:
+        """Test a device list is no longer returned after the TTL."""
+        cache = SleepmeValidationCache(60, clock)
+        cache.put("1234567890", DEVICES)
+        clock.now += 60
+        assert cache.pop("1234567890") is None
+
+    def test_api_key_not_kept(self, clock: FakeClock) -> None:
+        """Test the cache keeps a hash of the API key, not the key."""
+        cache = SleepmeValidationCache(60, clock)
+        cache.put("1234567890", DEVICES)
+        assert "1234567890" not in cache._entries  # noqa: SLF001